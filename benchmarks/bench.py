@@ -0,0 +1,153 @@
+"""Бенчмарки стадий линтера на синтетическом корпусе.
+
+    python -m benchmarks.bench run [--size N] [--repeat R] [--shape ...] [--output FILE]
+    python -m benchmarks.bench compare BASELINE CURRENT [--threshold 0.25]
+
+run замеряет каждую стадию отдельно (лексер, парсер, каждая проверка
+FormattingRules/LogicRules, полный LinterEngine.run, Fixer.apply) и пишет JSON.
+compare сравнивает два JSON и завершается с кодом 1, если есть регрессии.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SHAPES, generate
+from config import Config
+from engine import LinterEngine
+from fixer import Fixer
+from lexer import Lexer
+from parser_js import Parser
+from rules import FormattingRules, LogicRules
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def _best(func, repeat):
+    """Минимальное время из repeat запусков и результат последнего"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_source(code, config, repeat):
+    """Время каждой стадии для одного исходника, секунды"""
+    settings = config.settings
+    timings = {}
+
+    timings['lexer.tokenize'], tokens = _best(lambda: Lexer(code).tokenize(), repeat)
+    timings['lexer.tokenize.fast'], _ = _best(lambda: Lexer(code, 'fast').tokenize(), repeat)
+    timings['parser.parse'], ast = _best(lambda: Parser(tokens).parse(), repeat)
+
+    fmt = FormattingRules(settings)
+    logic = LogicRules(settings)
+    timings['rules.check_naming'], _ = _best(lambda: fmt.check_naming(tokens), repeat)
+    timings['rules.check_spacing'], _ = _best(lambda: fmt.check_spacing(tokens), repeat)
+    timings['rules.check_blank_lines'], _ = _best(lambda: fmt.check_blank_lines(tokens), repeat)
+    timings['rules.check_complexity'], _ = _best(lambda: logic.check_complexity(ast, []), repeat)
+    timings['rules.check_unused'], _ = _best(lambda: logic.check_unused(ast, tokens), repeat)
+
+    timings['engine.run'], _ = _best(lambda: LinterEngine(code, config).run(tokens, ast), repeat)
+
+    fixer = Fixer(code)
+    fmt.check_spacing(tokens, fixer)
+    timings['fixer.apply'], _ = _best(fixer.apply, repeat)
+    return timings
+
+
+def run(shapes, size, repeat, seed=0):
+    config = Config()
+    results = {}
+    for shape in shapes:
+        code = generate(shape, size, seed)
+        results[shape] = bench_source(code, config, repeat)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'size': size,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold, min_delta=0.001):
+    """Список регрессий (shape, stage, base, cur): медленнее на threshold и хотя бы на min_delta секунд"""
+    regressions = []
+    for shape, stages in current['results'].items():
+        base_stages = baseline['results'].get(shape, {})
+        for stage, cur in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            if cur > base * (1 + threshold) and cur - base > min_delta:
+                regressions.append((shape, stage, base, cur))
+    return regressions
+
+
+def _print_table(data):
+    for shape, stages in data['results'].items():
+        print(f"\n[{shape}]")
+        for stage, seconds in stages.items():
+            print(f"  {stage:<26} {seconds * 1000:10.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks.bench', description='Бенчмарки стадий JS Linter')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_cmd = sub.add_parser('run', help='Запустить бенчмарки и записать JSON')
+    run_cmd.add_argument('--size', type=int, default=2000, help='Размер корпуса (строк)')
+    run_cmd.add_argument('--repeat', type=int, default=5, help='Повторов на стадию (берется лучший)')
+    run_cmd.add_argument('--seed', type=int, default=0)
+    run_cmd.add_argument('--shape', action='append', choices=SHAPES, help='Форма корпуса (по умолчанию все)')
+    run_cmd.add_argument('--output', help='Файл для результатов JSON')
+    run_cmd.add_argument('--save-baseline', action='store_true', help=f'Записать результат в {DEFAULT_BASELINE}')
+
+    cmp_cmd = sub.add_parser('compare', help='Сравнить результаты с базовыми')
+    cmp_cmd.add_argument('current', help='JSON текущего прогона')
+    cmp_cmd.add_argument('--baseline', default=DEFAULT_BASELINE)
+    cmp_cmd.add_argument('--threshold', type=float, default=0.25, help='Допустимое замедление (0.25 = 25%%)')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        data = run(args.shape or SHAPES, args.size, args.repeat, args.seed)
+        _print_table(data)
+        targets = [args.output] if args.output else []
+        if args.save_baseline:
+            targets.append(DEFAULT_BASELINE)
+        for path in targets:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+
+    if baseline['meta'].get('size') != current['meta'].get('size'):
+        print("Warning: baseline and current runs use different corpus sizes")
+
+    regressions = compare(baseline, current, args.threshold)
+    if not regressions:
+        print("No regressions found.")
+        return 0
+    for shape, stage, base, cur in regressions:
+        print(f"REGRESSION [{shape}] {stage}: {base * 1000:.2f} ms -> {cur * 1000:.2f} ms ({cur / base:.1f}x)")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Детерминированный генератор синтетических JS корпусов для бенчмарков"""
+import random
+
+SHAPES = ('nested', 'declarations', 'operators', 'comments', 'minified', 'mixed')
+
+
+def _name(rnd, bad_ratio=0.1):
+    base = rnd.choice(['value', 'count', 'item', 'total', 'index', 'result', 'node'])
+    if rnd.random() < bad_ratio:
+        return f"{base}_{rnd.randint(0, 999)}"
+    return f"{base}{rnd.randint(0, 999)}"
+
+
+def _nested(rnd, size):
+    out = []
+    depth_limit = 12
+    while len(out) < size:
+        depth = rnd.randint(2, depth_limit)
+        out.append(f"function {_name(rnd)}(a, b) {{")
+        for d in range(depth):
+            kw = rnd.choice(['if', 'while', 'for'])
+            cond = '(;;)' if kw == 'for' else f"(a > {d})"
+            out.append("    " * (d + 1) + f"{kw} {cond} {{")
+        out.append("    " * (depth + 1) + "a = a + b;")
+        for d in reversed(range(depth)):
+            out.append("    " * (d + 1) + "}")
+        out.append("}")
+    return out[:size]
+
+
+def _declarations(rnd, size):
+    out = []
+    for i in range(size):
+        kw = rnd.choice(['let', 'const', 'var'])
+        out.append(f"{kw} {_name(rnd)} = {rnd.randint(0, 10000)};")
+    return out
+
+
+def _operators(rnd, size):
+    out = []
+    for _ in range(size):
+        terms = [_name(rnd, 0) for _ in range(rnd.randint(10, 40))]
+        ops = [rnd.choice(['+', '-', '*', '/', '=', '%']) for _ in terms[1:]]
+        spaced = rnd.random() < 0.5
+        expr = terms[0]
+        for op, term in zip(ops, terms[1:]):
+            expr += f" {op} {term}" if spaced else f"{op}{term}"
+        out.append(f"let {_name(rnd, 0)} = {expr};")
+    return out
+
+
+def _comments(rnd, size):
+    out = []
+    while len(out) < size:
+        block = rnd.randint(20, 200)
+        out.append("/*")
+        out.extend(f" * {'lorem ipsum dolor sit amet ' * rnd.randint(1, 4)}" for _ in range(block))
+        out.append(" */")
+        out.append(f"let {_name(rnd)} = 1; // trailing comment")
+    return out[:size]
+
+
+def _minified(rnd, size):
+    parts = []
+    for _ in range(size):
+        name = _name(rnd, 0)
+        parts.append(rnd.choice([
+            f"var {name}=1;",
+            f"function {name}(a,b){{if(a){{return a+b;}}return b;}}",
+            f"{name}={name}*2+{rnd.randint(0, 9)};",
+            f"for(;;){{{name}++;}}",
+        ]))
+    return [''.join(parts)]
+
+
+def _mixed(rnd, size):
+    generators = [_nested, _declarations, _operators, _comments]
+    out = []
+    while len(out) < size:
+        out.extend(rnd.choice(generators)(rnd, rnd.randint(5, 50)))
+        out.extend([''] * rnd.randint(0, 4))
+    return out[:size]
+
+
+_GENERATORS = {
+    'nested': _nested,
+    'declarations': _declarations,
+    'operators': _operators,
+    'comments': _comments,
+    'minified': _minified,
+    'mixed': _mixed,
+}
+
+
+def generate(shape, size, seed=0):
+    """Возвращает исходник формы shape; size - число строк (для minified - число инструкций)"""
+    if shape not in _GENERATORS:
+        raise ValueError(f"Unknown corpus shape: {shape}")
+    rnd = random.Random(f"{shape}:{size}:{seed}")
+    return '\n'.join(_GENERATORS[shape](rnd, size)) + '\n'
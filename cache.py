@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class LintCache:
+    """Дисковый кэш результатов проверки.
+
+    Ключ - хэш содержимого файла, хэш настроек и VERSION, поэтому
+    неизмененные файлы не проходят ни через лексер, ни через парсер, ни через
+    правила, а записи прежней версии линтера не используются.
+    """
+    # Увеличивать при любом изменении правил, сообщений или формата записи
+    VERSION = 1
+    DEFAULT_LOCATION = '.jslint_cache'
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024  # байт
+
+    def __init__(self, location=None, max_size=None):
+        self.location = location or self.DEFAULT_LOCATION
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+
+    @staticmethod
+    def make_key(data, config_digest):
+        """data - байты файла, config_digest - результат Config.digest()"""
+        h = LintCache._salted(config_digest)
+        h.update(data)
+        return h.hexdigest()
+
+    @staticmethod
+    def make_file_key(path, config_digest, block_size=1024 * 1024):
+        """То же, что make_key, но файл хэшируется блоками, не целиком в памяти"""
+        h = LintCache._salted(config_digest)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    @staticmethod
+    def _salted(config_digest):
+        return hashlib.sha256(f"{LintCache.VERSION}\0{config_digest}\0".encode('ascii'))
+
+    def _path(self, key):
+        # Шардирование по первым символам, чтобы не держать 50k файлов в одной директории
+        return os.path.join(self.location, key[:2], key[2:] + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            # mtime служит меткой последнего использования для LRU
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        """Атомарная запись: временный файл в той же директории + os.replace.
+
+        Несколько воркеров могут писать один ключ одновременно - побеждает
+        последний, читатели никогда не видят частично записанный файл.
+        """
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def prune(self):
+        """Удаляет давно не использованные записи, пока кэш не уложится в max_size"""
+        entries = []
+        total = 0
+        if not os.path.isdir(self.location):
+            return 0
+        for shard in os.scandir(self.location):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                try:
+                    st = item.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, item.path))
+                total += st.st_size
+
+        if total <= self.max_size:
+            return 0
+
+        # Чистим с запасом, чтобы не запускать вытеснение после каждого прогона
+        target = self.max_size * 0.8
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
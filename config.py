@@ -1,5 +1,24 @@
+import fnmatch
+import hashlib
 import json
 import os
+import re
+
+# Файл настроек, который ищется в директории проверяемого файла и выше
+CONFIG_FILENAME = '.jslintrc.json'
+
+
+def load_settings(config_path):
+    """Настройки из JSON файла; при ошибке - предупреждение и пустой словарь"""
+    if not config_path or not os.path.exists(config_path):
+        return {}
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read config file, using defaults. Error: {e}")
+        return {}
+
 
 class Config:
     DEFAULT_CONFIG = {
@@ -9,18 +28,136 @@ class Config:
         "indentation_size": 4,
         "require_spaces_operators": True,
         "no_unused_vars": True,
-        "autofix": False
+        "autofix": False,
+        "lexer": "regex",       # или "fast" - см. lexer.Lexer.BACKENDS
+        "time_budget": None,    # секунд на файл; оставшиеся правила пропускаются
+        "max_warnings": None,   # после стольких проблем в файле правила не запускаются
+        "detect_minified": True # на минифицированных файлах только логические правила
     }
 
     def __init__(self, config_path=None):
         self.settings = self.DEFAULT_CONFIG.copy()
-        if config_path and os.path.exists(config_path):
-            try:
-                with open(config_path, 'r') as f:
-                    user_settings = json.load(f)
-                    self.settings.update(user_settings)
-            except Exception as e:
-                print(f"Warning: Could not read config file, using defaults. Error: {e}")
+        if config_path:
+            self.settings.update(load_settings(config_path))
+        self._digest = None     # (снимок настроек, хэш)
+        self._naming = None     # (шаблон, скомпилированное выражение)
+
+    @classmethod
+    def from_settings(cls, settings):
+        config = cls()
+        config.settings.update(settings)
+        return config
 
     def get(self, key):
-        return self.settings.get(key)
\ No newline at end of file
+        return self.settings.get(key)
+
+    def for_file(self, path):
+        """Настройки для файла path: один Config действует на все файлы"""
+        return self
+
+    @property
+    def naming_regex(self):
+        """naming_pattern, скомпилированный один раз на Config"""
+        pattern = self.settings.get('naming_pattern') or self.DEFAULT_CONFIG['naming_pattern']
+        if self._naming is None or self._naming[0] != pattern:
+            self._naming = (pattern, re.compile(pattern))
+        return self._naming[1]
+
+    def digest(self):
+        """Стабильный хэш настроек, используется как часть ключа кэша.
+        Запоминается; пересчитывается, только если settings изменились."""
+        if self._digest is None or self._digest[0] != self.settings:
+            data = json.dumps(self.settings, sort_keys=True, default=str)
+            self._digest = (dict(self.settings), hashlib.sha256(data.encode('utf-8')).hexdigest())
+        return self._digest[1]
+
+
+class ConfigResolver:
+    """Каскадные настройки: .jslintrc.json в директории файла и во всех выше.
+
+    Приоритет (от низшего): значения по умолчанию, файлы от корня к ближайшей
+    директории, секции overrides этих файлов, затем explicit - настройки из
+    --config и флагов командной строки. Файл с "root": true обрывает поиск
+    выше. Секция overrides - список {"files": [glob, ...], настройка: значение}
+    с шаблонами относительно директории файла настроек (шаблон без '/'
+    сравнивается с именем файла).
+
+    Цепочка файлов запоминается по директориям, а итоговый Config - по
+    директории и набору сработавших overrides, так что на 50k файлов каждый
+    файл настроек читается один раз, а файлы с одинаковыми настройками
+    получают один и тот же Config (с общим digest и naming_regex).
+    """
+
+    def __init__(self, explicit=None):
+        self.explicit = dict(explicit or {})
+        self._chains = {}     # директория -> ((директория файла, настройки, overrides), ...)
+        self._configs = {}    # (директория, сработавшие overrides) -> Config
+
+    def for_file(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        chain = self._chain(directory)
+        matched = tuple((i, j) for i, (base, _, overrides) in enumerate(chain)
+                        for j, override in enumerate(overrides)
+                        if _matches(override.get('files'), os.path.relpath(os.path.abspath(path), base)))
+        key = (directory, matched)
+        config = self._configs.get(key)
+        if config is None:
+            settings = {}
+            for _, layer, _ in chain:
+                settings.update(layer)
+            for i, j in matched:
+                settings.update({k: v for k, v in chain[i][2][j].items() if k != 'files'})
+            settings.update(self.explicit)
+            config = self._configs[key] = Config.from_settings(settings)
+        return config
+
+    def _chain(self, directory):
+        """Файлы настроек, действующие в directory, от корня к ней. Идет вверх
+        только до первой уже известной директории и запоминает все пройденные."""
+        pending = []   # [(директория, слой или None)] снизу вверх
+        chain = ()
+        while True:
+            if directory in self._chains:
+                chain = self._chains[directory]
+                break
+            layer, root = _read_layer(directory)
+            pending.append((directory, layer, root))
+            parent = os.path.dirname(directory)
+            if root or parent == directory:
+                break
+            directory = parent
+        for current, layer, root in reversed(pending):
+            if root:
+                chain = ()
+            if layer is not None:
+                chain = chain + (layer,)
+            self._chains[current] = chain
+        return chain
+
+
+def _read_layer(directory):
+    """((директория, настройки без служебных ключей, overrides) или None, root)"""
+    path = os.path.join(directory, CONFIG_FILENAME)
+    if not os.path.isfile(path):
+        return None, False
+    settings = load_settings(path)
+    if not isinstance(settings, dict):
+        print(f"Warning: {path} must contain a JSON object, ignored.")
+        return None, False
+    root = bool(settings.pop('root', False))
+    overrides = [o for o in settings.pop('overrides', None) or () if isinstance(o, dict)]
+    return (directory, settings, overrides), root
+
+
+def _matches(patterns, relpath):
+    if not patterns:
+        return False
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    relpath = relpath.replace(os.sep, '/')
+    name = relpath.rsplit('/', 1)[-1]
+    for pattern in patterns:
+        target = relpath if '/' in pattern else name
+        if fnmatch.fnmatchcase(target, pattern):
+            return True
+    return False
@@ -0,0 +1,87 @@
+import re
+
+SEVERITIES = ('error', 'warning')
+SYNTAX_RULE = 'syntax'
+SYNTAX_PREFIX = '[SYNTAX ERROR] '
+REPORT_LINE = re.compile(r'Line (\d+): (.*)\Z', re.S)
+
+
+class Diagnostic:
+    """Одна найденная проблема.
+
+    Текст сообщения не собирается при создании: хранится шаблон и аргументы,
+    строка форматируется только при обращении к message (или str()).
+    fix - кортеж правок (start, end, replacement) или None.
+    """
+    __slots__ = ('file', 'line', 'column', 'rule', 'severity', 'template', 'args', 'fix')
+
+    def __init__(self, line, rule, template, args=(), column=None, severity='warning',
+                 fix=None, file=None):
+        self.file = file
+        self.line = line
+        self.column = column
+        self.rule = rule
+        self.severity = severity
+        self.template = template
+        self.args = args
+        self.fix = fix
+
+    @classmethod
+    def syntax_error(cls, message, file=None):
+        return cls(None, SYNTAX_RULE, message, severity='error', file=file)
+
+    @classmethod
+    def from_report(cls, text, file=None):
+        """Обратное к str(): "Line N: ..." или "[SYNTAX ERROR] ..." (без правила)"""
+        if text.startswith(SYNTAX_PREFIX):
+            return cls.syntax_error(text[len(SYNTAX_PREFIX):], file)
+        match = REPORT_LINE.match(text)
+        if match is None:
+            raise ValueError(f"Report must look like 'Line N: ...' or '{SYNTAX_PREFIX}...', "
+                             f"got {text!r}; use LinterEngine.add_report(line, message)")
+        return cls(int(match.group(1)), None, match.group(2), file=file)
+
+    @property
+    def message(self):
+        if not self.args:
+            return self.template
+        return self.template.format(*self.args)
+
+    def moved(self, line_delta, offset_delta=0):
+        """Копия со сдвигом строки и смещений правок (для инкрементальной перепроверки)"""
+        fix = self.fix
+        if fix and offset_delta:
+            fix = tuple((start + offset_delta, end + offset_delta, text) for start, end, text in fix)
+        return Diagnostic(self.line + line_delta, self.rule, self.template, self.args,
+                          self.column, self.severity, fix, self.file)
+
+    def to_tuple(self):
+        """Компактная форма для кэша и передачи между процессами (без file)"""
+        return (self.line, self.column, self.rule, self.severity, self.template,
+                list(self.args), self.fix)
+
+    @classmethod
+    def from_tuple(cls, data, file=None):
+        line, column, rule, severity, template, args, fix = data
+        return cls(line, rule, template, tuple(args), column, severity,
+                   tuple(tuple(edit) for edit in fix) if fix else None, file)
+
+    def to_dict(self):
+        return {'file': self.file, 'line': self.line, 'column': self.column,
+                'rule': self.rule, 'severity': self.severity, 'message': self.message}
+
+    def __str__(self):
+        """Текстовая форма, как в прежних отчетах LinterEngine"""
+        if self.line is None:
+            return SYNTAX_PREFIX + self.message
+        return f"Line {self.line}: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.rule}, line={self.line}, {self.message!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Diagnostic):
+            return NotImplemented
+        return self.to_tuple() == other.to_tuple() and self.file == other.file
+
+    __hash__ = None
@@ -1,64 +1,296 @@
-from rules import FormattingRules, LogicRules
+from collections.abc import MutableSequence
+from time import perf_counter
+
+from diagnostics import Diagnostic
+from lexer import SKIP, TokenStream
+from parser_js import Parser
+from rules import DEADLINE_BLOCK, DEFAULT_RULES, BudgetExceeded, RuleDispatcher
+from suppressions import Suppressions
+
+# Причины пропуска правил (LinterEngine.skipped)
+SKIP_MINIFIED = 'minified'
+SKIP_TIME_BUDGET = 'time-budget'
+SKIP_MAX_WARNINGS = 'max-warnings'
+
+# Признаки минифицированного или сгенерированного файла
+MINIFIED_SAMPLE = 64 * 1024      # начало файла, по которому оценивается длина строк
+MINIFIED_LINE_LENGTH = 300       # средняя длина строки
+MINIFIED_TOKENS_PER_LINE = 60    # значимых токенов на строку
+MINIFIED_MIN_TOKENS = 1000       # на меньшем числе токенов плотность не оценивается
+
+
+def long_lines(sample):
+    """Средняя длина строки в начале текста (str или bytes) больше MINIFIED_LINE_LENGTH"""
+    sample = sample[:MINIFIED_SAMPLE]
+    newline = '\n' if isinstance(sample, str) else b'\n'
+    return len(sample) / (sample.count(newline) + 1) > MINIFIED_LINE_LENGTH
+
+
+def dense_tokens(tokens):
+    """Значимых токенов на строку больше MINIFIED_TOKENS_PER_LINE
+    (TokenStream или последовательность Token)"""
+    if isinstance(tokens, TokenStream):
+        significant = len(tokens) - tokens.types.count(SKIP)
+    else:
+        significant = sum(tok.type != 'SKIP' for tok in tokens)
+    if significant < MINIFIED_MIN_TOKENS:
+        return False
+    return significant / tokens[-1].line > MINIFIED_TOKENS_PER_LINE
+
+
+def is_minified(config, sample=None, tokens=None):
+    """Минифицированный файл: по длине строк начала текста или по плотности
+    токенов, если это не отключено настройкой detect_minified"""
+    return config.get('detect_minified') is not False and (
+        (sample is not None and long_lines(sample)) or
+        (tokens is not None and dense_tokens(tokens)))
+
+
+class ReportList(MutableSequence):
+    """LinterEngine.reports: строки str(Diagnostic) поверх списка diagnostics.
+    Запись (append, insert, присваивание, del) меняет сам diagnostics, так что
+    код, который дописывает отчеты строками, продолжает работать."""
+
+    def __init__(self, diagnostics):
+        self._diagnostics = diagnostics
+
+    def __len__(self):
+        return len(self._diagnostics)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [str(d) for d in self._diagnostics[index]]
+        return str(self._diagnostics[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._diagnostics[index] = [Diagnostic.from_report(text) for text in value]
+        else:
+            self._diagnostics[index] = Diagnostic.from_report(value)
+
+    def __delitem__(self, index):
+        del self._diagnostics[index]
+
+    def insert(self, index, value):
+        self._diagnostics.insert(index, Diagnostic.from_report(value))
+
+    def __eq__(self, other):
+        if isinstance(other, (ReportList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
 
 class LinterEngine:
-    def __init__(self, code, config_obj):
+    def __init__(self, code, config_obj, index=None, rules=None):
         self.code = code
         self.config = config_obj
-        self.reports = []
-        # Собираем номера строк, которые нужно игнорировать
-        self.disabled_lines = self._get_disabled_lines()
-        # Инициализируем наборы правил
-        self.fmt_rules = FormattingRules(self.config.settings)
-        self.logic_rules = LogicRules(self.config.settings)
-
-    def _get_disabled_lines(self):
-        """Сканирует код на наличие комментариев управления линтером"""
-        disabled = set()
-        lines = self.code.split('\n')
-        is_disabled = False
-        
-        for i, line in enumerate(lines, 1):
-            if '/* lint-disable */' in line:
-                is_disabled = True
-            if '/* lint-enable */' in line:
-                is_disabled = False
-                # Саму строку с enable тоже исключаем из проверки
-                disabled.add(i)
+        # project_index.ProjectIndex: правила видят объявления и ссылки других файлов
+        self.index = index
+        # Найденные проблемы (diagnostics.Diagnostic) в порядке добавления
+        self.diagnostics = []
+        # Директивы lint-disable из COMMENT-токенов; заполняются в run/run_stream
+        # или снаружи через Suppressions.from_tokens (code=None - потоковый режим)
+        self.suppressions = Suppressions()
+        # Инициализируем правила; дополнительные подключаются через register_rule.
+        # rules - готовые экземпляры (например, из session.LinterSession): правило
+        # сбрасывает свое состояние в start(), поэтому его можно переиспользовать
+        self.rules = []
+        for rule in rules if rules is not None else [rule_cls(self.config) for rule_cls in DEFAULT_RULES]:
+            self.register_rule(rule)
+        # Хуки замеров: hook(stage, start, seconds, calls, items)
+        self.hooks = []
+        # Ограничения: время на файл (отсчитывается от создания движка, то есть
+        # вместе с лексером и парсером) и число проблем, после которого
+        # оставшиеся правила не запускаются
+        budget = config_obj.get('time_budget')
+        self.deadline = perf_counter() + budget if budget else None
+        self.max_warnings = config_obj.get('max_warnings')
+        # Минифицированный файл; None - определяется в run по тексту и токенам
+        self.minified = None
+        # Пропущенные правила: [(имя правила, причина SKIP_*)]
+        self.skipped = []
+
+    def register_rule(self, rule):
+        """Подключает правило (экземпляр rules.Rule) к общему проходу по токенам и AST"""
+        if self.index is not None:
+            rule.index = self.index
+        self.rules.append(rule)
+        return rule
+
+    def add_hook(self, hook):
+        """Подключает хук замеров; с хуками каждое правило замеряется отдельно"""
+        self.hooks.append(hook)
+        return hook
+
+    def emit(self, stage, start, seconds, calls=1, items=0):
+        """Передает замер стадии хукам (используется и снаружи, например для лексера)"""
+        for hook in self.hooks:
+            hook(stage, start, seconds, calls, items)
+
+    def _emit_rules(self, dispatcher, start, items, stage='rules'):
+        self.emit(stage, start, perf_counter() - start, 1, items)
+        for name, (seconds, calls) in dispatcher.rule_stats.items():
+            self.emit('rule:' + name, start, seconds, calls, calls)
+
+    @property
+    def reports(self):
+        """Текстовые отчеты "Line N: ..." / "[SYNTAX ERROR] ..." (ReportList)"""
+        return ReportList(self.diagnostics)
+
+    def visible(self, diagnostic):
+        """Строка проблемы не подавлена ни для всех правил, ни для ее правила"""
+        return diagnostic.line is None or not self.suppressions.is_suppressed(diagnostic.line, diagnostic.rule)
+
+    def add_diagnostic(self, diagnostic):
+        if self.visible(diagnostic):
+            self.diagnostics.append(diagnostic)
+
+    def add_report(self, line, message, rule=None):
+        self.add_diagnostic(Diagnostic(line, rule, message))
+
+    def add_syntax_error(self, message):
+        self.diagnostics.append(Diagnostic.syntax_error(message))
+
+    def active_rules(self):
+        """Включенные правила; на минифицированном файле правила с
+        on_minified = False пропускаются и попадают в skipped"""
+        active = []
+        for rule in self.rules:
+            if not rule.is_enabled():
                 continue
-            
-            if is_disabled:
-                disabled.add(i)
-        return disabled
+            if self.minified and not rule.on_minified:
+                self.skipped.append((rule.name, SKIP_MINIFIED))
+            else:
+                active.append(rule)
+        return active
+
+    def dispatcher(self, fixer=None, rules=None, deadline=None):
+        return RuleDispatcher(self.active_rules() if rules is None else rules, fixer,
+                              profile=bool(self.hooks), suppressions=self.suppressions,
+                              deadline=deadline)
+
+    def detect_minified(self, sample=None, tokens=None):
+        """Определяет минифицированный файл (см. is_minified), один раз на движок"""
+        if self.minified is None:
+            self.minified = is_minified(self.config, sample, tokens)
+        return self.minified
 
-    def add_report(self, line, message):
-        """Добавляет ошибку в список, если строка не находится в блоке disable"""
-        if line not in self.disabled_lines:
-            self.reports.append(f"Line {line}: {message}")
+    def collect(self, dispatcher):
+        # Отчеты добавляются в порядке регистрации правил
+        for errors in dispatcher.results():
+            for diagnostic in errors:
+                self.add_diagnostic(diagnostic)
 
     def run(self, tokens, ast, fixer=None):
-        """Запускает все проверки по очереди"""
-        
-        # 1. Проверка нейминга (CamelCase и т.д.)
-        for line, msg in self.fmt_rules.check_naming(tokens):
-            self.add_report(line, msg)
-            
-        # 2. Проверка пробелов вокруг операторов (с поддержкой Fixer)
-        for line, msg in self.fmt_rules.check_spacing(tokens, fixer):
-            self.add_report(line, msg)
-            
-        # 3. Проверка избыточных пустых строк
-        for line, msg in self.fmt_rules.check_blank_lines(tokens):
-            self.add_report(line, msg)
-
-        # 4. Проверка цикломатической сложности (анализ AST)
-        # Передаем список напрямую, так как метод рекурсивный
-        temp_reports = []
-        self.logic_rules.check_complexity(ast, temp_reports)
-        for line, msg in temp_reports:
-            self.add_report(line, msg)
-        
-        # 5. Проверка неиспользуемых переменных
-        for line, msg in self.logic_rules.check_unused(ast, tokens):
-            self.add_report(line, msg)
-
-        return self.reports
\ No newline at end of file
+        """Запускает все правила за один проход по токенам и один обход AST"""
+        start = perf_counter()
+        self.suppressions = Suppressions.from_tokens(tokens)
+        self.detect_minified(self.code, tokens)
+        if self.deadline is not None or self.max_warnings is not None:
+            self._run_limited(tokens, ast, fixer)
+            return self.diagnostics
+        dispatcher = self.dispatcher(fixer)
+        dispatcher.feed_tokens(tokens)
+        dispatcher.walk(ast)
+        self.collect(dispatcher)
+        if self.hooks:
+            self._emit_rules(dispatcher, start, len(tokens))
+        return self.diagnostics
+
+    def _run_limited(self, tokens, ast, fixer):
+        active, results = self.run_groups(tokens, ast, fixer)
+        # Отчеты - в порядке регистрации правил, как при обычном проходе
+        for rule in active:
+            for diagnostic in results.get(rule, ()):
+                self.add_diagnostic(diagnostic)
+
+    def run_groups(self, tokens, ast, fixer=None):
+        """Правила группами от дешевых к дорогим (Rule.cost), отдельный проход
+        на группу. Перед группой проверяются время и число проблем; группа, не
+        успевшая закончить проход, и все следующие попадают в skipped.
+        Возвращает (активные правила, {правило: ошибки}) - без пропущенных."""
+        active = self.active_rules()
+        results = {}
+        count = len(self.diagnostics)
+        reason = None
+        for cost in sorted({rule.cost for rule in active}):
+            group = [rule for rule in active if rule.cost == cost]
+            if reason is None and self.max_warnings is not None and count > self.max_warnings:
+                reason = SKIP_MAX_WARNINGS
+            if reason is None:
+                start = perf_counter()
+                dispatcher = self.dispatcher(fixer, group, self.deadline)
+                fixes = len(fixer.fixes) if fixer else 0
+                try:
+                    dispatcher.feed_tokens(tokens)
+                    dispatcher.walk(ast)
+                except BudgetExceeded:
+                    reason = SKIP_TIME_BUDGET
+                    if fixer:
+                        # Исправления недоработавших правил не применяются
+                        del fixer.fixes[fixes:]
+                else:
+                    for rule, errors in zip(group, dispatcher.results()):
+                        results[rule] = errors
+                        count += sum(map(self.visible, errors))
+                    if self.hooks:
+                        self._emit_rules(dispatcher, start, len(tokens))
+                    continue
+            self.skipped.extend((rule.name, reason) for rule in group)
+        return active, results
+
+    def run_stream(self, tokens, sample=None):
+        """Потоковый режим: каждый токен из итератора сразу уходит и правилам,
+        и парсеру, поэтому весь поток не материализуется. Возвращает парсер.
+        sample - начало текста для определения минифицированного файла. Если
+        время на файл истекло, поток обрывается, а все правила пропускаются."""
+        start = perf_counter()
+        self.detect_minified(sample)
+        # Директивы известны только в конце потока, поэтому правила вызываются
+        # на всех строках, а подавленные отчеты отбрасываются в collect
+        dispatcher = self.dispatcher()
+        comments = []
+        count = 0
+        deadline = self.deadline
+        cut = None   # число ошибок разбора к моменту обрыва потока
+
+        def tap():
+            nonlocal count, cut
+            for tok in tokens:
+                count += 1
+                if deadline is not None and not count % DEADLINE_BLOCK and perf_counter() > deadline:
+                    cut = len(parser.errors)
+                    return
+                dispatcher.feed(tok)
+                if tok.type == 'COMMENT' and 'lint-' in tok.value:
+                    comments.append((tok.line, tok.value))
+                yield tok
+
+        feed = tap()
+        parser = Parser(feed)
+        ast = parser.parse()
+        # Парсер мог остановиться раньше конца потока - дочитываем для правил
+        for _ in feed:
+            pass
+        if cut is not None:
+            # Ошибки после обрыва - следствие самого обрыва
+            del parser.errors[cut:]
+            self.skipped.extend((rule.name, SKIP_TIME_BUDGET) for rule in dispatcher.rules)
+        else:
+            dispatcher.end_tokens()
+            dispatcher.walk(ast)
+
+        self.suppressions = Suppressions.from_comments(comments)
+        for parse_error in parser.errors:
+            self.add_syntax_error(parse_error)
+        if cut is None:
+            self.collect(dispatcher)
+        if self.hooks:
+            # В потоке лексер, парсер и правила чередуются - общий замер
+            self._emit_rules(dispatcher, start, count, stage='stream')
+        return parser
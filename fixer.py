@@ -1,17 +1,42 @@
 class Fixer:
     def __init__(self, code):
         self.code = code
-        self.fixes = [] 
+        self.fixes = []  # (start, end, replacement, rule)
+        # Заполняются в apply()
+        self.applied = 0
+        self.skipped = 0
 
-    def add_fix(self, start, end, replacement):
-        self.fixes.append((start, end, replacement))
+    def add_fix(self, start, end, replacement, rule=None):
+        self.fixes.append((start, end, replacement, rule))
 
     def apply(self):
-        sorted_fixes = sorted(self.fixes, key=lambda x: x[0], reverse=True)
-        
-        modified_code = self.code
-        for start, end, replacement in sorted_fixes:
-            modified_code = modified_code[:start] + replacement + modified_code[end:]
-        
-        return modified_code
+        """Собирает исправленный текст за один проход слева направо.
 
+        Правки, пересекающиеся с уже принятой, отбрасываются; из нескольких
+        вставок в одну позицию остается первая (одинаковые вставки от соседних
+        операторов - обычное дело, например "a=-b"). Число отброшенных правок
+        сохраняется в self.skipped.
+        """
+        code = self.code
+        # Стабильная сортировка: при равных позициях побеждает правка, добавленная раньше
+        ordered = sorted(self.fixes, key=lambda fix: (fix[0], fix[1]))
+
+        pieces = []
+        pos = 0              # конец последней принятой правки
+        last_insert = None   # позиция последней принятой вставки
+        applied = skipped = 0
+        for fix in ordered:
+            start, end, replacement = fix[0], fix[1], fix[2]
+            if start < pos or (start == end and start == last_insert):
+                skipped += 1
+                continue
+            pieces.append(code[pos:start])
+            pieces.append(replacement)
+            pos = end
+            last_insert = start if start == end else None
+            applied += 1
+        pieces.append(code[pos:])
+
+        self.applied = applied
+        self.skipped = skipped
+        return ''.join(pieces)
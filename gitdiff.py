@@ -0,0 +1,142 @@
+import os
+import re
+import subprocess
+from bisect import bisect_right
+
+# Заголовок ханка в выводе git diff -U0: @@ -a[,b] +c[,d] @@
+HUNK_HEADER = re.compile(rb'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+class GitError(Exception):
+    pass
+
+
+def git(args, cwd=None, input=None):
+    """Запускает git и возвращает stdout (bytes); при ошибке - GitError"""
+    try:
+        proc = subprocess.run(['git'] + args, cwd=cwd, input=input,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError(f"Could not run git: {e}")
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.decode('utf-8', 'replace').strip())
+    return proc.stdout
+
+
+def repo_root(cwd=None):
+    return git(['rev-parse', '--show-toplevel'], cwd).decode('utf-8').strip()
+
+
+def changed_hunks(ref=None, staged=False, cwd=None):
+    """Измененные файлы и строки: путь от корня репозитория -> (starts, ends),
+    отсортированные интервалы добавленных/измененных строк новой версии.
+
+    staged=True сравнивает индекс с HEAD, иначе рабочее дерево с ref.
+    Удаленные файлы не попадают в результат; файлы, где строки только
+    удалялись, попадают с пустыми интервалами.
+    """
+    args = ['-c', 'core.quotePath=false', 'diff', '-U0', '--no-color', '--no-ext-diff',
+            '--diff-filter=ACMR']
+    args += ['--cached'] if staged else [ref or 'HEAD']
+    hunks = {}
+    current = None
+    for line in git(args, cwd).splitlines():
+        if line.startswith(b'+++ '):
+            target = _diff_path(line[4:])
+            current = None
+            if target != '/dev/null':
+                path = target[2:] if target.startswith('b/') else target
+                current = hunks.setdefault(path, ([], []))
+        elif current is not None and line.startswith(b'@@'):
+            match = HUNK_HEADER.match(line)
+            if match is None:
+                continue
+            start = int(match.group(1))
+            count = 1 if match.group(2) is None else int(match.group(2))
+            if count:
+                current[0].append(start)
+                current[1].append(start + count - 1)
+    return hunks
+
+
+def untracked_files(cwd=None):
+    """Новые файлы, еще не добавленные в git (кроме игнорируемых): пути от cwd"""
+    out = git(['-c', 'core.quotePath=false', 'ls-files', '--others', '--exclude-standard', '-z'], cwd)
+    return [path for path in out.decode('utf-8', 'replace').split('\0') if path]
+
+
+def _diff_path(raw):
+    """Путь из строки +++ заголовка diff: git дописывает табуляцию к именам с
+    пробелами и заключает в кавычки (с экранированием как в C) имена с
+    кавычками, обратной косой чертой и управляющими символами"""
+    raw = raw.rstrip(b'\t')
+    if raw.startswith(b'"') and raw.endswith(b'"'):
+        # unicode_escape читает байты как latin-1, так что \ooo и байты UTF-8
+        # без экранирования возвращаются в bytes без изменений
+        raw = raw[1:-1].decode('unicode_escape').encode('latin-1')
+    return raw.decode('utf-8', 'replace')
+
+
+def read_staged(paths, cwd=None):
+    """Содержимое файлов из индекса одним процессом git cat-file --batch:
+    путь -> bytes (None, если в индексе файла нет)"""
+    if not paths:
+        return {}
+    request = ''.join(f":{path}\n" for path in paths).encode('utf-8')
+    out = git(['cat-file', '--batch'], cwd, input=request)
+    blobs = {}
+    pos = 0
+    for path in paths:
+        end = out.index(b'\n', pos)
+        header = out[pos:end].split()
+        pos = end + 1
+        if len(header) != 3 or header[-1] == b'missing':
+            blobs[path] = None
+            continue
+        size = int(header[2])
+        blobs[path] = out[pos:pos + size]
+        pos += size + 1  # содержимое завершается переводом строки
+    return blobs
+
+
+def touches(hunks, line):
+    """Попадает ли строка в интервалы (starts, ends) из changed_hunks"""
+    starts, ends = hunks
+    i = bisect_right(starts, line) - 1
+    return i >= 0 and ends[i] >= line
+
+
+def filter_diagnostics(diagnostics, hunks):
+    """Оставляет проблемы на измененных строках; проблемы без номера строки
+    (синтаксические ошибки) остаются всегда"""
+    return [d for d in diagnostics if d.line is None or touches(hunks, d.line)]
+
+
+def collect_changed(paths, extensions, ref=None, staged=False, cwd=None):
+    """Измененные файлы для проверки: (отсортированные абсолютные пути,
+    содержимое из индекса путь -> bytes или None, ханки путь -> (starts, ends)).
+
+    Без staged к измененным добавляются новые файлы, которых еще нет в git,
+    целиком. Если paths не пуст, остаются только файлы внутри этих
+    файлов/директорий.
+    """
+    root = repo_root(cwd)
+    changed = changed_hunks(ref, staged, root)
+    if not staged:
+        for rel in untracked_files(root):
+            changed.setdefault(rel, ([1], [float('inf')]))
+    hunks = {}
+    for rel, spans in changed.items():
+        if rel.endswith(extensions):
+            hunks[os.path.normpath(os.path.join(root, rel))] = (rel, spans)
+    if paths:
+        scopes = [os.path.abspath(os.path.join(cwd or '', p)) for p in paths]
+        hunks = {path: value for path, value in hunks.items()
+                 if any(path == s or path.startswith(s.rstrip(os.sep) + os.sep) for s in scopes)}
+
+    sources = None
+    if staged:
+        blobs = read_staged([rel for rel, _ in hunks.values()], root)
+        sources = {path: blobs[rel] for path, (rel, _) in hunks.items() if blobs[rel] is not None}
+        hunks = {path: value for path, value in hunks.items() if path in sources}
+    return sorted(hunks), sources, {path: spans for path, (_, spans) in hunks.items()}
@@ -0,0 +1,311 @@
+from bisect import bisect_left, bisect_right
+
+from engine import SKIP_MINIFIED, LinterEngine, is_minified
+from lexer import TokenStream, TYPE_CODES, TOKEN_REGEX, SKIP
+from parser_js import Parser, Program, compact, program_scope
+from rules import RuleDispatcher
+from suppressions import Suppressions
+
+# Сколько арен AST может накопиться после правок до переноса узлов в одну
+MAX_ARENAS = 16
+
+
+class LintState:
+    """Результат проверки файла, от которого можно продолжить после правки"""
+    def __init__(self, source, config, tokens, openers, ast, syntax_errors, rules, rule_errors,
+                 loose_refs=(), skipped=(), minified=False):
+        self.source = source
+        self.config = config
+        self.tokens = tokens
+        # Позиции незакрытых строк и блочных комментариев: лексер просматривал
+        # текст от них до конца файла, поэтому правка ниже может их закрыть
+        self.openers = openers
+        self.ast = ast
+        self.syntax_errors = syntax_errors  # [(смещение инструкции, сообщение)]
+        self.rules = rules                  # активные правила
+        self.rule_errors = rule_errors      # списки Diagnostic в порядке rules
+        self.loose_refs = loose_refs        # [(смещение инструкции, имя)] вне узлов AST
+        self.skipped = list(skipped)        # пропущенные правила, как LinterEngine.skipped
+        self.minified = minified
+        self._found = None
+        self._suppressions = None
+
+    @property
+    def suppressions(self):
+        if self._suppressions is None:
+            self._suppressions = Suppressions.from_tokens(self.tokens)
+        return self._suppressions
+
+    @property
+    def found(self):
+        """Неподавленные проблемы (diagnostics.Diagnostic), как LinterEngine.diagnostics"""
+        if self._found is None:
+            engine = LinterEngine(self.source, self.config)
+            engine.suppressions = self.suppressions
+            for _, message in self.syntax_errors:
+                engine.add_syntax_error(message)
+            for errors in self.rule_errors:
+                for diagnostic in errors:
+                    engine.add_diagnostic(diagnostic)
+            self._found = engine.diagnostics
+        return self._found
+
+    @property
+    def reports(self):
+        """Отчеты в том же виде, что и LinterEngine.reports"""
+        return [str(d) for d in self.found]
+
+    def diagnostics(self):
+        """Структурированные ошибки: словари Diagnostic.to_dict, как в JSONL/SARIF"""
+        return [d.to_dict() for d in self.found]
+
+
+def _lex(source, tokens, openers, pos=0, line_num=1, line_start=0):
+    """Как lexer.scan, но без печати ошибок и с записью незакрытых открывающих
+    последовательностей. Токен добавляется в tokens после того, как отдан наружу,
+    поэтому закрытие генератора на yield оставляет его недобавленным."""
+    for mo in TOKEN_REGEX.finditer(source, pos):
+        kind = mo.lastgroup
+        start = mo.start()
+        if kind == 'NEWLINE':
+            line_start = start + 1
+            line_num += 1
+        elif kind == 'MISMATCH':
+            if source[start] in '"\'':
+                openers.append(start)
+        else:
+            if kind == 'OP' and source.startswith('/*', start):
+                openers.append(start)
+            column = start - line_start
+            yield kind, start, mo.end(), line_num, column
+            tokens.append(kind, line_num, column, start, mo.end())
+
+
+def lint_state(source, config):
+    """Полная проверка исходника, результат пригоден для relint. Как в
+    runner.lint_code, на минифицированном файле часть правил пропускается,
+    а time_budget и max_warnings ограничивают запуск правил."""
+    # Время на файл отсчитывается вместе с лексером и парсером
+    engine = LinterEngine(source, config)
+    tokens = TokenStream(source)
+    openers = []
+    for _ in _lex(source, tokens, openers):
+        pass
+    parser = Parser(tokens)
+    ast = parser.parse()
+    syntax_errors = list(zip(parser.error_offsets, parser.errors))
+
+    engine.detect_minified(source, tokens)
+    if engine.deadline is not None or engine.max_warnings is not None:
+        if engine.max_warnings is not None:
+            # Для подсчета проблем: подавленные не считаются. Такое состояние
+            # relint все равно перепроверяет целиком
+            engine.suppressions = Suppressions.from_tokens(tokens)
+            for _, message in syntax_errors:
+                engine.add_syntax_error(message)
+        active, results = engine.run_groups(tokens, ast)
+        rules = [rule for rule in active if rule in results]
+        rule_errors = [results[rule] for rule in rules]
+    else:
+        dispatcher = engine.dispatcher()
+        dispatcher.feed_tokens(tokens)
+        dispatcher.walk(ast)
+        rules, rule_errors = dispatcher.rules, dispatcher.results()
+    return LintState(source, config, tokens, openers, ast, syntax_errors,
+                     rules, rule_errors, parser.loose_refs, engine.skipped, engine.minified)
+
+
+def _shift_subtree(node, line_delta):
+    node.arena.shift_lines(node.id, line_delta)
+    if node.scope is not None:
+        for scope in node.scope.walk():
+            scope.line += line_delta
+            for name, (line, kind) in scope.declared.items():
+                scope.declared[name] = (line + line_delta, kind)
+
+
+def relint(state, offset, removed, inserted):
+    """Применяет правку (offset, длина удаленного, вставленный текст) и
+    перепроверяет только затронутую часть.
+
+    Лексер перезапускается с токена перед правкой и останавливается, как только
+    новый токен совпадет со старым (с учетом сдвига). Парсер заново разбирает
+    только задетые инструкции верхнего уровня. Локальные правила перезапускаются
+    на измененных строках, остальные (rule.local = False) - на всем файле.
+    Узлы AST после правки переиспользуются и сдвигаются на месте, поэтому
+    старое состояние после вызова использовать нельзя. Если правка меняет
+    признак минифицированного файла, при max_warnings и после пропуска правил
+    по времени файл проверяется заново целиком (lint_state).
+    """
+    old_source = state.source
+    if offset < 0 or removed < 0 or offset + removed > len(old_source):
+        raise ValueError("Edit is out of source bounds")
+
+    source = old_source[:offset] + inserted + old_source[offset + removed:]
+    config = state.config
+    if config.get('max_warnings') is not None or \
+            any(reason != SKIP_MINIFIED for _, reason in state.skipped):
+        # Какие правила запустятся, зависит от всего файла
+        return lint_state(source, config)
+    delta = len(inserted) - removed
+    old_edit_end = offset + removed
+    new_edit_end = offset + len(inserted)
+
+    # 1. Лексер: от ближайшего безопасного токена перед правкой до точки,
+    # где новый токен совпадет со старым (с учетом сдвига)
+    old = state.tokens
+    n_old = len(old)
+    r = max(bisect_left(old.ends, offset) - 1, 0) if n_old else -1
+    while r >= 0 and old.starts[r] > offset:
+        r -= 1
+    if state.openers and state.openers[0] < offset and r >= 0 and state.openers[0] < old.starts[r]:
+        r = bisect_right(old.starts, state.openers[0]) - 1
+    if r >= 0:
+        pos = old.starts[r]
+        line = old.lines[r]
+        line_start = pos - old.columns[r]
+    else:
+        r, pos, line, line_start = 0, 0, 1, 0
+
+    tokens = TokenStream(source)
+    tokens.extend_from(old, 0, r)
+    openers = [o for o in state.openers if o < pos]
+    k = r
+    sync_new = None
+    line_delta = 0
+    lex = _lex(source, tokens, openers, pos, line, line_start)
+    for kind, start, end, ln, col in lex:
+        if start > new_edit_end:
+            target = start - delta
+            while k < n_old and old.starts[k] < target:
+                k += 1
+            if (k < n_old and old.starts[k] == target and old.ends[k] == end - delta
+                    and old.types[k] == TYPE_CODES[kind] and old.columns[k] == col):
+                line_delta = ln - old.lines[k]
+                sync_new = len(tokens)
+                lex.close()
+                break
+    if sync_new is not None:
+        tokens.extend_from(old, k, None, delta, line_delta)
+        sync_old_start = old.starts[k]
+        openers.extend(o + delta for o in state.openers if o >= sync_old_start)
+    if is_minified(config, source, tokens) != state.minified:
+        return lint_state(source, config)
+
+    # 2. Парсер: с конца последней незатронутой инструкции до первой
+    # инструкции после правки, на которой разбор гарантированно совпадет
+    old_nodes = state.ast.children
+    first = bisect_left([n.end_idx for n in old_nodes], pos)
+    reparse_from = old_nodes[first - 1].end_idx if first > 0 else 0
+
+    last_error = max((o for o, _ in state.syntax_errors), default=-1)
+    resume = {}
+    if sync_new is not None:
+        for i in range(first, len(old_nodes)):
+            node_start = old_nodes[i].start_idx
+            # Сообщения об ошибках содержат номера строк, их нельзя сдвинуть
+            if node_start > old_edit_end and node_start >= sync_old_start and \
+                    (line_delta == 0 or node_start > last_error):
+                resume[node_start + delta] = i
+
+    start_tok = bisect_left(tokens.starts, reparse_from)
+    parser = Parser(tokens, start=bisect_left(tokens.significant().indices, start_tok))
+    resumed_at = None
+    while True:
+        tok = parser.peek()
+        if tok is None:
+            break
+        if tok.start_idx in resume:
+            resumed_at = resume[tok.start_idx]
+            break
+        parser.parse_statement()
+
+    reparsed = parser.root.children
+    tail = old_nodes[resumed_at:] if resumed_at is not None else []
+    for node in tail:
+        node.start_idx += delta
+        node.end_idx += delta
+        if line_delta:
+            _shift_subtree(node, line_delta)
+
+    syntax_errors = [(o, m) for o, m in state.syntax_errors if o < reparse_from]
+    syntax_errors.extend(zip(parser.error_offsets, parser.errors))
+    # Ссылки вне узлов склеиваются так же, как ошибки разбора
+    loose_refs = [(o, n) for o, n in state.loose_refs if o < reparse_from]
+    loose_refs.extend(parser.loose_refs)
+    if resumed_at is not None:
+        resume_old = old_nodes[resumed_at].start_idx - delta
+        syntax_errors.extend((o + delta, m) for o, m in state.syntax_errors if o >= resume_old)
+        loose_refs.extend((o + delta, n) for o, n in state.loose_refs if o >= resume_old)
+
+    children = old_nodes[:first] + reparsed + tail
+    if len({id(node.arena) for node in children}) > MAX_ARENAS:
+        children = compact(children)
+    ast = Program(children, program_scope(children, loose_refs))
+
+    # 3. Окно измененных строк [w0, w1] в новых координатах
+    INF = float('inf')
+    a = tokens.prev_significant(r)
+    w0 = tokens.lines[a] if a >= 0 else 1
+    w1 = INF
+    if sync_new is not None:
+        s = sync_new
+        while s < len(tokens) and tokens.types[s] == SKIP:
+            s += 1
+        if s < len(tokens):
+            w1 = tokens.lines[s]
+    # Окно начинается с перезапуска парсера, а не с первого нового узла: правка
+    # могла заменить или убрать узел, начинавшийся раньше (например, при ошибке
+    # разбора), и его старые ошибки правил должны уйти
+    s = start_tok
+    while s < len(tokens) and tokens.types[s] == SKIP:
+        s += 1
+    if s < len(tokens):
+        w0 = min(w0, tokens.lines[s])
+    if reparsed:
+        w0 = min(w0, reparsed[0].line)
+        last = bisect_left(tokens.ends, parser.last_end)
+        if last < len(tokens):
+            w1 = max(w1, tokens.lines[last])
+
+    # 4. Правила
+    local_rules = [rule for rule in state.rules if rule.local]
+    global_rules = [rule for rule in state.rules if not rule.local]
+
+    lo = bisect_left(tokens.lines, w0)
+    lo = max(tokens.prev_significant(lo), 0)
+    hi = len(tokens) if w1 == INF else min(bisect_right(tokens.lines, w1) + 1, len(tokens))
+    window_nodes = []
+    for node in ast.children:
+        if node.line > w1:
+            break
+        end = bisect_left(tokens.ends, node.end_idx)
+        end_line = tokens.lines[end] if end < len(tokens) else INF
+        if end_line >= w0:
+            window_nodes.append(node)
+
+    local = RuleDispatcher(local_rules)
+    local.feed_tokens([tokens.token(i) for i in range(lo, hi)])
+    for node in window_nodes:
+        local.walk(node)
+    local_results = iter(local.results())
+
+    full = RuleDispatcher(global_rules)
+    full.feed_tokens(tokens)
+    full.walk(ast)
+    global_results = iter(full.results())
+
+    w1_old = w1 - line_delta
+    rule_errors = []
+    for rule, old_errors in zip(state.rules, state.rule_errors):
+        if not rule.local:
+            rule_errors.append(next(global_results))
+            continue
+        fresh = next(local_results)
+        errors = [e for e in old_errors if e.line < w0]
+        errors.extend(e for e in fresh if w0 <= e.line <= w1)
+        errors.extend(e.moved(line_delta, delta) for e in old_errors if e.line > w1_old)
+        rule_errors.append(errors)
+
+    return LintState(source, config, tokens, openers, ast, syntax_errors,
+                     state.rules, rule_errors, loose_refs, state.skipped, state.minified)
@@ -1,62 +1,440 @@
 import re
+from array import array
+from itertools import accumulate, repeat
+from operator import itemgetter, sub
+
+# Типы токенов, которые попадают в поток (NEWLINE и MISMATCH не сохраняются)
+TOKEN_TYPES = ('COMMENT', 'KEYWORD', 'ID', 'NUMBER', 'STRING', 'OP', 'PUNCT', 'SKIP')
+TYPE_CODES = {name: code for code, name in enumerate(TOKEN_TYPES)}
+SKIP = TYPE_CODES['SKIP']
 
 class Token:
-    def __init__(self, type, value, line, column):
+    __slots__ = ('type', 'value', 'line', 'column', 'start_idx', 'end_idx')
+
+    def __init__(self, type, value, line, column, start_idx=0, end_idx=0):
         self.type = type
         self.value = value
         self.line = line
         self.column = column
-        self.start_idx = 0
-        self.end_idx = 0
+        self.start_idx = start_idx
+        self.end_idx = end_idx
 
     def __repr__(self):
         return f"Token({self.type}, {repr(self.value)}, line={self.line}, col={self.column})"
 
-class Lexer:
-    def __init__(self, code):
-        self.code = code
-        self.tokens = []
-        # Регулярные выражения для всех типов токенов JavaScript
-        self.token_specification = [
-            ('COMMENT',  r'//.*|/\*[\s\S]*?\*/'), # Однострочные и многострочные комментарии
-            ('KEYWORD',  r'\b(let|const|var|function|if|else|while|for|return)\b'),
-            ('ID',       r'[a-zA-Z_$][a-zA-Z0-9_$]*'), # Идентификаторы
-            ('NUMBER',   r'\d+(\.\d*)?'),               # Числа
-            ('STRING',   r'"[^"]*"|\'[^\']*\''),       # Строки
-            ('OP',       r'[+\-*/%=<>!&|]+'),          # Операторы
-            ('PUNCT',    r'[()\[\]{},.;]'),            # Пунктуация
-            ('NEWLINE',  r'\n'),                       # Перенос строки
-            ('SKIP',     r'[ \t\r]+'),                 # Пробелы и табы
-            ('MISMATCH', r'.'),                        # Любой другой символ (ошибка)
-        ]
+class TokenStream:
+    """Компактное хранилище токенов: параллельные колонки array вместо объектов.
 
-    def tokenize(self):
-        tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in self.token_specification)
-        line_num = 1
-        line_start = 0
-        
-        for mo in re.finditer(tok_regex, self.code):
+    Значение токена не хранится, а вырезается из исходника по start/end.
+    Объекты Token создаются только при обращении и сразу отдаются сборщику.
+    """
+    def __init__(self, source):
+        self.source = source
+        self.types = array('B')
+        self.lines = array('I')
+        self.columns = array('I')
+        self.starts = array('Q')
+        self.ends = array('Q')
+        self._significant = None
+
+    def append(self, type_name, line, column, start, end):
+        self.types.append(TYPE_CODES[type_name])
+        self.lines.append(line)
+        self.columns.append(column)
+        self.starts.append(start)
+        self.ends.append(end)
+        self._significant = None
+
+    def extend_from(self, other, start, end=None, offset_delta=0, line_delta=0):
+        """Копирует токены other[start:end], сдвигая смещения и номера строк"""
+        self.types.extend(other.types[start:end])
+        self.columns.extend(other.columns[start:end])
+        if line_delta:
+            self.lines.extend(array('I', [x + line_delta for x in other.lines[start:end]]))
+        else:
+            self.lines.extend(other.lines[start:end])
+        if offset_delta:
+            self.starts.extend(array('Q', [x + offset_delta for x in other.starts[start:end]]))
+            self.ends.extend(array('Q', [x + offset_delta for x in other.ends[start:end]]))
+        else:
+            self.starts.extend(other.starts[start:end])
+            self.ends.extend(other.ends[start:end])
+        self._significant = None
+
+    def __len__(self):
+        return len(self.types)
+
+    def token(self, i):
+        start = self.starts[i]
+        end = self.ends[i]
+        return Token(TOKEN_TYPES[self.types[i]], self.source[start:end],
+                     self.lines[i], self.columns[i], start, end)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.token(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("token index out of range")
+        return self.token(i)
+
+    def __iter__(self):
+        for i in range(len(self.types)):
+            yield self.token(i)
+
+    def type_of(self, i):
+        return TOKEN_TYPES[self.types[i]]
+
+    def value_of(self, i):
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def prev_significant(self, i):
+        """Индекс ближайшего предыдущего не-SKIP токена или -1"""
+        types = self.types
+        i -= 1
+        while i >= 0 and types[i] == SKIP:
+            i -= 1
+        return i
+
+    def significant(self):
+        """Представление потока без SKIP токенов (индексы считаются один раз)"""
+        if self._significant is None:
+            types = self.types
+            indices = array('Q', (i for i in range(len(types)) if types[i] != SKIP))
+            self._significant = SignificantTokens(self, indices)
+        return self._significant
+
+class SignificantTokens:
+    """Значимые токены потока; поддерживает len, индексацию и итерацию как список"""
+    # Парсер чередует peek(0), peek(1) и advance() на соседних номерах:
+    # кольцо из RING последних токенов строит каждый токен один раз
+    RING = 8
+
+    def __init__(self, stream, indices):
+        self.stream = stream
+        self.indices = indices
+        self._ring_index = [-1] * self.RING
+        self._ring_token = [None] * self.RING
+
+    def __len__(self):
+        return len(self.indices)
+
+    def get(self, i):
+        """Токен с номером i >= 0 или None за концом"""
+        slot = i & (self.RING - 1)
+        if self._ring_index[slot] == i:
+            return self._ring_token[slot]
+        indices = self.indices
+        if i >= len(indices):
+            return None
+        tok = self.stream.token(indices[i])
+        self._ring_index[slot] = i
+        self._ring_token[slot] = tok
+        return tok
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.stream.token(j) for j in self.indices[i]]
+        if i < 0:
+            i += len(self.indices)
+        if not 0 <= i < len(self.indices):
+            raise IndexError("token index out of range")
+        return self.get(i)
+
+    def __iter__(self):
+        token = self.stream.token
+        for j in self.indices:
+            yield token(j)
+
+# Регулярные выражения для всех типов токенов JavaScript
+TOKEN_SPECIFICATION = [
+    ('COMMENT',  r'//.*|/\*[\s\S]*?\*/'), # Однострочные и многострочные комментарии
+    ('KEYWORD',  r'\b(let|const|var|function|if|else|while|for|return)\b'),
+    ('ID',       r'[a-zA-Z_$][a-zA-Z0-9_$]*'), # Идентификаторы
+    ('NUMBER',   r'\d+(?:\.\d*)?'),             # Числа
+    ('STRING',   r'"[^"]*"|\'[^\']*\''),       # Строки
+    ('OP',       r'[+\-*/%=<>!&|]+'),          # Операторы
+    ('PUNCT',    r'[()\[\]{},.;]'),            # Пунктуация
+    ('NEWLINE',  r'\n'),                       # Перенос строки
+    ('SKIP',     r'[ \t\r]+'),                 # Пробелы и табы
+    ('MISMATCH', r'.'),                        # Любой другой символ (ошибка)
+]
+
+# Компилируется один раз при импорте, а не при каждом вызове tokenize
+TOKEN_REGEX = re.compile('|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPECIFICATION))
+# Та же регулярка для байтов (mmap). Для ASCII-текста \b и \d дают то же, что
+# и в str; для остального текста байтовый разбор не используется
+TOKEN_REGEX_BYTES = re.compile(TOKEN_REGEX.pattern.encode('ascii'))
+NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+def scan(text, pos=0, line_num=1, line_start=0, endpos=None):
+    """Базовый проход регулярки: отдает (kind, start, end, line, column).
+
+    NEWLINE не отдается, MISMATCH сообщается в stdout и пропускается.
+    pos/line_num/line_start позволяют начать разбор с середины текста.
+    """
+    matches = TOKEN_REGEX.finditer(text, pos) if endpos is None else TOKEN_REGEX.finditer(text, pos, endpos)
+    for mo in matches:
+        kind = mo.lastgroup
+        start_idx = mo.start()
+
+        if kind == 'NEWLINE':
+            line_start = start_idx + 1
+            line_num += 1
+        elif kind == 'MISMATCH':
+            print(f"Lexical Error: Unexpected character {repr(mo.group())} at line {line_num}")
+        else:
+            yield kind, start_idx, mo.end(), line_num, start_idx - line_start
+
+def _is_incomplete(buffer, mo):
+    """Может ли совпадение измениться, если дочитать следующий фрагмент"""
+    if mo.end() == len(buffer):
+        return True
+    start = mo.start()
+    kind = mo.lastgroup
+    # Незакрытый блочный комментарий или строка разбираются как OP/MISMATCH,
+    # но с продолжением текста стали бы одним токеном
+    if kind != 'COMMENT' and buffer.startswith('/*', start):
+        return True
+    if kind != 'STRING' and buffer[start] in '"\'':
+        return True
+    return False
+
+def iter_chunk_tokens(chunks):
+    """Потоковый лексер: разбирает текст, поступающий фрагментами.
+
+    Токен на границе фрагментов придерживается до следующего фрагмента,
+    поэтому ни один токен не разрезается. В памяти хранится только хвост
+    текущего фрагмента (кроме случая незакрытой строки или комментария,
+    который буферизуется до закрытия или конца ввода).
+    """
+    buffer = ''
+    base = 0          # абсолютное смещение buffer[0]
+    line_num = 1
+    line_start = 0    # абсолютное смещение начала текущей строки
+    scan_from = 0     # позиция в buffer, с которой продолжается разбор
+    chunks = iter(chunks)
+    final = False
+
+    while not final:
+        chunk = next(chunks, None)
+        if chunk is None:
+            final = True
+        else:
+            buffer += chunk
+        pos = scan_from
+        for mo in TOKEN_REGEX.finditer(buffer, scan_from):
+            if not final and _is_incomplete(buffer, mo):
+                break
             kind = mo.lastgroup
-            value = mo.group()
-            start_idx = mo.start()
-            column = start_idx - line_start
-            
+            start_idx = base + mo.start()
+            pos = mo.end()
+
             if kind == 'NEWLINE':
                 line_start = start_idx + 1
                 line_num += 1
-                continue
-            elif kind == 'SKIP':
-                token = Token(kind, value, line_num, column)
-                token.start_idx = start_idx
-                token.end_idx = mo.end()
-                self.tokens.append(token)
             elif kind == 'MISMATCH':
-                print(f"Lexical Error: Unexpected character {repr(value)} at line {line_num}")
+                print(f"Lexical Error: Unexpected character {repr(mo.group())} at line {line_num}")
             else:
-                # Основные токены
-                token = Token(kind, value, line_num, column)
-                token.start_idx = start_idx
-                token.end_idx = mo.end()
-                self.tokens.append(token)
-        
+                yield Token(kind, mo.group(), line_num, start_idx - line_start, start_idx, base + pos)
+
+        # Один уже разобранный символ остается в буфере как контекст для \b
+        keep = max(pos - 1, 0)
+        buffer = buffer[keep:]
+        base += keep
+        scan_from = pos - keep
+
+def iter_buffer_tokens(buf):
+    """Ленивый лексер поверх байтового буфера с ASCII-текстом (например, mmap).
+
+    Регулярка идет прямо по буферу, текст целиком не копируется и не
+    декодируется: строкой становится только значение каждого токена.
+    Смещения - байтовые, для ASCII они совпадают с символьными.
+    """
+    line_num = 1
+    line_start = 0
+    for mo in TOKEN_REGEX_BYTES.finditer(buf):
+        kind = mo.lastgroup
+        start_idx = mo.start()
+
+        if kind == 'NEWLINE':
+            line_start = start_idx + 1
+            line_num += 1
+        elif kind == 'MISMATCH':
+            print(f"Lexical Error: Unexpected character {repr(mo.group().decode('ascii'))} at line {line_num}")
+        else:
+            yield Token(kind, mo.group().decode('ascii'), line_num, start_idx - line_start,
+                        start_idx, mo.end())
+
+# Быстрый бэкенд: одна группа на весь токен, ключевые слова не отдельная
+# альтернатива, а проверка идентификатора по множеству. Многострочный
+# комментарий развернут без ленивого квантификатора - он ищет '*/' с
+# каждого символа; совпадения те же.
+KEYWORDS = frozenset(('let', 'const', 'var', 'function', 'if', 'else', 'while', 'for', 'return'))
+FAST_COMMENT = r'//.*|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
+# Кроме COMMENT и OP ('/') и MISMATCH альтернативы начинаются с разных
+# символов, поэтому их можно перебирать в порядке частоты, а не как в
+# TOKEN_SPECIFICATION
+FAST_ORDER = ('ID', 'SKIP', 'PUNCT', 'COMMENT', 'OP', 'NEWLINE', 'NUMBER', 'STRING', 'MISMATCH')
+FAST_TOKEN_REGEX = re.compile('(%s)' % '|'.join(
+    FAST_COMMENT if name == 'COMMENT' else dict(TOKEN_SPECIFICATION)[name] for name in FAST_ORDER))
+IDENT_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$')
+_NEWLINE, _MISMATCH, _SLASH, _QUOTE = 250, 251, 252, 253
+
+
+def _first_char_table():
+    """Класс токена по первому символу (bytes.translate по первым символам)"""
+    table = bytearray([_MISMATCH]) * 256
+    classes = (
+        ('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_$', TYPE_CODES['ID']),
+        ('0123456789', TYPE_CODES['NUMBER']),
+        ('+-*%=<>!&|', TYPE_CODES['OP']),
+        ('()[]{},.;', TYPE_CODES['PUNCT']),
+        (' \t\r', SKIP),
+        ('\n', _NEWLINE),
+        ('/', _SLASH),        # комментарий или оператор
+        ('"\'', _QUOTE),     # строка или незакрытая кавычка
+    )
+    for chars, code in classes:
+        for char in chars:
+            table[ord(char)] = code
+    return bytes(table)
+
+
+FIRST_CHAR_CLASS = _first_char_table()
+_KEYWORD_CODES = {word: TYPE_CODES['KEYWORD'] for word in KEYWORDS}
+_DROPPED = bytes((_NEWLINE, _MISMATCH))
+
+
+def _positions(data, code):
+    """Индексы байта code в data (поиск идет в C)"""
+    found = []
+    i = data.find(code)
+    while i >= 0:
+        found.append(i)
+        i = data.find(code, i + 1)
+    return found
+
+
+def _is_word(char):
+    """Символ слова для \\b в str-регулярке: буква или цифра любого алфавита, '_'"""
+    return char.isalnum() or char == '_'
+
+
+def _keyword_before_dollar(code):
+    pos = code.find('$')
+    while pos >= 0:
+        for word in KEYWORDS:
+            start = pos - len(word)
+            if start >= 0 and code.startswith(word, start) and (
+                    start == 0 or not (code[start - 1] in IDENT_CHARS or _is_word(code[start - 1]))):
+                return True
+        pos = code.find('$', pos + 1)
+    return False
+
+
+def fast_tokenize(code):
+    """Быстрый бэкенд Lexer: тот же TokenStream и те же сообщения, что у scan.
+
+    Регулярка только режет текст на токены (findall), тип определяется по
+    первому символу через таблицу, ключевые слова - по frozenset. Строки и
+    колонки считаются не на каждый токен, а отрезками между токенами NEWLINE.
+    Не-ASCII символы правятся на месте: цифры других алфавитов начинают
+    NUMBER (\\d в str их понимает), а ключевое слово рядом с буквой не-ASCII
+    остается ID (\\b в str считает ее частью слова). Возвращает None только
+    для ключевого слова перед '$' (let$x - это KEYWORD и ID, а не один
+    идентификатор): тогда результат мог бы разойтись с регуляркой.
+    """
+    if _keyword_before_dollar(code):
+        return None
+    stream = TokenStream(code)
+    toks = FAST_TOKEN_REGEX.findall(code)
+    if not toks:
+        return stream
+    is_ascii = code.isascii()
+    # Не-ASCII первый символ становится '?' - это MISMATCH в таблице
+    classes = ''.join(map(itemgetter(0), toks)).encode('ascii', 'replace').translate(FIRST_CHAR_CLASS)
+    types = bytearray(map(_KEYWORD_CODES.get, toks, classes))
+    if not is_ascii:
+        for i in _positions(types, _MISMATCH):
+            if toks[i][0].isdecimal():
+                types[i] = TYPE_CODES['NUMBER']
+    for i in _positions(types, _SLASH):
+        tok = toks[i]
+        is_comment = tok.startswith('//') or (tok.startswith('/*') and len(tok) >= 4 and tok.endswith('*/'))
+        types[i] = TYPE_CODES['COMMENT'] if is_comment else TYPE_CODES['OP']
+    for i in _positions(types, _QUOTE):
+        types[i] = TYPE_CODES['STRING'] if len(toks[i]) > 1 else _MISMATCH
+    # \b перед ключевым словом не срабатывает сразу после цифры: 1let - NUMBER и ID
+    after_number = bytes((TYPE_CODES['NUMBER'], TYPE_CODES['KEYWORD']))
+    for i in _positions(types, after_number):
+        if toks[i][-1] != '.':
+            types[i + 1] = TYPE_CODES['ID']
+    starts = list(accumulate(map(len, toks), initial=0))
+    if not is_ascii:
+        # Буква или цифра не-ASCII вплотную к ключевому слову: \b не срабатывает
+        for i in _positions(types, TYPE_CODES['KEYWORD']):
+            start, end = starts[i], starts[i + 1]
+            if (start > 0 and _is_word(code[start - 1])) or (end < len(code) and _is_word(code[end])):
+                types[i] = TYPE_CODES['ID']
+
+    # Строку меняют только токены NEWLINE (как в scan: переводы строк внутри
+    # комментариев и строк номер не сдвигают); ошибки печатаются по порядку
+    events = _positions(types, _NEWLINE)
+    mismatches = set(_positions(types, _MISMATCH)) if _MISMATCH in types else None
+    if mismatches:
+        events = sorted(events + list(mismatches))
+    events.append(len(toks))
+
+    out_lines, out_columns = stream.lines, stream.columns
+    out_starts, out_ends = stream.starts, stream.ends
+    line_num = 1
+    line_start = 0
+    seg = 0
+
+    for i in events:
+        # Токены seg..i-1 лежат на одной строке
+        if i > seg:
+            part = starts[seg:i]
+            out_starts.extend(part)
+            out_ends.extend(starts[seg + 1:i + 1])
+            out_lines.extend(repeat(line_num, i - seg))
+            out_columns.extend(map(sub, part, repeat(line_start)) if line_start else part)
+        if mismatches and i in mismatches:
+            print(f"Lexical Error: Unexpected character {repr(toks[i])} at line {line_num}")
+        else:
+            line_num += 1
+            line_start = starts[i] + 1
+        seg = i + 1
+    stream.types = array('B', types.translate(None, _DROPPED))
+    return stream
+
+
+class Lexer:
+    BACKENDS = ('regex', 'fast')
+
+    def __init__(self, code, backend='regex'):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown lexer backend: {backend!r}")
+        self.code = code
+        self.backend = backend
+        self.tokens = TokenStream(code)
+        self.token_specification = TOKEN_SPECIFICATION
+
+    def tokenize(self):
+        if self.backend == 'fast':
+            tokens = fast_tokenize(self.code)
+            if tokens is not None:
+                self.tokens = tokens
+                return tokens
+        append = self.tokens.append
+        for kind, start, end, line, column in scan(self.code):
+            append(kind, line, column, start, end)
         return self.tokens
+
+    def iter_tokens(self):
+        """Ленивый вариант tokenize: токены отдаются по мере разбора"""
+        code = self.code
+        for kind, start, end, line, column in scan(code):
+            yield Token(kind, code[start:end], line, column, start, end)
@@ -1,78 +1,310 @@
 import sys
 import os
+import glob
 import argparse
-from config import Config
-from lexer import Lexer
-from parser_js import Parser
-from engine import LinterEngine
-from fixer import Fixer
+from config import CONFIG_FILENAME, Config, ConfigResolver, load_settings
+from cache import LintCache
+from runner import collect_files, lint_files, JS_EXTENSIONS
+from pipeline import lint_files_async
+from project_index import INDEX_FILENAME, ProjectIndex
+from gitdiff import GitError, collect_changed, filter_diagnostics
+from reporters import REPORTERS
+from timing import Timings
+
+def flag_settings(args):
+    """Настройки из флагов командной строки"""
+    settings = {}
+    if args.fix:
+        settings['autofix'] = True
+    if args.time_budget is not None:
+        settings['time_budget'] = args.time_budget
+    if args.max_warnings is not None:
+        # Проверку файла, где предупреждений уже больше, продолжать незачем
+        settings['max_warnings'] = args.max_warnings
+    return settings
+
+
+def make_config(args):
+    """Настройки из --config и флагов важнее .jslintrc.json"""
+    explicit = load_settings(args.config)
+    explicit.update(flag_settings(args))
+    if args.no_config_lookup:
+        return Config.from_settings(explicit)
+    return ConfigResolver(explicit)
+
 
 def main():
     parser = argparse.ArgumentParser(
         prog='js_linter',
-        description='JS Linter: Анализ синтаксиса, стиля и сложности JavaScript кода', 
+        description='JS Linter: Анализ синтаксиса, стиля и сложности JavaScript кода',
         formatter_class=argparse.RawTextHelpFormatter
     )
 
     parser.add_argument(
-        '--fix', 
-        action='store_true', 
+        'paths',
+        nargs='*',
+        help='Файлы, директории или glob-шаблоны (например, "src/**/*.js")'
+    )
+
+    parser.add_argument(
+        '--config',
+        help='Путь к JSON файлу с настройками'
+    )
+
+    parser.add_argument(
+        '--no-config-lookup',
+        action='store_true',
+        help=f'Не искать {CONFIG_FILENAME} в директориях проверяемых файлов'
+    )
+
+    parser.add_argument(
+        '--fix',
+        action='store_true',
         help='Включить автоматическое исправление ошибок'
     )
 
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=0,
+        help='Количество процессов-воркеров (0 - по числу CPU)'
+    )
+
+    parser.add_argument(
+        '--ignore-pattern',
+        metavar='GLOB',
+        action='append',
+        default=[],
+        help='Пропускать файлы и директории по шаблону пути или имени (можно повторять)'
+    )
+
+    parser.add_argument(
+        '--async-io',
+        action='store_true',
+        help='Обходить директории и читать файлы асинхронно, одновременно с проверкой\n'
+             '(для сетевых дисков); отчеты выводятся по мере готовности'
+    )
+
+    parser.add_argument(
+        '--project-index',
+        action='store_true',
+        help='Построить индекс имен верхнего уровня по всем файлам (хранится в кэше,\n'
+             'обновляется по хэшам) и проверять межфайловые правила: функции, которые\n'
+             'нигде не вызываются, и переменные, используемые в других файлах'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Следить за файлами (опрос mtime/размера) и выводить изменения отчетов'
+    )
+
+    parser.add_argument(
+        '--time-budget',
+        metavar='SECONDS',
+        type=float,
+        help='Время на файл: правила запускаются от дешевых к дорогим, не успевшие\n'
+             'пропускаются (и перечисляются в отчете)'
+    )
+
+    parser.add_argument(
+        '--max-warnings',
+        metavar='N',
+        type=int,
+        help='Остановиться, как только найдено больше N проблем (код возврата 1)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Не использовать кэш результатов'
+    )
+
+    parser.add_argument(
+        '--cache-location',
+        default=LintCache.DEFAULT_LOCATION,
+        help=f'Директория кэша (по умолчанию {LintCache.DEFAULT_LOCATION})'
+    )
+
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument(
+        '--changed-since',
+        metavar='REF',
+        help='Проверять только файлы и строки, измененные относительно REF (git)'
+    )
+
+    changes.add_argument(
+        '--staged',
+        action='store_true',
+        help='Проверять только подготовленные к коммиту изменения (содержимое из индекса git)'
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=sorted(REPORTERS),
+        default='text',
+        help='Формат вывода: text, jsonl (JSON Lines) или sarif (SARIF 2.1.0)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        metavar='FILE',
+        help='Записать отчет в файл вместо stdout'
+    )
+
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help='Вывести время стадий и правил по всем файлам'
+    )
+
+    parser.add_argument(
+        '--trace',
+        metavar='FILE',
+        help='Записать Chrome trace (JSON) с замерами по файлам'
+    )
+
+    parser.add_argument(
+        '--server',
+        action='store_true',
+        help='Режим сервера: JSON-RPC запросы построчно через stdin/stdout'
+    )
+
+    parser.add_argument(
+        '--socket',
+        help='Для --server: слушать Unix-сокет вместо stdin/stdout'
+    )
+
     args = parser.parse_args()
 
-    if not args.path:
+    if args.server:
+        from server import LintServer
+        server = LintServer(args.config, flag_settings(args), lookup=not args.no_config_lookup)
+        if args.socket:
+            server.serve_unix(args.socket)
+        else:
+            server.serve_stdio()
+        return 0
+
+    # Машиночитаемый вывод не смешиваем со служебными сообщениями
+    log = sys.stdout if args.format == 'text' else sys.stderr
+
+    git_mode = args.changed_since is not None or args.staged
+    if not args.paths and not git_mode:
         parser.print_help()
-        return
+        return 0
 
-    js_file_path = args.path
-    config_path = args.config
+    if git_mode and args.fix:
+        # Исправления затронули бы и строки вне измененных ханков
+        print("Error: --fix cannot be combined with --staged or --changed-since.", file=log)
+        return 2
 
-    if not os.path.exists(js_file_path):
-        print(f"Error: File {js_file_path} not found.")
-        return
+    if args.watch:
+        if git_mode or args.fix or args.project_index:
+            print("Error: --watch cannot be combined with --fix, --staged, --changed-since "
+                  "or --project-index.", file=log)
+            return 2
+        from watch import Watcher
+        watcher = Watcher(args.paths, lambda: make_config(args), args.ignore_pattern,
+                          config_files=[args.config])
+        watcher.run()
+        return 0
 
-    config = Config(config_path)
-    
-    if args.fix:
-        config.data['autofix'] = True
+    missing = [p for p in args.paths if not glob.has_magic(p) and not os.path.exists(p)]
+    for path in missing:
+        print(f"Error: File {path} not found.", file=log)
+
+    files = sources = hunks = None
+    if git_mode:
+        try:
+            files, sources, hunks = collect_changed(args.paths, JS_EXTENSIONS,
+                                                    args.changed_since, args.staged)
+        except GitError as e:
+            print(f"Error: {e}", file=log)
+            return 2
+        if not files:
+            print("No changed JavaScript files.", file=log)
+            return 2 if missing else 0
+    elif not args.async_io:
+        files = collect_files(args.paths, args.ignore_pattern)
+        if not files:
+            if not missing:
+                print("Error: No JavaScript files found.", file=log)
+            return 2
 
-    with open(js_file_path, 'r', encoding='utf-8') as f:
-        original_code = f.read()
+    # Резолвер передается воркерам один раз, а каждый воркер запоминает разрешенные директории
+    config = make_config(args)
 
-    lexer = Lexer(original_code)
-    tokens = lexer.tokenize()
+    cache = None if args.no_cache else LintCache(args.cache_location)
 
-    parser = Parser(tokens)
-    ast = parser.parse()
+    index = None
+    if args.project_index:
+        # В git-режиме проверяются измененные файлы, но ссылки нужны со всего проекта
+        index_files = files if files is not None and not git_mode else \
+            collect_files(args.paths or ['.'], args.ignore_pattern)
+        index_path = None if cache is None else os.path.join(cache.location, INDEX_FILENAME)
+        index = ProjectIndex.load(index_path) if index_path else ProjectIndex()
+        index.update(index_files, args.jobs)
+        if index_path:
+            index.save(index_path)
 
-    fixer = None
-    if config.get('autofix'):
-        fixer = Fixer(original_code)
+    timing = 'trace' if args.trace else 'summary' if args.timings else None
+    totals = Timings(trace=bool(args.trace))
 
-    engine = LinterEngine(original_code, config)
-    
-    for parse_error in parser.errors:
-        engine.reports.append(f"[SYNTAX ERROR] {parse_error}")
+    try:
+        output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    except OSError as e:
+        print(f"Error: Could not open output file: {e}", file=log)
+        return 2
+    reporter = REPORTERS[args.format](output)
 
-    engine.run(tokens, ast, fixer)
+    has_issues = False
+    checked = 0
+    warnings = 0
+    try:
+        reporter.start()
+        if files is None:
+            # Обход директорий и чтение файлов идут одновременно с проверкой
+            results = lint_files_async(args.paths, config, args.jobs, cache, timing,
+                                       args.ignore_pattern, index=index)
+        else:
+            results = lint_files(files, config, args.jobs, cache, timing, sources, index)
+        for result in results:
+            checked += 1
+            if result.timings is not None:
+                totals.merge(result.timings)
+            if hunks is not None:
+                # В git-режиме важны только измененные строки
+                result.diagnostics = filter_diagnostics(result.diagnostics, hunks[result.path])
+            if result.error or result.diagnostics:
+                has_issues = True
+            reporter.file(result)
+            warnings += len(result.diagnostics)
+            if args.max_warnings is not None and warnings > args.max_warnings:
+                results.close()
+                print(f"\nToo many warnings ({warnings}, maximum allowed {args.max_warnings}); "
+                      f"stopped after {checked} files.", file=log)
+                break
+        reporter.finish()
+    finally:
+        if output is not sys.stdout:
+            output.close()
 
-    print(f"\nLinting Report for: {js_file_path}")
-    if not engine.reports:
-        print("Success: No style issues found.")
-    else:
-        for report in engine.reports:
-            print(report)
+    if not checked and files is None:
+        if not missing:
+            print("Error: No JavaScript files found.", file=log)
+        return 2
 
-    if fixer and config.get('autofix') and fixer.fixes:
-        new_code = fixer.apply()
-        try:
-            with open(js_file_path, 'w', encoding='utf-8') as f:
-                f.write(new_code)
-            print(f"\n[FIXER] Applied {len(fixer.fixes)} fixes automatically.")
-        except Exception as e:
-            print(f"\n[FIXER] Error saving changes: {e}")
+    if cache is not None:
+        cache.prune()
+
+    if args.timings:
+        print("\n" + totals.summary(), file=log)
+    if args.trace:
+        totals.write_trace(args.trace)
+        print(f"\nTrace written to {args.trace}", file=log)
+
+    return 1 if has_issues else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
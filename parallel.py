@@ -0,0 +1,201 @@
+import re
+from array import array
+
+from lexer import TokenStream, TOKEN_REGEX
+from parser_js import Node, Parser, Program, Scope, program_scope
+
+# Размер фрагмента по умолчанию; граница ищется не раньше этого смещения
+CHUNK_SIZE = 2 * 1024 * 1024
+# Граница - начало строки с идентификатором/ключевым словом в колонке 0 после
+# строки, закончившейся на ';' или '}': почти всегда начало инструкции верхнего уровня
+BOUNDARY_REGEX = re.compile(r'[;}][ \t\r]*\n(?=[A-Za-z_$])')
+LINE_IN_MESSAGE = re.compile(r' at line (\d+)$')
+
+
+def find_boundaries(code, chunk_size=CHUNK_SIZE):
+    """Смещения начал фрагментов и конец текста: [0, b1, ..., len(code)]"""
+    bounds = [0]
+    pos = chunk_size
+    while pos < len(code):
+        match = BOUNDARY_REGEX.search(code, pos)
+        if match is None:
+            break
+        bounds.append(match.end())
+        pos = match.end() + chunk_size
+    bounds.append(len(code))
+    return bounds
+
+
+def lex_fragment(text, line_num):
+    """Лексер фрагмента: как lexer.scan, но ошибки возвращаются, а не печатаются.
+    open_end - во фрагменте есть незакрытая строка или блочный комментарий."""
+    tokens = TokenStream(text)
+    append = tokens.append
+    mismatches = []
+    open_end = False
+    line_start = 0
+    newlines = 0
+    for mo in TOKEN_REGEX.finditer(text):
+        kind = mo.lastgroup
+        start = mo.start()
+        if kind == 'NEWLINE':
+            line_start = start + 1
+            line_num += 1
+            newlines += 1
+        elif kind == 'MISMATCH':
+            char = mo.group()
+            mismatches.append((line_num, char))
+            open_end = open_end or char in '"\''
+        else:
+            if kind == 'OP' and '/*' in mo.group():
+                open_end = True
+            append(kind, line_num, start - line_start, start, mo.end())
+    return tokens, mismatches, newlines, open_end
+
+
+def _pack_nodes(nodes):
+    """Узлы верхнего уровня для передачи из воркера: сами узлы лежат в
+    колонках арены, а дерево областей упаковано в плоский список (прямой
+    порядок, число детей) - pickle глубоких деревьев упирается в лимит
+    рекурсии, плоский список - нет"""
+    return [(node.id, node.start_idx, node.end_idx,
+             [(s.kind, s.line, s.declared, s.refs, len(s.children)) for s in node.scope.walk()])
+            for node in nodes]
+
+
+def _unpack(flat, make, attach):
+    roots = []
+    stack = []  # [узел, сколько детей еще ожидается]
+    for item in flat:
+        node, count = make(item)
+        if stack:
+            attach(stack[-1][0], node)
+            stack[-1][1] -= 1
+        else:
+            roots.append(node)
+        if count:
+            stack.append([node, count])
+        while stack and stack[-1][1] == 0:
+            stack.pop()
+    return roots
+
+
+def _make_scope(item):
+    kind, line, declared, refs, count = item
+    scope = Scope(kind, line)
+    scope.declared = declared
+    scope.refs = refs
+    return scope, count
+
+
+def _attach_scope(parent, scope):
+    scope.parent = parent
+    parent.children.append(scope)
+
+
+def _unpack_nodes(arena, packed):
+    return [Node(arena, id, start, end, _unpack(packed_scope, _make_scope, _attach_scope)[0])
+            for id, start, end, packed_scope in packed]
+
+
+def lex_parse_chunk(text, offset, line_num):
+    """Задача воркера: лексер и парсер одного фрагмента.
+
+    Смещения сразу переводятся в координаты всего файла; номера строк
+    считаются от line_num и при необходимости сдвигаются при склейке.
+    """
+    tokens, mismatches, newlines, open_end = lex_fragment(text, line_num)
+    parser = Parser(tokens)
+    ast = parser.parse()
+
+    for node in ast.children:
+        node.start_idx += offset
+        node.end_idx += offset
+    columns = (tokens.types, tokens.lines, tokens.columns,
+               array('Q', [x + offset for x in tokens.starts]),
+               array('Q', [x + offset for x in tokens.ends]))
+    return {
+        'columns': columns,
+        'arena': parser.arena,
+        'nodes': _pack_nodes(ast.children),
+        'errors': parser.errors,
+        'error_offsets': [o + offset for o in parser.error_offsets],
+        'loose_refs': [(o + offset, name) for o, name in parser.loose_refs],
+        'mismatches': mismatches,
+        'line_num': line_num,
+        'newlines': newlines,
+        # На границе не должно быть ни незакрытой конструкции лексера, ни
+        # инструкции, которой не хватило токенов
+        'closed': not open_end and not parser.cut_off,
+    }
+
+
+def _shift_lines(chunk, delta):
+    types, lines, columns, starts, ends = chunk['columns']
+    chunk['columns'] = (types, array('I', [x + delta for x in lines]), columns, starts, ends)
+    lines = chunk['arena'].lines
+    for i in range(len(lines)):
+        lines[i] += delta
+    for node in chunk['nodes']:
+        for scope in node.scope.walk():
+            scope.line += delta
+            for name, (line, kind) in scope.declared.items():
+                scope.declared[name] = (line + delta, kind)
+    chunk['errors'] = [LINE_IN_MESSAGE.sub(lambda m: f" at line {int(m.group(1)) + delta}", e)
+                       for e in chunk['errors']]
+    chunk['mismatches'] = [(line + delta, char) for line, char in chunk['mismatches']]
+
+
+def parse_parallel(code, pool, chunk_size=CHUNK_SIZE):
+    """Лексер и парсер одного большого файла по фрагментам в пуле процессов.
+
+    Возвращает (TokenStream, Program, ошибки разбора, их смещения) - то же,
+    что дал бы последовательный Lexer/Parser. Если граница оказалась внутри
+    строки, комментария или инструкции, соседние фрагменты склеиваются и
+    разбираются заново в текущем процессе. Лексические ошибки печатаются
+    по порядку, как это делает обычный лексер.
+    """
+    bounds = find_boundaries(code, chunk_size)
+    spans = list(zip(bounds, bounds[1:]))
+    futures = []
+    line_num = 1
+    for start, end in spans:
+        futures.append(pool.submit(lex_parse_chunk, code[start:end], start, line_num))
+        # Предположение: все переводы строк - токены NEWLINE; иначе сдвиг при склейке
+        line_num += code.count('\n', start, end)
+
+    tokens = TokenStream(code)
+    ast = Program()
+    errors, error_offsets, loose_refs = [], [], []
+    line_num = 1
+    i = 0
+    while i < len(spans):
+        chunk = futures[i].result()
+        start = spans[i][0]
+        j = i
+        while not chunk['closed'] and j + 1 < len(spans):
+            j += 1
+            chunk = lex_parse_chunk(code[start:spans[j][1]], start, chunk['line_num'])
+        for k in range(i + 1, j + 1):
+            futures[k].cancel()
+        chunk['nodes'] = _unpack_nodes(chunk['arena'], chunk['nodes'])
+
+        if chunk['line_num'] != line_num:
+            _shift_lines(chunk, line_num - chunk['line_num'])
+        for line, char in chunk['mismatches']:
+            print(f"Lexical Error: Unexpected character {repr(char)} at line {line}")
+        types, lines, columns, starts, ends = chunk['columns']
+        tokens.types.extend(types)
+        tokens.lines.extend(lines)
+        tokens.columns.extend(columns)
+        tokens.starts.extend(starts)
+        tokens.ends.extend(ends)
+        ast.children.extend(chunk['nodes'])
+        errors.extend(chunk['errors'])
+        error_offsets.extend(chunk['error_offsets'])
+        loose_refs.extend(chunk['loose_refs'])
+        line_num += chunk['newlines']
+        i = j + 1
+
+    ast.scope = program_scope(ast.children, loose_refs)
+    return tokens, ast, errors, error_offsets
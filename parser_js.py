@@ -1,28 +1,353 @@
+from array import array
+from collections import deque
+
+from lexer import TokenStream
+
+NODE_TYPES = ('Program', 'VariableDeclaration', 'Function', 'Param', 'ControlStructure')
+NODE_CODES = {name: code for code, name in enumerate(NODE_TYPES)}
+CONTROL = NODE_CODES['ControlStructure']
+NO_NODE = -1
+
+
+class NodeArena:
+    """Узлы AST в колонках array (struct of arrays); узел - целый индекс.
+
+    Парсер добавляет узлы в прямом порядке (родитель раньше потомков), поэтому
+    поддерево узла - отрезок индексов [node, subtree_end(node)), а обходы -
+    циклы по индексам без объектов на каждый узел.
+    """
+    __slots__ = ('types', 'values', 'lines', 'complexity', 'first_child', 'next_sibling',
+                 'last_child', 'totals', 'nesting')
+
+    def __init__(self):
+        self.types = array('B')
+        self.values = []
+        self.lines = array('I')
+        self.complexity = array('I')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.last_child = array('i')
+        # Агрегаты поддерева (см. aggregate): суммарная сложность и наибольшая
+        # вложенность управляющих конструкций; -1 - еще не посчитаны
+        self.totals = array('i')
+        self.nesting = array('i')
+
+    def __len__(self):
+        return len(self.types)
+
+    def add(self, type, value=None, line=0, complexity=0, parent=NO_NODE):
+        node = len(self.types)
+        self.types.append(NODE_CODES[type])
+        self.values.append(value)
+        self.lines.append(line)
+        self.complexity.append(complexity)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.last_child.append(NO_NODE)
+        self.totals.append(-1)
+        self.nesting.append(-1)
+        if parent != NO_NODE:
+            self.add_child(parent, node)
+        return node
+
+    def add_child(self, parent, child):
+        last = self.last_child[parent]
+        if last == NO_NODE:
+            self.first_child[parent] = child
+        else:
+            self.next_sibling[last] = child
+        self.last_child[parent] = child
+
+    def truncate(self, size):
+        """Отбрасывает узлы с индексами от size (инструкция с ошибкой разбора)"""
+        for column in (self.types, self.values, self.lines, self.complexity, self.first_child,
+                       self.next_sibling, self.last_child, self.totals, self.nesting):
+            del column[size:]
+
+    def children(self, node):
+        result = []
+        child = self.first_child[node]
+        while child != NO_NODE:
+            result.append(child)
+            child = self.next_sibling[child]
+        return result
+
+    def subtree_end(self, node):
+        last_child = self.last_child
+        while last_child[node] != NO_NODE:
+            node = last_child[node]
+        return node + 1
+
+    def copy_subtree(self, other, node):
+        """Копирует поддерево node из арены other в конец этой; возвращает новый индекс"""
+        end = other.subtree_end(node)
+        offset = len(self) - node
+        for name in ('types', 'lines', 'complexity', 'totals', 'nesting'):
+            getattr(self, name).extend(getattr(other, name)[node:end])
+        self.values.extend(other.values[node:end])
+        for name in ('first_child', 'next_sibling', 'last_child'):
+            getattr(self, name).extend(x if x == NO_NODE else x + offset
+                                       for x in getattr(other, name)[node:end])
+        return node + offset
+
+    def shift_lines(self, node, delta):
+        """Сдвигает номера строк всего поддерева node"""
+        lines = self.lines
+        for i in range(node, self.subtree_end(node)):
+            lines[i] += delta
+
+    def aggregate(self, node):
+        """Заполняет агрегаты поддерева node одним циклом по индексам в
+        обратном порядке: потомки всегда посчитаны раньше родителя"""
+        if self.totals[node] >= 0:
+            return
+        types, complexity, totals, nesting = self.types, self.complexity, self.totals, self.nesting
+        first_child, next_sibling = self.first_child, self.next_sibling
+        for i in range(self.subtree_end(node) - 1, node - 1, -1):
+            total = complexity[i]
+            deepest = 0
+            child = first_child[i]
+            while child != NO_NODE:
+                total += totals[child]
+                if nesting[child] > deepest:
+                    deepest = nesting[child]
+                child = next_sibling[child]
+            totals[i] = total
+            nesting[i] = deepest + (types[i] == CONTROL)
+
+
 class Node:
-    """Узел абстрактного синтаксического дерева (AST)"""
-    def __init__(self, type, value=None, line=None):
-        self.type = type
-        self.value = value
+    """Легкое представление узла арены: пара (арена, индекс).
+
+    Границы в исходнике (смещения символов) и область 'statement' с тем, что
+    узел объявил и на что сослался, есть только у узлов верхнего уровня -
+    тех, что хранятся в Program.children.
+    """
+    __slots__ = ('arena', 'id', 'start_idx', 'end_idx', 'scope')
+
+    def __init__(self, arena, id, start_idx=None, end_idx=None, scope=None):
+        self.arena = arena
+        self.id = id
+        self.start_idx = start_idx
+        self.end_idx = end_idx
+        self.scope = scope
+
+    @property
+    def type(self):
+        return NODE_TYPES[self.arena.types[self.id]]
+
+    @property
+    def value(self):
+        return self.arena.values[self.id]
+
+    @property
+    def line(self):
+        return self.arena.lines[self.id]
+
+    @property
+    def complexity(self):
+        return self.arena.complexity[self.id]
+
+    @property
+    def total_complexity(self):
+        total = self.arena.totals[self.id]
+        return None if total < 0 else total
+
+    @property
+    def max_nesting(self):
+        nesting = self.arena.nesting[self.id]
+        return None if nesting < 0 else nesting
+
+    @property
+    def children(self):
+        arena = self.arena
+        return [Node(arena, child) for child in arena.children(self.id)]
+
+
+class Program:
+    """Корень AST: узлы верхнего уровня по порядку. Они могут лежать в разных
+    аренах - после инкрементальной правки или склейки фрагментов."""
+    type = 'Program'
+    value = None
+    line = 1
+    complexity = 0
+    start_idx = end_idx = None
+
+    def __init__(self, children=None, scope=None):
+        self.children = children if children is not None else []
+        self.scope = scope
+        self.total_complexity = None
+        self.max_nesting = None
+
+    def count_nodes(self):
+        """Число узлов вместе с корнем"""
+        return 1 + sum(node.arena.subtree_end(node.id) - node.id for node in self.children)
+
+
+class Scope:
+    """Область видимости: объявления и ссылки, собранные парсером.
+
+    Ссылки копятся в той области, где встретилось имя, и разрешаются позже
+    (resolve), поэтому подъем var и функций учитывается. Области 'statement' -
+    части области программы, по одной на инструкцию верхнего уровня: их можно
+    переиспользовать при инкрементальной перепроверке.
+    """
+    __slots__ = ('kind', 'line', 'parent', 'children', 'declared', 'refs', 'uses')
+
+    def __init__(self, kind, line=None, parent=None):
+        self.kind = kind  # program / statement / function / block
         self.line = line
+        self.parent = parent
         self.children = []
-        self.complexity = 0  
+        self.declared = {}  # имя -> (строка, вид: let/const/var/param/function)
+        self.refs = {}      # имя -> число ссылок из этой области
+        self.uses = {}      # имя -> число ссылок на объявление, заполняет resolve()
+        if parent is not None:
+            parent.children.append(self)
+
+    def declare(self, name, line, kind):
+        # Повторное объявление в той же области не перекрывает первое
+        if name not in self.declared:
+            self.declared[name] = (line, kind)
+
+    def reference(self, name, count=1):
+        self.refs[name] = self.refs.get(name, 0) + count
+
+    def adopt(self, statement):
+        """Подключает область инструкции верхнего уровня к области программы"""
+        statement.parent = self
+        self.children.append(statement)
+        for name, decl in statement.declared.items():
+            self.declare(name, *decl)
+
+    def walk(self):
+        """Эта область и все вложенные, в прямом порядке без рекурсии"""
+        stack = [self]
+        while stack:
+            scope = stack.pop()
+            yield scope
+            stack.extend(reversed(scope.children))
+
+    def resolve(self):
+        """Связывает ссылки с ближайшими объявлениями и заполняет uses у всех
+        вложенных областей. Возвращает необъявленные имена: имя -> число ссылок."""
+        scopes = list(self.walk())
+        for scope in scopes:
+            scope.uses = {}
+        undeclared = {}
+        for scope in scopes:
+            for name, count in scope.refs.items():
+                owner = scope
+                # Объявления 'statement' учтены в области программы
+                while owner is not None and (owner.kind == 'statement' or name not in owner.declared):
+                    owner = owner.parent
+                if owner is None:
+                    undeclared[name] = undeclared.get(name, 0) + count
+                else:
+                    owner.uses[name] = owner.uses.get(name, 0) + count
+        return undeclared
+
+
+def compact(nodes):
+    """Узлы верхнего уровня, перенесенные в одну новую арену. Старые арены
+    держатся в памяти, пока на них ссылается хоть один узел, поэтому после
+    многих инкрементальных правок их стоит собрать вместе."""
+    arena = NodeArena()
+    return [Node(arena, arena.copy_subtree(node.arena, node.id), node.start_idx, node.end_idx, node.scope)
+            for node in nodes]
+
+
+def program_scope(nodes, loose_refs=()):
+    """Область программы из областей узлов верхнего уровня и ссылок вне узлов"""
+    program = Scope('program', 1)
+    for node in nodes:
+        if node.scope is not None:
+            program.adopt(node.scope)
+    for _, name in loose_refs:
+        program.reference(name)
+    return program
+
+
+def aggregate(root):
+    """Заполняет total_complexity и max_nesting у root и всех потомков без
+    рекурсии. Поддеревья, где агрегаты уже посчитаны, повторно не обходятся."""
+    if root.total_complexity is not None:
+        return root
+    if isinstance(root, Program):
+        total = nesting = 0
+        for node in root.children:
+            node.arena.aggregate(node.id)
+            total += node.total_complexity
+            nesting = max(nesting, node.max_nesting)
+        root.total_complexity = total
+        root.max_nesting = nesting
+    else:
+        root.arena.aggregate(root.id)
+    return root
 
-    def add_child(self, node):
-        self.children.append(node)
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = [t for t in tokens if t.type != 'SKIP']
-        self.current = 0
+    def __init__(self, tokens, start=0):
+        self._stream = None
+        if isinstance(tokens, TokenStream):
+            # Представление без копирования: индексы значимых токенов в массиве
+            self.tokens = tokens.significant()
+            self._token_at = self.tokens.get
+        elif isinstance(tokens, (list, tuple)):
+            self.tokens = [t for t in tokens if t.type != 'SKIP']
+            self._token_at = self._list_token
+        else:
+            # Потоковый режим: токены читаются из итератора, в памяти только окно просмотра
+            self.tokens = None
+            self._stream = (t for t in tokens if t.type != 'SKIP')
+            self._lookahead = deque()
+        self.current = start
         self.errors = []
-        self.root = Node('Program', line=1)
+        # Смещение начала инструкции, в которой возникла каждая ошибка из errors
+        self.error_offsets = []
+        self.last_end = 0
+        self.arena = NodeArena()
+        self.root = Program(scope=Scope('program', 1))
+        self.scope = self.root.scope
+        # Ссылки из инструкций, не ставших узлами: (смещение инструкции, имя)
+        self.loose_refs = []
+        # cut_off: последней инструкции не хватило токенов (разбор уперся в конец
+        # ввода), с продолжением текста она могла бы разобраться иначе
+        self.hit_end = False
+        self.cut_off = False
 
     def peek(self, offset=0):
         """Посмотреть токен впереди без сдвига указателя"""
-        idx = self.current + offset
-        if idx < len(self.tokens):
-            return self.tokens[idx]
-        return None
+        if self._stream is not None:
+            lookahead = self._lookahead
+            while len(lookahead) <= offset:
+                tok = next(self._stream, None)
+                if tok is None:
+                    self.hit_end = True
+                    return None
+                lookahead.append(tok)
+            return lookahead[offset]
+        tok = self._token_at(self.current + offset)
+        if tok is None:
+            self.hit_end = True
+        return tok
+
+    def _list_token(self, idx):
+        return self.tokens[idx] if idx < len(self.tokens) else None
+
+    def advance(self, reference=True):
+        """Пропустить текущий токен; идентификатор считается ссылкой в текущей области"""
+        tok = self.peek()
+        if tok is not None:
+            self.last_end = tok.end_idx
+            if reference and tok.type == 'ID':
+                self.scope.reference(tok.value)
+        self.current += 1
+        if self._stream is not None:
+            if self._lookahead:
+                self._lookahead.popleft()
+            else:
+                next(self._stream, None)
 
     def consume(self, expected_value=None):
         """Забрать текущий токен и перейти к следующему"""
@@ -31,28 +356,68 @@ class Parser:
             raise Exception("Unexpected end of input")
         if expected_value and token.value != expected_value:
             raise Exception(f"Expected '{expected_value}', got '{token.value}' at line {token.line}")
-        self.current += 1
+        self.advance()
+        return token
+
+    def consume_declaration(self, kind):
+        """Забрать идентификатор как объявление вида kind (let/const/var/param/function)"""
+        token = self.peek()
+        if not token:
+            raise Exception("Unexpected end of input")
+        self.advance(reference=False)
+        scope = self.scope
+        if kind == 'var':
+            # var поднимается до функции (или до уровня программы)
+            while scope.kind not in ('function', 'statement'):
+                scope = scope.parent
+        scope.declare(token.value, token.line, kind)
         return token
 
     def parse(self):
-        while self.current < len(self.tokens):
-            token = self.peek()
-            try:
-                if token.value in ['let', 'const', 'var']:
-                    self.root.add_child(self.parse_variable())
-                elif token.value == 'function':
-                    self.root.add_child(self.parse_function())
-                elif token.value in ['if', 'while', 'for']:
-                    self.root.add_child(self.parse_control_structure())
-                else:
-                    self.current += 1
-            except Exception as e:
-                self.errors.append(str(e))
-                while self.current < len(self.tokens) and self.tokens[self.current].value not in [';', '}']:
-                    self.current += 1
-                self.current += 1
+        while self.peek() is not None:
+            self.parse_statement()
         return self.root
 
+    def parse_statement(self):
+        """Разбирает одну инструкцию верхнего уровня; возвращает узел или None"""
+        token = self.peek()
+        start = token.start_idx
+        mark = len(self.arena)
+        node = None
+        statement = self.scope = Scope('statement', token.line)
+        self.hit_end = False
+        try:
+            if token.value in ['let', 'const', 'var']:
+                node = self.parse_variable()
+            elif token.value == 'function':
+                node = self.parse_function()
+            elif token.value in ['if', 'while', 'for']:
+                node = self.parse_control_structure()
+            else:
+                self.advance()
+        except Exception as e:
+            self.errors.append(str(e))
+            self.error_offsets.append(start)
+            while self.peek() and self.peek().value not in [';', '}']:
+                self.advance()
+            self.advance()
+        if node is not None:
+            self.arena.aggregate(node)
+            node = Node(self.arena, node, start, self.last_end, statement)
+            self.root.scope.adopt(statement)
+            self.root.children.append(node)
+        else:
+            # Узлы, созданные до ошибки, ни к чему не подключены
+            self.arena.truncate(mark)
+            # Объявления без узла теряются, как и сам узел, а ссылки остаются
+            for scope in statement.walk():
+                for name, count in scope.refs.items():
+                    self.root.scope.reference(name, count)
+                    self.loose_refs.extend([(start, name)] * count)
+        self.scope = self.root.scope
+        self.cut_off = self.hit_end
+        return node
+
     def parse_variable(self):
         start_tok = self.peek()
         line = start_tok.line
@@ -61,8 +426,8 @@ class Parser:
         if not self.peek() or self.peek().type != 'ID':
             raise Exception(f"Expected identifier at line {line}")
             
-        name_tok = self.consume()
-        node = Node('VariableDeclaration', value=name_tok.value, line=line)
+        name_tok = self.consume_declaration(start_tok.value)
+        node = self.arena.add('VariableDeclaration', name_tok.value, line)
         
         if self.peek() and self.peek().value == '=':
             self.consume('=')
@@ -75,13 +440,21 @@ class Parser:
 
     def parse_function(self):
         token = self.consume('function')
-        name_token = self.consume()
-        func_node = Node('Function', value=name_token.value, line=token.line)
+        if self.peek() and self.peek().type == 'ID':
+            name_token = self.consume_declaration('function')
+        else:
+            name_token = self.consume()
+        func_node = self.arena.add('Function', name_token.value, token.line)
+        outer = self.scope
+        self.scope = Scope('function', token.line, outer)
         
         self.consume('(')
         while self.peek() and self.peek().value != ')':
-            p = self.consume()
-            if p.type == 'ID': func_node.add_child(Node('Param', value=p.value, line=p.line))
+            if self.peek().type == 'ID':
+                p = self.consume_declaration('param')
+                self.arena.add('Param', p.value, p.line, parent=func_node)
+            else:
+                self.consume()
             if self.peek() and self.peek().value == ',': self.consume(',')
         self.consume(')')
         
@@ -90,34 +463,59 @@ class Parser:
             while self.peek() and self.peek().value != '}':
                 t = self.peek()
                 if t.value in ['if', 'while', 'for']:
-                    func_node.add_child(self.parse_control_structure())
+                    self.arena.add_child(func_node, self.parse_control_structure())
                 elif t.value in ['let', 'const', 'var']:
-                    func_node.add_child(self.parse_variable())
+                    self.arena.add_child(func_node, self.parse_variable())
                 else:
-                    self.current += 1
+                    self.advance()
             if self.peek(): self.consume('}')
+        self.scope = outer
         return func_node
 
-    def parse_control_structure(self):
+    def parse_control_header(self, parent=NO_NODE):
+        """Ключевое слово и условие в скобках; True, если дальше открыто тело { }"""
         token = self.consume() # if/while/for
-        node = Node('ControlStructure', value=token.value, line=token.line)
-        node.complexity = 1
-        
+        node = self.arena.add('ControlStructure', token.value, token.line, 1, parent)
+
         if self.peek() and self.peek().value == '(':
             self.consume('(')
             d = 1
-            while self.current < len(self.tokens) and d > 0:
+            while self.peek() and d > 0:
                 t = self.consume()
                 if t.value == '(': d += 1
                 elif t.value == ')': d -= 1
-        
+
         if self.peek() and self.peek().value == '{':
             self.consume('{')
-            while self.peek() and self.peek().value != '}':
-                t = self.peek()
-                if t.value in ['if', 'while', 'for']:
-                    node.add_child(self.parse_control_structure()) 
-                else:
-                    self.current += 1
-            if self.peek(): self.consume('}')
-        return node
+            return node, True
+        return node, False
+
+    def parse_control_structure(self):
+        # Вложенные тела разбираются с явным стеком, а не рекурсией:
+        # глубина вложенности не ограничена лимитом рекурсии Python
+        # Каждое тело { } - блочная область для let/const
+        outer = self.scope
+        root, has_body = self.parse_control_header()
+        stack = []
+        if has_body:
+            stack.append(root)
+            self.scope = Scope('block', self.arena.lines[root], self.scope)
+        while stack:
+            t = self.peek()
+            if t is None:
+                break
+            if t.value == '}':
+                self.consume('}')
+                stack.pop()
+                self.scope = self.scope.parent
+            elif t.value in ['if', 'while', 'for']:
+                node, has_body = self.parse_control_header(stack[-1])
+                if has_body:
+                    stack.append(node)
+                    self.scope = Scope('block', self.arena.lines[node], self.scope)
+            elif t.value in ['let', 'const', 'var']:
+                self.arena.add_child(stack[-1], self.parse_variable())
+            else:
+                self.advance()
+        self.scope = outer
+        return root
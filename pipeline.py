@@ -0,0 +1,217 @@
+import asyncio
+import glob
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import runner
+from runner import IGNORED_DIRS, JS_EXTENSIONS, STREAM_THRESHOLD, is_ignored
+
+# Одновременных операций ввода-вывода (листинг директорий, чтение, запись)
+IO_CONCURRENCY = 32
+# Прочитанных, но еще не отданных в пул файлов; вместе с лимитом задач в пуле
+# и очередью готовых результатов ограничивает расход памяти
+QUEUE_SIZE = 256
+
+_DONE = object()
+
+
+def lint_files_async(paths, config, jobs=None, cache=None, timing=None, ignore=(),
+                     io_concurrency=IO_CONCURRENCY, queue_size=QUEUE_SIZE, index=None):
+    """Как runner.lint_files, но обход директорий и чтение файлов идут в
+    asyncio параллельно с проверкой в пуле процессов. Генератор: результаты
+    отдаются по мере готовности, а не в порядке путей.
+
+    paths - файлы, директории и glob-шаблоны (как у collect_files). Цикл
+    событий работает в отдельном потоке; пока вызывающий код печатает отчет
+    по одному файлу, остальные читаются, проверяются и записываются (--fix).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def run():
+        try:
+            asyncio.run(_pipeline(paths, config, jobs, cache, timing, ignore,
+                                  io_concurrency, queue_size, index, results, stop))
+        except BaseException as e:
+            _put(results, e, stop)
+        _put(results, _DONE, stop)
+
+    thread = threading.Thread(target=run, name='lint-pipeline', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Потребитель остановился раньше - сворачиваем конвейер
+        stop.set()
+        while thread.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def _put(results, item, stop):
+    """Блокирующая запись в очередь результатов, прерываемая по stop"""
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+async def _pipeline(paths, config, jobs, cache, timing, ignore, io_concurrency, queue_size,
+                    index, results, stop):
+    loop = asyncio.get_running_loop()
+    io = ThreadPoolExecutor(max_workers=io_concurrency, thread_name_prefix='lint-io')
+    io_slots = asyncio.Semaphore(io_concurrency)
+    to_read = asyncio.Queue(maxsize=queue_size)
+    to_lint = asyncio.Queue(maxsize=queue_size)
+    # Задачи в пуле: хватает, чтобы воркеры не простаивали, но не больше
+    cpu_slots = asyncio.Semaphore(jobs * 2)
+    seen = set()
+    outstanding = 0          # найдено, но результат еще не отдан
+    discovered = False
+    idle = asyncio.Event()
+
+    def finished_one():
+        nonlocal outstanding
+        outstanding -= 1
+        if discovered and outstanding == 0:
+            idle.set()
+
+    async def run_io(func, *args):
+        async with io_slots:
+            return await loop.run_in_executor(io, func, *args)
+
+    async def found(path):
+        nonlocal outstanding
+        path = os.path.normpath(path)
+        if path not in seen and not stop.is_set():
+            seen.add(path)
+            outstanding += 1
+            await to_read.put(path)
+
+    async def walk(directory):
+        try:
+            entries = await run_io(_scan, directory)
+        except OSError:
+            return
+        subdirs = []
+        for name, is_dir in entries:
+            path = os.path.join(directory, name)
+            if is_dir:
+                if name not in IGNORED_DIRS and not is_ignored(path, ignore):
+                    subdirs.append(walk(path))
+            elif name.endswith(JS_EXTENSIONS) and not is_ignored(path, ignore):
+                await found(path)
+        await asyncio.gather(*subdirs)
+
+    async def discover():
+        for path in paths:
+            matches = await run_io(glob.glob, path, recursive=True) if glob.has_magic(path) else [path]
+            for match in sorted(matches):
+                kind = await run_io(_kind, match)
+                if kind == 'dir':
+                    await walk(match)
+                elif kind == 'file' and not is_ignored(match, ignore):
+                    await found(match)
+
+    async def read():
+        while True:
+            path = await to_read.get()
+            try:
+                data = await run_io(_read_small, path)
+            except OSError:
+                # Ошибку чтения сообщит воркер, прочитав файл сам
+                data = None
+            await to_lint.put((path, data))
+
+    async def lint_one(path, data):
+        try:
+            if data is None:
+                result = await loop.run_in_executor(pool, runner._lint_in_worker, (path, None))
+            else:
+                result = await loop.run_in_executor(pool, runner._lint_read_in_worker, (path, data))
+            cpu_slots.release()
+            if result.fixed_code is not None:
+                try:
+                    await run_io(_write, path, result.fixed_code)
+                except OSError as e:
+                    result.error = f"Error saving changes: {e}"
+                    result.fixes_applied = result.fixes_skipped = 0
+                result.fixed_code = None
+            await loop.run_in_executor(io, _put, results, result, stop)
+        except Exception as e:
+            # Например, упавший воркер: отдаем ошибку потребителю и сворачиваемся
+            await loop.run_in_executor(io, _put, results, e, stop)
+            stop.set()
+        finally:
+            finished_one()
+
+    async def dispatch():
+        while True:
+            path, data = await to_lint.get()
+            await cpu_slots.acquire()
+            tasks.add(asyncio.ensure_future(lint_one(path, data)))
+
+    async def watch_stop():
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+        idle.set()
+
+    tasks = set()
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=runner._init_worker,
+                               initargs=(config, cache, timing, index))
+    helpers = [asyncio.ensure_future(read()) for _ in range(io_concurrency)]
+    helpers.append(asyncio.ensure_future(dispatch()))
+    helpers.append(asyncio.ensure_future(watch_stop()))
+    try:
+        await discover()
+        discovered = True
+        if outstanding == 0:
+            idle.set()
+        await idle.wait()
+    finally:
+        for task in helpers + list(tasks):
+            task.cancel()
+        await asyncio.gather(*helpers, *tasks, return_exceptions=True)
+        pool.shutdown(wait=True, cancel_futures=True)
+        io.shutdown(wait=True)
+
+
+def _scan(directory):
+    """[(имя, это директория)] одним вызовом scandir"""
+    with os.scandir(directory) as entries:
+        return [(e.name, e.is_dir()) for e in entries]
+
+
+def _kind(path):
+    if os.path.isdir(path):
+        return 'dir'
+    if os.path.isfile(path):
+        return 'file'
+    return None
+
+
+def _read_small(path):
+    """Содержимое файла; крупные файлы (None) воркер разбирает потоково сам"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= STREAM_THRESHOLD:
+            return None
+        return f.read()
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from parallel import lex_fragment
+from parser_js import Parser
+
+INDEX_FILENAME = 'project-index.json'
+
+
+def extract_symbols(code):
+    """Map: имена верхнего уровня одного исходника.
+
+    declared - объявления области программы {имя: [строка, вид]}, refs -
+    ссылки на имена, не объявленные в этом файле {имя: число ссылок}: в
+    скриптах без модулей это обращения к объявлениям других файлов.
+    """
+    # Лексер без печати ошибок: они будут выведены при самой проверке
+    tokens = lex_fragment(code, 1)[0]
+    program = Parser(tokens).parse().scope
+    return {'declared': {name: list(decl) for name, decl in program.declared.items()},
+            'refs': program.resolve()}
+
+
+def _map_file(item):
+    """Задача воркера: (путь, известный хэш) -> (путь, хэш, символы или None,
+    если содержимое не изменилось). Хэш None - файл не прочитался."""
+    path, known = item
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest == known:
+            return path, digest, None
+        return path, digest, extract_symbols(data.decode('utf-8'))
+    except (OSError, UnicodeDecodeError):
+        return path, None, None
+
+
+class ProjectIndex:
+    """Индекс символов верхнего уровня по всем файлам проекта.
+
+    update() - map по файлам в пуле процессов (только те, чей хэш изменился),
+    references - reduce: сколько раз каждое имя упоминается в файлах, где оно
+    не объявлено. Правила спрашивают is_referenced(); индекс сохраняется в
+    JSON рядом с кэшем результатов.
+    """
+    VERSION = 1
+
+    def __init__(self, files=None):
+        self.files = files or {}  # абсолютный путь -> {'digest', 'declared', 'refs'}
+        self._references = None
+
+    @classmethod
+    def load(cls, path):
+        """Индекс из файла; пустой, если файла нет или он другого формата"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if not isinstance(data, dict) or data.get('version') != cls.VERSION:
+            return cls()
+        return cls(data.get('files') or {})
+
+    def save(self, path):
+        """Атомарная запись, как в LintCache.put"""
+        directory = os.path.dirname(path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'files': self.files}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def update(self, paths, jobs=None):
+        """Приводит индекс к набору файлов paths: разбирает новые и измененные,
+        забывает отсутствующие. Возвращает число разобранных файлов."""
+        items = [(path, self.files.get(path, {}).get('digest'))
+                 for path in sorted({os.path.abspath(p) for p in paths})]
+        jobs = jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(items) <= 1:
+            mapped = list(map(_map_file, items))
+        else:
+            chunksize = max(1, min(64, len(items) // (jobs * 4)))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                mapped = list(pool.map(_map_file, items, chunksize=chunksize))
+
+        files = {}
+        parsed = 0
+        for path, digest, symbols in mapped:
+            if digest is None:
+                continue
+            if symbols is None:
+                files[path] = self.files[path]
+            else:
+                files[path] = dict(symbols, digest=digest)
+                parsed += 1
+        self.files = files
+        self._references = None
+        return parsed
+
+    @property
+    def references(self):
+        """Reduce: имя -> число ссылок из файлов, где оно не объявлено"""
+        if self._references is None:
+            total = Counter()
+            for entry in self.files.values():
+                total.update(entry['refs'])
+            self._references = total
+        return self._references
+
+    def is_referenced(self, name):
+        """Есть ли в проекте ссылки на имя из файлов, которые его не объявляют"""
+        return name in self.references
+
+    def fingerprint(self, path):
+        """Часть ключа кэша результатов файла: какие из его объявлений верхнего
+        уровня используются в других файлах. Результат проверки файла с
+        индексом зависит от остальных файлов только через это."""
+        entry = self.files.get(os.path.abspath(path))
+        names = sorted(name for name in entry['declared'] if self.is_referenced(name)) if entry else []
+        return hashlib.sha256(json.dumps([entry is not None, names]).encode('utf-8')).hexdigest()
@@ -0,0 +1,170 @@
+import json
+import sys
+
+from engine import SKIP_MAX_WARNINGS, SKIP_MINIFIED, SKIP_TIME_BUDGET
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+TOOL_NAME = 'js_linter'
+# Причины пропуска правил (engine.SKIP_*) для людей
+SKIP_REASONS = {
+    SKIP_MINIFIED: 'minified file',
+    SKIP_TIME_BUDGET: 'time budget exceeded',
+    SKIP_MAX_WARNINGS: 'too many warnings',
+}
+
+
+def skipped_by_reason(skipped):
+    """{причина: [правила]} в порядке первого появления"""
+    groups = {}
+    for rule, reason in skipped:
+        groups.setdefault(reason, []).append(rule)
+    return groups
+
+
+class Reporter:
+    """Вывод результатов по мере готовности файлов.
+
+    start() вызывается один раз до первого файла, file(result) - для каждого
+    runner.LintResult в порядке проверки, finish() - в конце. После каждого
+    файла поток сбрасывается, так что вывод можно читать, не дожидаясь конца.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def start(self):
+        pass
+
+    def file(self, result):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+    def write(self, text):
+        self.stream.write(text)
+
+
+class TextReporter(Reporter):
+    """Текстовый отчет, как раньше печатал main"""
+
+    def file(self, result):
+        lines = [f"\nLinting Report for: {result.path}"]
+        if result.error:
+            lines.append(f"Error: {result.error}")
+        if not result.diagnostics:
+            lines.append("Success: No style issues found.")
+        else:
+            lines.extend(str(d) for d in result.diagnostics)
+        for reason, rules in skipped_by_reason(result.skipped).items():
+            lines.append(f"[SKIPPED] {', '.join(rules)} ({SKIP_REASONS.get(reason, reason)})")
+        if result.fixes_applied:
+            lines.append(f"\n[FIXER] Applied {result.fixes_applied} fixes automatically.")
+        if result.fixes_skipped:
+            lines.append(f"[FIXER] Skipped {result.fixes_skipped} overlapping or duplicate fixes.")
+        self.write('\n'.join(lines) + '\n')
+        self.stream.flush()
+
+
+class JsonLinesReporter(Reporter):
+    """JSON Lines: объект на каждую проблему; ошибки чтения файла - {"file", "error"},
+    пропущенные правила - {"file", "skipped": [{"rule", "reason"}]}"""
+
+    def file(self, result):
+        out = []
+        if result.error:
+            out.append(json.dumps({'file': result.path, 'error': result.error}, ensure_ascii=False))
+        if result.skipped:
+            skipped = [{'rule': rule, 'reason': reason} for rule, reason in result.skipped]
+            out.append(json.dumps({'file': result.path, 'skipped': skipped}, ensure_ascii=False))
+        for d in result.diagnostics:
+            record = d.to_dict()
+            if d.fix:
+                record['fix'] = [list(edit) for edit in d.fix]
+            out.append(json.dumps(record, ensure_ascii=False))
+        if out:
+            self.write('\n'.join(out) + '\n')
+            self.stream.flush()
+
+
+class SarifReporter(Reporter):
+    """SARIF 2.1.0 одним прогоном (run).
+
+    Результаты пишутся в массив results сразу по готовности файла; описание
+    инструмента со списком встреченных правил и уведомления (ошибки чтения,
+    пропущенные правила) дописываются в finish() - порядок ключей в JSON не важен.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self.rules = {}          # id правила -> уровень
+        self.notifications = []
+        self.failed = False
+        self.first = True
+
+    def start(self):
+        self.write('{"version": "2.1.0", "$schema": "%s", "runs": [{"results": [' % SARIF_SCHEMA)
+
+    def file(self, result):
+        locations = [{'physicalLocation': {'artifactLocation': {'uri': _uri(result.path)}}}]
+        if result.error:
+            self.failed = True
+            self.notifications.append({'level': 'error', 'message': {'text': result.error},
+                                       'locations': locations})
+        for rule, reason in result.skipped:
+            self.notifications.append({
+                'level': 'note',
+                'message': {'text': f"Rule '{rule}' skipped: {SKIP_REASONS.get(reason, reason)}"},
+                'associatedRule': {'id': rule},
+                'locations': locations,
+            })
+        if not result.diagnostics:
+            return
+        parts = []
+        for d in result.diagnostics:
+            if d.rule is not None:
+                self.rules.setdefault(d.rule, d.severity)
+            parts.append(json.dumps(_sarif_result(d), ensure_ascii=False))
+        prefix = '' if self.first else ', '
+        self.first = False
+        self.write(prefix + ', '.join(parts))
+        self.stream.flush()
+
+    def finish(self):
+        driver = {'name': TOOL_NAME,
+                  'rules': [{'id': rule, 'defaultConfiguration': {'level': level}}
+                            for rule, level in self.rules.items()]}
+        invocation = {'executionSuccessful': not self.failed,
+                      'toolExecutionNotifications': self.notifications}
+        tail = json.dumps({'tool': {'driver': driver}, 'invocations': [invocation]}, ensure_ascii=False)
+        # Дописываем ключи tool/invocations в тот же объект run
+        self.write('], ' + tail[1:] + ']}\n')
+        self.stream.flush()
+
+
+def _uri(path):
+    return path.replace('\\', '/')
+
+
+def _sarif_result(d):
+    location = {'artifactLocation': {'uri': _uri(d.file)}}
+    if d.line is not None:
+        region = {'startLine': d.line}
+        if d.column is not None:
+            region['startColumn'] = d.column + 1  # в SARIF колонки с 1
+        location['region'] = region
+    record = {'level': d.severity, 'message': {'text': d.message},
+              'locations': [{'physicalLocation': location}]}
+    if d.rule is not None:
+        # Отчеты, добавленные строкой (Diagnostic.from_report), без правила:
+        # ruleId в SARIF - строка, null не допускается
+        record['ruleId'] = d.rule
+    if d.fix:
+        replacements = [{'deletedRegion': {'charOffset': start, 'charLength': end - start},
+                         'insertedContent': {'text': text}} for start, end, text in d.fix]
+        record['fixes'] = [{'artifactChanges': [{'artifactLocation': {'uri': _uri(d.file)},
+                                                 'replacements': replacements}]}]
+    return record
+
+
+REPORTERS = {'text': TextReporter, 'jsonl': JsonLinesReporter, 'sarif': SarifReporter}
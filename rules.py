@@ -1,111 +1,554 @@
 import re
+from time import perf_counter
+
+from lexer import TOKEN_TYPES, SKIP, TokenStream
+from parser_js import NODE_TYPES, Node, Program, aggregate
+from diagnostics import Diagnostic
+
+DECLARATION_KEYWORDS = ('let', 'const', 'var', 'function')
+SIGNIFICANT_TOKEN_TYPES = ('COMMENT', 'KEYWORD', 'ID', 'NUMBER', 'STRING', 'OP', 'PUNCT')
+# Токенов между проверками времени в проходе с ограничением по времени
+DEADLINE_BLOCK = 4096
+
+
+class BudgetExceeded(Exception):
+    """Проход диспетчера прерван: время на файл истекло"""
 
 class BaseRule:
     def __init__(self, config):
-        # Принимаем словарь настроек (config.settings)
+        # Принимаем Config или словарь настроек (config.settings)
         self.config = config
 
+
+class TokenCursor:
+    """Соседи текущего токена, которые диспетчер передает правилам.
+
+    Правила обращаются к токенам по индексу: index - текущий, index - 1 и
+    index + 1 - соседи, psig - предыдущий значимый (не SKIP) или -1. У
+    потока из объектов Token доступны только эти индексы."""
+    __slots__ = ('prev', 'next', 'prev_significant', 'current', 'index', 'psig')
+
+    def __init__(self):
+        self.prev = None              # предыдущий токен (включая SKIP)
+        self.next = None              # следующий токен (включая SKIP)
+        self.prev_significant = None  # предыдущий токен, не являющийся SKIP
+        self.current = None
+        self.index = 0
+        self.psig = -1
+
+    def token(self, i):
+        """Token с индексом i или None"""
+        index = self.index
+        if i == index:
+            return self.current
+        if i == index - 1:
+            return self.prev
+        if i == index + 1:
+            return self.next
+        if i == self.psig and i >= 0:
+            return self.prev_significant
+        return None
+
+    def type_of(self, i):
+        tok = self.token(i)
+        return tok.type if tok is not None else None
+
+    def value_of(self, i):
+        tok = self.token(i)
+        return tok.value if tok is not None else None
+
+    def line_of(self, i):
+        tok = self.token(i)
+        return tok.line if tok is not None else None
+
+    def column_of(self, i):
+        tok = self.token(i)
+        return tok.column if tok is not None else None
+
+
+class StreamCursor:
+    """Курсор по TokenStream: type_of/value_of/line_of/column_of читают
+    колонки по индексу без объектов Token. token(i) создает Token не больше
+    одного раза на индекс: последние созданные лежат в кольцевом буфере."""
+    __slots__ = ('stream', 'index', 'psig', '_count', '_ring_index', '_ring_token')
+    RING = 8  # степень двойки: слот - i & (RING - 1)
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.index = 0
+        self.psig = -1
+        self._count = len(stream)
+        self._ring_index = [-1] * self.RING
+        self._ring_token = [None] * self.RING
+
+    def token(self, i):
+        if not 0 <= i < self._count:
+            return None
+        slot = i & (self.RING - 1)
+        if self._ring_index[slot] == i:
+            return self._ring_token[slot]
+        tok = self.stream.token(i)
+        self._ring_index[slot] = i
+        self._ring_token[slot] = tok
+        return tok
+
+    def type_of(self, i):
+        return TOKEN_TYPES[self.stream.types[i]] if 0 <= i < self._count else None
+
+    def value_of(self, i):
+        if not 0 <= i < self._count:
+            return None
+        stream = self.stream
+        return stream.source[stream.starts[i]:stream.ends[i]]
+
+    def line_of(self, i):
+        return self.stream.lines[i] if 0 <= i < self._count else None
+
+    def column_of(self, i):
+        return self.stream.columns[i] if 0 <= i < self._count else None
+
+    @property
+    def prev(self):
+        return self.token(self.index - 1)
+
+    @property
+    def next(self):
+        return self.token(self.index + 1)
+
+    @property
+    def prev_significant(self):
+        return self.token(self.psig)
+
+
+class Rule(BaseRule):
+    """Правило с подпиской на типы токенов и узлов AST.
+
+    Диспетчер один раз проходит по токенам и один раз по дереву и вызывает
+    on_token/on_node только у правил, подписанных на данный тип.
+    """
+    name = None
+    token_types = ()
+    node_types = ()
+    # Локальное правило зависит только от токена, его соседей и узла;
+    # такие правила можно перезапускать лишь на измененных строках
+    local = True
+    # Правило сообщает только о строке текущего токена или узла, поэтому
+    # в подавленных строках его можно вообще не вызывать
+    suppressible = True
+    # Относительная стоимость: при ограничении по времени или числу
+    # предупреждений правила запускаются от дешевых к дорогим
+    cost = 1
+    # Запускать ли правило на минифицированных и сгенерированных файлах
+    on_minified = True
+    # project_index.ProjectIndex, если проверка идет с индексом проекта
+    index = None
+
+    def is_enabled(self):
+        return True
+
+    def start(self, fixer=None):
+        self.fixer = fixer
+        self.errors = []
+
+    def on_index(self, cursor):
+        """Вызывается диспетчером для токена cursor.index. По умолчанию создает
+        Token (один раз на индекс) и вызывает on_token; правила на горячем пути
+        переопределяют этот метод и читают колонки через cursor.type_of/value_of."""
+        self.on_token(cursor.token(cursor.index), cursor)
+
+    def on_token(self, tok, cursor):
+        pass
+
+    def on_node(self, node):
+        pass
+
+    def finish(self):
+        return self.errors
+
+    def report(self, line, message, *args, column=None, fix=None):
+        """message - шаблон str.format, args подставляются только при выводе"""
+        self.errors.append(Diagnostic(line, self.name, message, args, column, fix=fix))
+
+
+class RuleDispatcher:
+    """Раздает токены и узлы AST подписанным правилам за один проход.
+
+    При profile=True каждый вызов правила замеряется; итоги по правилам
+    лежат в self.rule_stats: имя -> [секунды, вызовы]. С suppressions
+    (suppressions.Suppressions) правила с suppressible = True не вызываются
+    на подавленных для них строках, а токены TokenStream на строках,
+    подавленных для всех правил, пропускаются целиком. С deadline (значение perf_counter)
+    проход по токенам и обход AST прерываются исключением BudgetExceeded.
+    """
+
+    def __init__(self, rules, fixer=None, profile=False, suppressions=None, deadline=None):
+        self.rules = rules
+        self.deadline = deadline
+        self.by_token = {}
+        self.by_node = {}
+        self.suppressions = suppressions
+        # Подписчики правил с suppressible = False: им нужны и подавленные токены
+        self.unsuppressed_by_token = {}
+        self.rule_stats = {} if profile else None
+        for rule in rules:
+            rule.start(fixer)
+            on_token, on_node = rule.on_index, rule.on_node
+            if profile:
+                on_token, on_node = self._timed(rule, on_token), self._timed(rule, on_node)
+            if suppressions and rule.suppressible:
+                on_token, on_node = self._guarded(suppressions, rule, on_token, on_node)
+            for t in rule.token_types:
+                self.by_token.setdefault(t, []).append(on_token)
+                if not rule.suppressible:
+                    self.unsuppressed_by_token.setdefault(t, []).append(on_token)
+            for t in rule.node_types:
+                self.by_node.setdefault(t, []).append(on_node)
+        self.cursor = TokenCursor()
+        self._current = None
+
+    def _timed(self, rule, handler):
+        stats = self.rule_stats.setdefault(rule.name or type(rule).__name__, [0.0, 0])
+
+        def timed_handler(*args):
+            start = perf_counter()
+            handler(*args)
+            stats[0] += perf_counter() - start
+            stats[1] += 1
+        return timed_handler
+
+    @staticmethod
+    def _guarded(suppressions, rule, on_token, on_node):
+        # Токены идут по возрастанию строк, узлы в прямом порядке обхода - у
+        # каждого свой фильтр, чтобы проверка оставалась почти бесплатной
+        token_filter = suppressions.filter_for(rule.name)
+        if token_filter is None:
+            return on_token, on_node
+        node_filter = suppressions.filter_for(rule.name)
+
+        def guarded_token(cursor):
+            if not token_filter(cursor.line_of(cursor.index)):
+                on_token(cursor)
+
+        def guarded_node(node):
+            if not node_filter(node.line):
+                on_node(node)
+        return guarded_token, guarded_node
+
+    def _dispatch(self, tok):
+        subscribers = self.by_token.get(tok.type)
+        if subscribers:
+            cursor = self.cursor
+            cursor.current = tok
+            for handler in subscribers:
+                handler(cursor)
+
+    def feed(self, tok):
+        """Принимает очередной токен. Обработка идет с задержкой на один токен,
+        чтобы у правил был доступ к следующему соседу."""
+        current = self._current
+        if current is not None:
+            cursor = self.cursor
+            cursor.next = tok
+            self._dispatch(current)
+            cursor.prev = current
+            if current.type != 'SKIP':
+                cursor.prev_significant = current
+                cursor.psig = cursor.index
+            cursor.index += 1
+        self._current = tok
+
+    def feed_tokens(self, tokens):
+        if not self.by_token:
+            return
+        if isinstance(tokens, TokenStream):
+            self._feed_stream(tokens)
+            return
+        for tok in tokens:
+            self.feed(tok)
+        self.end_tokens()
+
+    def _feed_stream(self, stream):
+        """Быстрый путь для TokenStream: правила читают колонки через курсор,
+        Token создается только по запросу правила. Отрезки строк, подавленные
+        для всех правил, перескакиваются без вызова правил."""
+        by_code = [self.by_token.get(name) for name in TOKEN_TYPES]
+        # Токенные правила с suppressible = False (blank-lines) смотрят назад до
+        # предыдущего значимого токена: их отчет выходит за подавленный отрезок
+        # только на первом значимом токене отрезка, дальше он все равно отброшен
+        edge_code = [self.unsuppressed_by_token.get(name) for name in TOKEN_TYPES]
+        cursor = StreamCursor(stream)
+        types = stream.types
+        total = len(types)
+        ranges = self.suppressions.index_ranges(stream.lines) if self.suppressions else []
+        psig = -1
+        pos = 0
+        for lo, hi in ranges + [(total, total)]:
+            psig = self._feed_range(by_code, cursor, pos, lo, psig)
+            first = lo
+            while first < hi and types[first] == SKIP:
+                first += 1
+            if first < hi:
+                self._feed_range(edge_code, cursor, lo, first + 1, psig)
+                psig = stream.prev_significant(hi)
+            pos = hi
+
+    def _feed_range(self, by_code, cursor, start, end, psig):
+        """Раздает токены [start, end) подписчикам из by_code (по коду типа);
+        psig - индекс предыдущего значимого токена. Возвращает новый psig."""
+        types = cursor.stream.types
+        # Время проверяется между блоками, а не на каждом токене
+        block = (end - start) if self.deadline is None else DEADLINE_BLOCK
+        for first in range(start, end, block or 1):
+            self.check_deadline()
+            for i in range(first, min(first + block, end)):
+                code = types[i]
+                subscribers = by_code[code]
+                if subscribers:
+                    cursor.index = i
+                    cursor.psig = psig
+                    for handler in subscribers:
+                        handler(cursor)
+                if code != SKIP:
+                    psig = i
+        return psig
+
+    def check_deadline(self):
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise BudgetExceeded()
+
+    def end_tokens(self):
+        if self._current is not None:
+            self.cursor.next = None
+            self._dispatch(self._current)
+            self._current = None
+
+    def walk(self, ast):
+        """Обход дерева в прямом порядке: поддерево узла в арене - отрезок
+        индексов, поэтому это цикл по колонке типов. Представления Node
+        создаются только для узлов, на которые подписаны правила."""
+        if not self.by_node or ast is None:
+            return
+        by_node = self.by_node
+        if isinstance(ast, Program):
+            for handler in by_node.get('Program', ()):
+                handler(ast)
+            tops = ast.children
+        else:
+            tops = [ast]
+        by_code = [by_node.get(name) for name in NODE_TYPES]
+        for top in tops:
+            self.check_deadline()
+            arena, first = top.arena, top.id
+            types = arena.types
+            for i in range(first, arena.subtree_end(first)):
+                subscribers = by_code[types[i]]
+                if subscribers:
+                    node = top if i == first else Node(arena, i)
+                    for handler in subscribers:
+                        handler(node)
+
+    def results(self):
+        if self.rule_stats is None:
+            return [rule.finish() for rule in self.rules]
+        results = []
+        for rule in self.rules:
+            start = perf_counter()
+            results.append(rule.finish())
+            self.rule_stats.setdefault(rule.name or type(rule).__name__, [0.0, 0])[0] += perf_counter() - start
+        return results
+
+
+def run_rules(rules, tokens, ast=None, fixer=None):
+    """Прогоняет правила одним проходом; возвращает списки ошибок в порядке rules"""
+    dispatcher = RuleDispatcher(rules, fixer)
+    dispatcher.feed_tokens(tokens)
+    dispatcher.walk(ast)
+    return dispatcher.results()
+
+
+def subtree_complexity(node):
+    """Суммарная сложность узла и всех вложенных узлов (из агрегатов узла)"""
+    return aggregate(node).total_complexity
+
+
+class NamingRule(Rule):
+    """Имена объявляемых переменных и функций должны соответствовать naming_pattern"""
+    name = 'naming'
+    token_types = ('ID',)
+    cost = 3
+    # Минификатор сам выбирает имена
+    on_minified = False
+
+    def start(self, fixer=None):
+        super().start(fixer)
+        # Config хранит шаблон скомпилированным; словарь настроек компилируем здесь
+        self.pattern = getattr(self.config, 'naming_regex', None) or \
+            re.compile(self.config.get('naming_pattern') or r'^[a-z][a-zA-Z0-9]*$')
+
+    def on_index(self, cursor):
+        if cursor.value_of(cursor.psig) in DECLARATION_KEYWORDS:
+            i = cursor.index
+            value = cursor.value_of(i)
+            if not self.pattern.match(value):
+                self.report(cursor.line_of(i), "Naming violation: '{}'", value, column=cursor.column_of(i))
+
+
+class SpacingRule(Rule):
+    """Пробелы вокруг операторов =, +, -, *, / (с поддержкой Fixer)"""
+    name = 'spacing'
+    token_types = ('OP',)
+    OPERATORS = ('=', '+', '-', '*', '/')
+    cost = 5
+    on_minified = False
+
+    def is_enabled(self):
+        return self.config.get('require_spaces_operators') is not False
+
+    def on_index(self, cursor):
+        i = cursor.index
+        before, after = cursor.type_of(i - 1), cursor.type_of(i + 1)
+        if before is None or after is None or cursor.value_of(i) not in self.OPERATORS:
+            return
+        missing_before = before != 'SKIP'
+        missing_after = after != 'SKIP'
+
+        if missing_before or missing_after:
+            tok = cursor.token(i)
+            fix = []
+            if missing_before: fix.append((tok.start_idx, tok.start_idx, " "))
+            if missing_after: fix.append((tok.end_idx, tok.end_idx, " "))
+            self.report(tok.line, "Missing space around operator '{}'", tok.value,
+                        column=tok.column, fix=tuple(fix))
+            if self.fixer:
+                for start, end, replacement in fix:
+                    self.fixer.add_fix(start, end, replacement, self.name)
+
+
+class BlankLinesRule(Rule):
+    """Не больше max_empty_lines пустых строк подряд"""
+    name = 'blank-lines'
+    token_types = SIGNIFICANT_TOKEN_TYPES
+    cost = 4
+    on_minified = False
+    # Сообщает о строке после предыдущего токена, а не о текущей
+    suppressible = False
+
+    def start(self, fixer=None):
+        super().start(fixer)
+        self.max_blanks = self.config.get('max_empty_lines') or 2
+
+    def on_index(self, cursor):
+        prev_line = cursor.line_of(cursor.psig)
+        if prev_line is not None and cursor.line_of(cursor.index) - prev_line - 1 >= self.max_blanks:
+            self.report(prev_line + 1, "Too many blank lines")
+
+
+class ComplexityRule(Rule):
+    """Цикломатическая сложность функций: V(G) = кол-во узлов ветвления + 1"""
+    name = 'complexity'
+    node_types = ('Function',)
+
+    def start(self, fixer=None):
+        super().start(fixer)
+        self.max_complexity = self.config.get('max_complexity') or 10
+
+    def on_node(self, node):
+        total = subtree_complexity(node) + 1
+        if total > self.max_complexity:
+            self.report(node.line, "complexity too high: {}", total)
+
+
+class UnusedVariablesRule(Rule):
+    """Объявленные, но ни разу не использованные переменные и параметры.
+    Работает по дереву областей, которое строит Parser, без прохода по токенам."""
+    name = 'no-unused-vars'
+    node_types = ('Program',)
+    cost = 2
+    local = False
+    suppressible = False
+
+    def is_enabled(self):
+        return self.config.get('no_unused_vars') is not False
+
+    def on_node(self, node):
+        program = node.scope
+        if program is None:
+            return
+        program.resolve()
+        unused = []
+        index = self.index
+        for scope in program.walk():
+            # Объявления верхнего уровня проверяются в области программы
+            if scope.kind == 'statement':
+                continue
+            for name, (line, kind) in scope.declared.items():
+                if kind != 'function' and name != 'console' and name not in scope.uses:
+                    # Переменная верхнего уровня может использоваться в других файлах
+                    if scope is program and index is not None and index.is_referenced(name):
+                        continue
+                    unused.append((line, name))
+        for line, name in sorted(unused):
+            self.report(line, "Unused variable: '{}'", name)
+
+
+class UnusedFunctionsRule(Rule):
+    """Функции верхнего уровня, которые не вызываются ни в своем файле, ни в
+    других файлах проекта. Работает только с индексом проекта (Rule.index)."""
+    name = 'no-unused-functions'
+    node_types = ('Program',)
+    local = False
+    suppressible = False
+    cost = 2
+
+    def is_enabled(self):
+        return self.index is not None and self.config.get('no_unused_functions') is not False
+
+    def on_node(self, node):
+        program = node.scope
+        if program is None:
+            return
+        program.resolve()
+        unused = [(line, name) for name, (line, kind) in program.declared.items()
+                  if kind == 'function' and name not in program.uses
+                  and not self.index.is_referenced(name)]
+        for line, name in sorted(unused):
+            self.report(line, "Function '{}' is never called in the project", name)
+
+
+# Правила, которые LinterEngine подключает по умолчанию (порядок = порядок отчетов)
+DEFAULT_RULES = (NamingRule, SpacingRule, BlankLinesRule, ComplexityRule, UnusedVariablesRule,
+                 UnusedFunctionsRule)
+
+
+def _as_pairs(diagnostics):
+    # Старый интерфейс check_*: пары (строка, сообщение)
+    return [(d.line, d.message) for d in diagnostics]
+
+
 class FormattingRules(BaseRule):
     """Правила форматирования и стилистики"""
 
     def check_naming(self, tokens):
-        errors = []
-        pattern = self.config.get('naming_pattern') or r'^[a-z][a-zA-Z0-9]*$'
-        
-        for i in range(len(tokens)):
-            tok = tokens[i]
-            if tok.type == 'ID':
-                prev_idx = i - 1
-                while prev_idx >= 0 and tokens[prev_idx].type == 'SKIP':
-                    prev_idx -= 1
-                
-                if prev_idx >= 0 and tokens[prev_idx].value in ['let', 'const', 'var', 'function']:
-                    if not re.match(pattern, tok.value):
-                        errors.append((tok.line, f"Naming violation: '{tok.value}'"))
-        return errors
+        return _as_pairs(run_rules([NamingRule(self.config)], tokens)[0])
 
     def check_spacing(self, tokens, fixer=None):
-        errors = []
-        if self.config.get('require_spaces_operators') is False:
-            return errors
-
-        # Проверяем все операторы: =, +, -, *, /
-        for i in range(1, len(tokens) - 1):
-            tok = tokens[i]
-            if tok.type == 'OP' and tok.value in ['=', '+', '-', '*', '/']:
-                missing_before = tokens[i-1].type != 'SKIP'
-                missing_after = tokens[i+1].type != 'SKIP'
-                
-                if missing_before or missing_after:
-                    errors.append((tok.line, f"Missing space around operator '{tok.value}'"))
-                    if fixer:
-                        if missing_before: fixer.add_fix(tok.start_idx, tok.start_idx, " ")
-                        if missing_after: fixer.add_fix(tok.end_idx, tok.end_idx, " ")
-        return errors
+        rule = SpacingRule(self.config)
+        if not rule.is_enabled():
+            return []
+        return _as_pairs(run_rules([rule], tokens, fixer=fixer)[0])
 
     def check_blank_lines(self, tokens):
-        errors = []
-        max_blanks = self.config.get('max_empty_lines') or 2
-        
-        code_tokens = [t for t in tokens if t.type != 'SKIP']
-        
-        for i in range(1, len(code_tokens)):
-            prev_tok = code_tokens[i-1]
-            curr_tok = code_tokens[i]
-            
-            line_diff = curr_tok.line - prev_tok.line - 1
-            
-            if line_diff >= max_blanks:
-                errors.append((prev_tok.line + 1, "Too many blank lines"))
-                
-        return errors
+        return _as_pairs(run_rules([BlankLinesRule(self.config)], tokens)[0])
 
 class LogicRules(BaseRule):
     """Правила анализа структуры и логики"""
 
     def get_complexity(self, node):
-        """Рекурсивно собирает сложность со всех вложенных узлов"""
-        total = getattr(node, 'complexity', 0)
-        for child in node.children:
-            total += self.get_complexity(child)
-        return total
+        """Сложность узла вместе со всеми вложенными узлами"""
+        return subtree_complexity(node)
 
     def check_complexity(self, node, reports):
-        max_c = self.config.get('max_complexity') or 10
-        
-        if node.type == 'Function':
-            # V(G) = кол-во узлов ветвления + 1
-            total = self.get_complexity(node) + 1
-            if total > max_c:
-                reports.append((node.line, f"complexity too high: {total}"))
-        
-        for child in node.children:
-            self.check_complexity(child, reports)
+        reports.extend(_as_pairs(run_rules([ComplexityRule(self.config)], [], node)[0]))
 
     def check_unused(self, ast, tokens):
-        errors = []
-        declared = [] # (имя, строка)
-        used = set()
-
-        def walk_ast(n):
-            if n.type in ['VariableDeclaration', 'Param']:
-                declared.append((n.value, n.line))
-            for child in n.children:
-                walk_ast(child)
-        walk_ast(ast)
-
-        for i, tok in enumerate(tokens):
-            if tok.type == 'ID':
-                p_idx = i - 1
-                while p_idx >= 0 and tokens[p_idx].type == 'SKIP':
-                    p_idx -= 1
-                
-                is_declaration = (p_idx >= 0 and tokens[p_idx].value in ['let', 'const', 'var', 'function'])
-                if not is_declaration:
-                    used.add(tok.value)
-
-        for name, line in declared:
-            if name not in used and name != 'console':
-                errors.append((line, f"Unused variable: '{name}'"))
-        
-        return errors
+        return _as_pairs(run_rules([UnusedVariablesRule(self.config)], tokens, ast)[0])
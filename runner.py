@@ -0,0 +1,369 @@
+import fnmatch
+import glob
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from time import perf_counter
+
+from diagnostics import Diagnostic
+from lexer import Lexer, NON_ASCII, iter_buffer_tokens, iter_chunk_tokens
+from parser_js import Parser
+from engine import MINIFIED_SAMPLE, SKIP_TIME_BUDGET, LinterEngine
+from fixer import Fixer
+from parallel import parse_parallel
+from timing import Timings
+
+JS_EXTENSIONS = ('.js',)
+# Файлы крупнее этого порога (и без --fix) разбираются потоково через mmap
+STREAM_THRESHOLD = 32 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# Файлы крупнее этого порога при --jobs > 1 разбираются по фрагментам в пуле процессов
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+# Директории, которые никогда не линтим при обходе дерева
+IGNORED_DIRS = {'node_modules', '.git'}
+
+
+class LintResult:
+    """Результат проверки одного файла; diagnostics - список diagnostics.Diagnostic,
+    skipped - пропущенные правила [(имя, причина)] (см. LinterEngine.skipped)"""
+    def __init__(self, path, diagnostics, fixes_applied=0, error=None, fixes_skipped=0, skipped=()):
+        self.path = path
+        for diagnostic in diagnostics:
+            diagnostic.file = path
+        self.diagnostics = diagnostics
+        self.skipped = list(skipped)
+        self.fixes_applied = fixes_applied
+        self.fixes_skipped = fixes_skipped
+        self.error = error
+        self.timings = None  # Timings этого файла, если включены замеры
+        # Исправленный текст, если запись на диск отложена (lint_file(save=False))
+        self.fixed_code = None
+
+    @property
+    def reports(self):
+        """Текстовые отчеты, как LinterEngine.reports"""
+        return [str(d) for d in self.diagnostics]
+
+
+def is_ignored(path, patterns):
+    """Совпадает ли путь (или его последний компонент) с одним из glob-шаблонов"""
+    if not patterns:
+        return False
+    path = os.path.normpath(path).replace(os.sep, '/')
+    name = path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatchcase(name, p) or fnmatch.fnmatchcase(path, p) for p in patterns)
+
+
+def collect_files(paths, ignore=()):
+    """Разворачивает файлы, директории и glob-шаблоны в отсортированный список .js файлов.
+    ignore - glob-шаблоны путей или имен, которые пропускаются (вместе с содержимым директорий)"""
+    found = set()
+    for path in paths:
+        matches = glob.glob(path, recursive=True) if glob.has_magic(path) else [path]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, files in os.walk(match):
+                    dirs[:] = [d for d in dirs if d not in IGNORED_DIRS
+                               and not is_ignored(os.path.join(root, d), ignore)]
+                    for name in files:
+                        file_path = os.path.join(root, name)
+                        if name.endswith(JS_EXTENSIONS) and not is_ignored(file_path, ignore):
+                            found.add(os.path.normpath(file_path))
+            elif os.path.isfile(match) and not is_ignored(match, ignore):
+                found.add(os.path.normpath(match))
+    return sorted(found)
+
+
+def lint_code(code, config, fixer=None, timings=None, path=None, pool=None, skipped=None,
+              index=None, rules=None):
+    """Полный цикл lexer -> parser -> engine для одного исходника.
+    С pool лексер и парсер работают по фрагментам в пуле процессов.
+    В список skipped, если он передан, добавляются пропущенные правила.
+    index - project_index.ProjectIndex для правил, которым нужны другие файлы.
+    rules - готовые экземпляры правил вместо новых (см. LinterEngine)."""
+    engine = LinterEngine(code, config, index, rules)
+    if timings is not None:
+        engine.add_hook(timings.hook(path))
+
+    if pool is not None:
+        start = perf_counter()
+        tokens, ast, errors, _ = parse_parallel(code, pool)
+        if engine.hooks:
+            engine.emit('lex+parse.parallel', start, perf_counter() - start, 1, len(tokens))
+    else:
+        start = perf_counter()
+        tokens = Lexer(code, config.get('lexer') or 'regex').tokenize()
+        if engine.hooks:
+            engine.emit('lex', start, perf_counter() - start, 1, len(tokens))
+
+        start = perf_counter()
+        parser = Parser(tokens)
+        ast = parser.parse()
+        errors = parser.errors
+        if engine.hooks:
+            engine.emit('parse', start, perf_counter() - start, 1, ast.count_nodes())
+
+    for parse_error in errors:
+        engine.add_syntax_error(parse_error)
+
+    engine.run(tokens, ast, fixer)
+    if skipped is not None:
+        skipped.extend(engine.skipped)
+    return engine.diagnostics
+
+
+def read_chunks(path, size=CHUNK_SIZE):
+    """Читает текстовый файл фрагментами по size символов"""
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def lint_chunks(chunks, config, timings=None, path=None, skipped=None, index=None):
+    """Проверка текста, поступающего фрагментами, с ограниченным расходом памяти"""
+    engine = LinterEngine(None, config, index)
+    if timings is not None:
+        engine.add_hook(timings.hook(path))
+    chunks = iter(chunks)
+    first = next(chunks, '')
+    engine.run_stream(iter_chunk_tokens(chain([first], chunks)), first)
+    if skipped is not None:
+        skipped.extend(engine.skipped)
+    return engine.diagnostics
+
+
+def lint_mapped(path, config, timings=None, skipped=None, index=None):
+    """Потоковая проверка файла через mmap: лексер читает отображенные байты,
+    поэтому в памяти нет ни копии текста, ни массива токенов. Возвращает None,
+    если файл пуст или не ASCII - тогда нужен обычный текстовый путь."""
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить
+            return None
+    with buf:
+        if NON_ASCII.search(buf):
+            return None
+        engine = LinterEngine(None, config, index)
+        if timings is not None:
+            engine.add_hook(timings.hook(path))
+        engine.run_stream(iter_buffer_tokens(buf), buf[:MINIFIED_SAMPLE])
+        if skipped is not None:
+            skipped.extend(engine.skipped)
+        return engine.diagnostics
+
+
+def _to_cache(diagnostics, fixes, skipped=()):
+    return {'diagnostics': [d.to_tuple() for d in diagnostics], 'fixes': fixes,
+            'skipped': [list(s) for s in skipped]}
+
+
+def _cacheable(skipped):
+    # Что успело провериться за отведенное время, зависит от нагрузки машины
+    return all(reason != SKIP_TIME_BUDGET for _, reason in skipped)
+
+
+def _valid(entry):
+    # Записи старого формата (строки отчетов без 'diagnostics') считаются промахом
+    return entry if entry is not None and 'diagnostics' in entry else None
+
+
+def _from_cache(entry):
+    return [Diagnostic.from_tuple(data) for data in entry['diagnostics']]
+
+
+def _skipped_from_cache(entry):
+    return [tuple(s) for s in entry.get('skipped', ())]
+
+
+def _settings_digest(config, index, path):
+    # С индексом результат зависит и от того, что другие файлы берут из этого
+    digest = config.digest()
+    return digest if index is None else digest + index.fingerprint(path)
+
+
+def _lint_large_file(path, config, cache, timings, index):
+    key = None
+    if cache is not None:
+        start = perf_counter()
+        key = cache.make_file_key(path, _settings_digest(config, index, path))
+        entry = _valid(cache.get(key))
+        if timings is not None:
+            timings.add('cache.lookup', start, perf_counter() - start, 1, int(entry is not None), path)
+        if entry is not None:
+            return LintResult(path, _from_cache(entry), skipped=_skipped_from_cache(entry))
+    skipped = []
+    try:
+        diagnostics = lint_mapped(path, config, timings, skipped, index)
+        if diagnostics is None:
+            # Не-ASCII текст разбирается по декодированным фрагментам
+            diagnostics = lint_chunks(read_chunks(path), config, timings, path, skipped, index)
+    except (OSError, UnicodeDecodeError) as e:
+        return LintResult(path, [], error=f"Could not read file: {e}")
+    if cache is not None and _cacheable(skipped):
+        cache.put(key, _to_cache(diagnostics, [], skipped))
+    return LintResult(path, diagnostics, skipped=skipped)
+
+
+def lint_file(path, config, cache=None, timings=None, pool=None, data=None,
+              on_disk=None, save=True, index=None):
+    """Проверяет файл и, если включен autofix, записывает исправления на диск.
+    Если передан timings, в него пишутся замеры стадий и общее время файла.
+    С pool файлы от PARALLEL_THRESHOLD разбираются по фрагментам в этом пуле.
+    data - содержимое (bytes) не с диска, например из индекса git; тогда
+    исправления не записываются. Если data уже прочитано с диска, передается
+    on_disk=True. С save=False исправленный текст не пишется, а остается в
+    result.fixed_code. config - Config или config.ConfigResolver: настройки
+    файла берутся через config.for_file(path). index - индекс проекта
+    (project_index.ProjectIndex) для межфайловых правил."""
+    if on_disk is None:
+        on_disk = data is None
+    start = perf_counter()
+    result = _lint_file(path, config.for_file(path), cache, timings, pool, data, on_disk, save, index)
+    if timings is not None:
+        timings.add_file(path, perf_counter() - start)
+        result.timings = timings
+    return result
+
+
+def _lint_file(path, config, cache, timings, pool, data, on_disk, save, index):
+    try:
+        size = os.path.getsize(path) if data is None else len(data)
+        if pool is not None and size < PARALLEL_THRESHOLD:
+            pool = None
+        if data is None:
+            # Fixer работает с полным текстом, поэтому в режиме --fix поток не используется;
+            # параллельному разбору тоже нужен весь текст
+            if pool is None and not config.get('autofix') and size >= STREAM_THRESHOLD:
+                return _lint_large_file(path, config, cache, timings, index)
+            with open(path, 'rb') as f:
+                data = f.read()
+        elif not on_disk:
+            if config.get('autofix'):
+                # Кэш с --fix хранит исправления, а для такого содержимого их нет
+                cache = None
+        code = data.decode('utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        return LintResult(path, [], error=f"Could not read file: {e}")
+
+    fixer = Fixer(code) if config.get('autofix') and on_disk else None
+
+    entry = None
+    if cache is not None:
+        start = perf_counter()
+        key = cache.make_key(data, _settings_digest(config, index, path))
+        entry = _valid(cache.get(key))
+        if timings is not None:
+            timings.add('cache.lookup', start, perf_counter() - start, 1, int(entry is not None), path)
+
+    if entry is not None:
+        diagnostics = _from_cache(entry)
+        skipped = _skipped_from_cache(entry)
+        if fixer:
+            fixer.fixes = [tuple(fix) for fix in entry['fixes']]
+    else:
+        skipped = []
+        diagnostics = lint_code(code, config, fixer, timings, path, pool, skipped, index)
+        if cache is not None and _cacheable(skipped):
+            # autofix входит в хэш настроек, так что исправления кэшируются только для --fix
+            cache.put(key, _to_cache(diagnostics, fixer.fixes if fixer else [], skipped))
+
+    result = LintResult(path, diagnostics, skipped=skipped)
+    if fixer and fixer.fixes:
+        try:
+            start = perf_counter()
+            new_code = fixer.apply()
+            if timings is not None:
+                timings.add('fixer.apply', start, perf_counter() - start, 1, len(fixer.fixes), path)
+            if save:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(new_code)
+            else:
+                result.fixed_code = new_code
+            result.fixes_applied = fixer.applied
+            result.fixes_skipped = fixer.skipped
+        except OSError as e:
+            result.error = f"Error saving changes: {e}"
+    return result
+
+
+# Состояние воркера: передается один раз при старте процесса, а не с каждым файлом
+_worker_config = None
+_worker_cache = None
+_worker_timing = None
+_worker_index = None
+
+
+def _make_timings(timing):
+    """timing: None, 'summary' или 'trace'"""
+    return Timings(trace=timing == 'trace') if timing else None
+
+
+def _init_worker(config, cache, timing, index=None):
+    global _worker_config, _worker_cache, _worker_timing, _worker_index
+    _worker_config = config
+    _worker_cache = cache
+    _worker_timing = timing
+    _worker_index = index
+
+
+def _lint_in_worker(item):
+    path, data = item
+    return lint_file(path, _worker_config, _worker_cache, _make_timings(_worker_timing), data=data,
+                     index=_worker_index)
+
+
+def _lint_read_in_worker(item):
+    """Для pipeline: содержимое уже прочитано с диска, запись исправлений делает родитель"""
+    path, data = item
+    return lint_file(path, _worker_config, _worker_cache, _make_timings(_worker_timing),
+                     data=data, on_disk=True, save=False, index=_worker_index)
+
+
+def _is_huge(path, data):
+    try:
+        size = os.path.getsize(path) if data is None else len(data)
+    except OSError:
+        return False
+    return size >= PARALLEL_THRESHOLD
+
+
+def lint_files(paths, config, jobs=None, cache=None, timing=None, sources=None, index=None):
+    """Проверяет файлы в пуле процессов. Генератор: результаты отдаются в порядке paths.
+    timing ('summary' или 'trace') включает замеры: у каждого результата будет .timings
+    sources - словарь путь -> bytes для файлов, содержимое которых берется не с диска.
+    index - индекс проекта, передается воркерам один раз при старте.
+
+    Огромные файлы (от PARALLEL_THRESHOLD) проверяются в текущем процессе, а их
+    лексер и парсер раздаются фрагментами в тот же пул."""
+    jobs = jobs or os.cpu_count() or 1
+    sources = sources or {}
+    huge = {path for path in paths if _is_huge(path, sources.get(path))} if jobs > 1 else set()
+    if jobs <= 1 or (len(paths) <= 1 and not huge):
+        for path in paths:
+            yield lint_file(path, config, cache, _make_timings(timing), data=sources.get(path),
+                            index=index)
+        return
+
+    regular = [(path, sources.get(path)) for path in paths if path not in huge]
+    # Крупные порции снижают накладные расходы IPC на десятках тысяч мелких файлов
+    chunksize = max(1, min(64, len(regular) // (jobs * 4)))
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                               initargs=(config, cache, timing, index))
+    try:
+        results = pool.map(_lint_in_worker, regular, chunksize=chunksize)
+        for path in paths:
+            if path in huge:
+                yield lint_file(path, config, cache, _make_timings(timing), pool, sources.get(path),
+                                index=index)
+            else:
+                yield next(results)
+    finally:
+        # Потребитель мог остановиться раньше (--max-warnings): еще не
+        # начатые файлы не проверяются
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+
+from config import CONFIG_FILENAME, Config, ConfigResolver, load_settings
+from engine import SKIP_TIME_BUDGET
+from incremental import lint_state, relint
+
+# Коды ошибок JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+TYPE_NAMES = {str: 'a string', int: 'an integer'}
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class LintServer:
+    """Долгоживущий процесс линтера: конфиги, правила и результаты остаются
+    в памяти между запросами. Протокол - JSON-RPC 2.0, одно сообщение на строку.
+
+    Методы:
+      lint     {path} или {text, filename}, опционально {config}
+      edit     {filename, offset, removed, inserted} - правка открытого буфера
+      close    {filename} - забыть буфер
+      ping, shutdown
+
+    Настройки - как в командной строке: .jslintrc.json по пути файла, поверх
+    них config_path (--config) и settings (флаги); lookup=False - без поиска
+    .jslintrc.json (--no-config-lookup). Проверка идет через тот же движок:
+    минифицированные файлы, time_budget и max_warnings, пропущенные правила
+    возвращаются в skipped.
+    """
+    MAX_CACHED_RESULTS = 4096
+
+    def __init__(self, config_path=None, settings=None, lookup=True):
+        self.config_path = config_path
+        self.settings = dict(settings or {})
+        self.lookup = lookup
+        self._configs = {}              # (путь --config, директория) -> (снимок файлов, ConfigResolver или Config)
+        self._results = OrderedDict()   # (хэш настроек, хэш текста) -> (diagnostics, skipped)
+        self._buffers = {}              # filename -> LintState для правок
+        # Клиенты сокета обслуживаются в своих потоках; запросы выполняются по одному
+        self._lock = threading.Lock()
+        self.running = True
+
+    def get_config(self, path=None, filename=None):
+        """Config для файла filename. Разрешение настроек запоминается по
+        директории файла и повторяется, только если изменился какой-то из
+        файлов настроек, от которых оно зависит."""
+        path = path or self.config_path
+        explicit = os.path.abspath(path) if path else None
+        name = filename or '<buffer>'
+        directory = os.path.dirname(os.path.abspath(name)) if self.lookup else None
+        key = (explicit, directory)
+        stamp = _stamp(explicit, directory)
+        cached = self._configs.get(key)
+        if cached is None or cached[0] != stamp:
+            settings = load_settings(path)
+            settings.update(self.settings)
+            resolver = ConfigResolver(settings) if self.lookup else Config.from_settings(settings)
+            cached = self._configs[key] = (stamp, resolver)
+        return cached[1].for_file(name)
+
+    def _lint_text(self, text, config):
+        key = (config.digest(), hashlib.sha256(text.encode('utf-8')).hexdigest())
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            return cached, None
+        state = lint_state(text, config)
+        cached = (state.diagnostics(), [{'rule': name, 'reason': reason} for name, reason in state.skipped])
+        # Результат, обрезанный по времени, зависит от нагрузки - не запоминаем
+        if not any(reason == SKIP_TIME_BUDGET for _, reason in state.skipped):
+            self._results[key] = cached
+            if len(self._results) > self.MAX_CACHED_RESULTS:
+                self._results.popitem(last=False)
+        return cached, state
+
+    def rpc_lint(self, path=None, text=None, filename=None, config=None):
+        _check('path', path, str)
+        _check('text', text, str)
+        _check('filename', filename, str)
+        _check('config', config, str)
+        cfg = self.get_config(config, filename or path)
+        if text is None:
+            if not path:
+                raise RpcError(INVALID_PARAMS, "Either 'path' or 'text' is required")
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                raise RpcError(INVALID_PARAMS, f"Could not read file: {e}")
+        name = filename or path or '<buffer>'
+        (diagnostics, skipped), state = self._lint_text(text, cfg)
+        if filename:
+            # Для открытых буферов храним состояние, чтобы правки перепроверялись инкрементально
+            self._buffers[filename] = state if state is not None else lint_state(text, cfg)
+        return {'path': name, 'diagnostics': diagnostics, 'skipped': skipped}
+
+    def rpc_edit(self, filename, offset, removed, inserted):
+        _check('filename', filename, str, required=True)
+        _check('offset', offset, int, required=True)
+        _check('removed', removed, int, required=True)
+        _check('inserted', inserted, str, required=True)
+        state = self._buffers.get(filename)
+        if state is None:
+            raise RpcError(INVALID_PARAMS, f"Buffer {filename!r} is not open")
+        try:
+            state = relint(state, offset, removed, inserted)
+        except ValueError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        self._buffers[filename] = state
+        return {'path': filename, 'diagnostics': state.diagnostics(),
+                'skipped': [{'rule': name, 'reason': reason} for name, reason in state.skipped]}
+
+    def rpc_close(self, filename):
+        _check('filename', filename, str, required=True)
+        return self._buffers.pop(filename, None) is not None
+
+    def rpc_ping(self):
+        return 'pong'
+
+    def rpc_shutdown(self):
+        self.running = False
+        return True
+
+    def handle(self, request):
+        """Обрабатывает разобранный запрос; возвращает ответ или None для уведомлений"""
+        req_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                raise RpcError(INVALID_REQUEST, "Invalid request")
+            method = getattr(self, 'rpc_' + request['method'], None)
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            params = request.get('params') or {}
+            if not isinstance(params, (dict, list)):
+                raise RpcError(INVALID_PARAMS, "Params must be an object or an array")
+            try:
+                result = method(**params) if isinstance(params, dict) else method(*params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e))
+        except RpcError as e:
+            response = {'jsonrpc': '2.0', 'id': req_id, 'error': {'code': e.code, 'message': str(e)}}
+        except Exception as e:
+            # Ошибка в обработке одного запроса не должна останавливать сервер
+            response = {'jsonrpc': '2.0', 'id': req_id,
+                        'error': {'code': INTERNAL_ERROR, 'message': f"Internal error: {e}"}}
+        else:
+            response = {'jsonrpc': '2.0', 'id': req_id, 'result': result}
+        if isinstance(request, dict) and 'id' not in request:
+            return None
+        return response
+
+    def handle_line(self, line):
+        """Одна строка протокола -> строка ответа (или None)"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {'jsonrpc': '2.0', 'id': None,
+                        'error': {'code': PARSE_ERROR, 'message': "Parse error"}}
+        else:
+            with self._lock:
+                response = self.handle(request)
+        if response is None:
+            return None
+        return json.dumps(response, ensure_ascii=False)
+
+    def serve_stream(self, reader, writer):
+        for line in reader:
+            if not line.strip():
+                continue
+            out = self.handle_line(line)
+            if out is not None:
+                writer.write(out + '\n')
+                writer.flush()
+            if not self.running:
+                break
+
+    def serve_stdio(self):
+        # Случайный print (предупреждения конфига и т.п.) не должен ломать протокол
+        writer = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            self.serve_stream(sys.stdin, writer)
+        finally:
+            sys.stdout = writer
+
+    def serve_unix(self, socket_path):
+        lint_server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = (raw.decode('utf-8') for raw in self.rfile)
+                writer = _SocketWriter(self.wfile)
+                lint_server.serve_stream(reader, writer)
+                if not lint_server.running:
+                    # shutdown() блокируется до выхода из serve_forever - вызываем из другого потока
+                    threading.Thread(target=self.server.shutdown).start()
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            # Открытое соединение редактора не должно мешать другим клиентам и выходу
+            daemon_threads = True
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        with Server(socket_path, Handler) as srv:
+            try:
+                srv.serve_forever()
+            finally:
+                os.unlink(socket_path)
+
+
+def _check(name, value, kind, required=False):
+    """Проверка типа параметра запроса: ошибка INVALID_PARAMS вместо исключения в обработчике"""
+    if value is None and not required:
+        return
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise RpcError(INVALID_PARAMS, f"Parameter {name!r} must be {TYPE_NAMES[kind]}")
+
+
+def _stamp(explicit, directory):
+    """(mtime, размер) файла --config и .jslintrc.json в directory и выше"""
+    paths = [explicit] if explicit else []
+    while directory is not None:
+        paths.append(os.path.join(directory, CONFIG_FILENAME))
+        parent = os.path.dirname(directory)
+        directory = parent if parent != directory else None
+    stamp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+class _SocketWriter:
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode('utf-8'))
+
+    def flush(self):
+        self.wfile.flush()
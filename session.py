@@ -0,0 +1,66 @@
+from config import Config
+from fixer import Fixer
+from rules import DEFAULT_RULES
+from runner import LintResult, lint_code
+
+
+class LinterSession:
+    """Линтер для встраивания в другой процесс (сборщик, редактор, тесты).
+
+    Настройки, скомпилированные выражения (Config.naming_regex) и экземпляры
+    правил создаются один раз на набор настроек и переиспользуются всеми
+    вызовами lint_source, поэтому на тысячах исходников из памяти не
+    приходится каждый раз собирать Config, правила и движок заново.
+
+    config - Config, config.ConfigResolver, словарь настроек или None
+    (настройки по умолчанию). Сессия не потокобезопасна: правила хранят
+    состояние текущей проверки; для потоков нужна своя сессия на поток.
+    """
+
+    def __init__(self, config=None, index=None, fix=False):
+        if config is None:
+            config = Config()
+        elif isinstance(config, dict):
+            config = Config.from_settings(config)
+        self.config = config
+        self.index = index  # project_index.ProjectIndex для межфайловых правил
+        self.fix = fix      # собирать исправленный текст (result.fixed_code)
+        self._rules = {}    # id(Config) -> (Config, [правила])
+        if isinstance(config, Config):
+            self.rules_for(config)
+
+    def rules_for(self, config):
+        """Экземпляры правил для настроек config; создаются при первом обращении.
+        ConfigResolver отдает один Config на одинаковые настройки, так что
+        правила делят все файлы с этими настройками."""
+        entry = self._rules.get(id(config))
+        if entry is None or entry[0] is not config:
+            config.naming_regex  # компилируется один раз здесь, а не на первом файле
+            entry = (config, [rule_cls(config) for rule_cls in DEFAULT_RULES])
+            self._rules[id(config)] = entry
+        return entry[1]
+
+    def lint_source(self, text, filename='<input>'):
+        """Проверяет текст из памяти; filename выбирает настройки (для
+        ConfigResolver) и попадает в результат. Возвращает runner.LintResult:
+        diagnostics, skipped и, если сессия с fix, fixed_code."""
+        config = self.config.for_file(filename)
+        fixer = Fixer(text) if self.fix or config.get('autofix') else None
+        skipped = []
+        diagnostics = lint_code(text, config, fixer, skipped=skipped, index=self.index,
+                                rules=self.rules_for(config))
+        result = LintResult(filename, diagnostics, skipped=skipped)
+        if fixer is not None and fixer.fixes:
+            result.fixed_code = fixer.apply()
+            result.fixes_applied = fixer.applied
+            result.fixes_skipped = fixer.skipped
+        return result
+
+    def lint_many(self, sources):
+        """Генератор результатов по порядку; sources - тексты или пары (имя файла, текст)"""
+        for number, item in enumerate(sources):
+            if isinstance(item, str):
+                yield self.lint_source(item, f'<input-{number}>')
+            else:
+                filename, text = item
+                yield self.lint_source(text, filename)
@@ -0,0 +1,147 @@
+from bisect import bisect_left, bisect_right
+
+from lexer import TokenStream, TYPE_CODES
+
+# Директивы в комментариях:
+#   /* lint-disable */ ... /* lint-enable */          - все правила
+#   /* lint-disable naming, spacing */ ... /* lint-enable naming */ - выбранные правила
+#   // lint-disable-next-line [правила]               - только следующая строка
+DISABLE = 'lint-disable'
+ENABLE = 'lint-enable'
+DISABLE_NEXT_LINE = 'lint-disable-next-line'
+
+COMMENT = TYPE_CODES['COMMENT']
+END = float('inf')
+
+
+def parse_directive(comment):
+    """Текст комментария -> (директива, кортеж правил) или None"""
+    if comment.startswith('//'):
+        body = comment[2:]
+    else:
+        body = comment[2:-2]
+    words = body.replace(',', ' ').split()
+    if not words or words[0] not in (DISABLE, ENABLE, DISABLE_NEXT_LINE):
+        return None
+    return words[0], tuple(words[1:])
+
+
+class LineFilter:
+    """Проверка строк по отсортированным интервалам. Для неубывающих номеров
+    строк (токены по порядку) каждая проверка - O(1) амортизированно."""
+    __slots__ = ('starts', 'ends', 'i')
+
+    def __init__(self, starts, ends):
+        self.starts = starts
+        self.ends = ends
+        self.i = 0
+
+    def __call__(self, line):
+        starts, ends = self.starts, self.ends
+        i = self.i
+        if i > 0 and ends[i - 1] >= line:
+            # Строка пошла назад - ищем заново
+            i = self.i = max(bisect_right(starts, line) - 1, 0)
+        n = len(starts)
+        while i < n and ends[i] < line:
+            i += 1
+        self.i = i
+        return i < n and starts[i] <= line
+
+
+class Suppressions:
+    """Подавленные строки: отсортированные интервалы [начало, конец] для всех
+    правил (ключ None) и для отдельных правил, поиск через bisect."""
+
+    def __init__(self, intervals=None):
+        # ключ (None или имя правила) -> (starts, ends) без пересечений
+        self.intervals = {}
+        for key, spans in (intervals or {}).items():
+            self.intervals[key] = self._merge(spans)
+
+    @staticmethod
+    def _merge(spans):
+        starts, ends = [], []
+        for start, end in sorted(spans):
+            if ends and start <= ends[-1] + 1:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        return starts, ends
+
+    @classmethod
+    def from_comments(cls, comments):
+        """comments - упорядоченные пары (номер строки, текст комментария)"""
+        spans = {}
+        open_since = {}  # ключ -> строка открывающей директивы
+        for line, text in comments:
+            directive = parse_directive(text)
+            if directive is None:
+                continue
+            kind, names = directive
+            keys = names or (None,)
+            if kind == DISABLE_NEXT_LINE:
+                for key in keys:
+                    spans.setdefault(key, []).append((line + 1, line + 1))
+            elif kind == DISABLE:
+                for key in keys:
+                    # Повторный disable внутри открытого диапазона ничего не меняет
+                    open_since.setdefault(key, line)
+            else:
+                # enable без правил закрывает все диапазоны; саму строку с enable
+                # тоже исключаем из проверки
+                for key in (names or list(open_since) or (None,)):
+                    start = open_since.pop(key, line)
+                    spans.setdefault(key, []).append((start, line))
+        for key, start in open_since.items():
+            spans.setdefault(key, []).append((start, END))
+        return cls(spans)
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        """Директивы из COMMENT-токенов (TokenStream или последовательность Token)"""
+        if isinstance(tokens, TokenStream):
+            types, lines = tokens.types, tokens.lines
+            comments = ((lines[i], tokens.value_of(i))
+                        for i in range(len(types)) if types[i] == COMMENT)
+        else:
+            comments = ((tok.line, tok.value) for tok in tokens if tok.type == 'COMMENT')
+        return cls.from_comments(comments)
+
+    def __bool__(self):
+        return bool(self.intervals)
+
+    def _covers(self, key, line):
+        spans = self.intervals.get(key)
+        if spans is None:
+            return False
+        starts, ends = spans
+        i = bisect_right(starts, line) - 1
+        return i >= 0 and ends[i] >= line
+
+    def is_suppressed(self, line, rule=None):
+        """Подавлена ли строка для всех правил или для правила rule"""
+        return self._covers(None, line) or (rule is not None and self._covers(rule, line))
+
+    def index_ranges(self, lines):
+        """Отрезки индексов [lo, hi) токенов на строках, подавленных для всех
+        правил; lines - неубывающие номера строк токенов (TokenStream.lines)"""
+        spans = self.intervals.get(None)
+        if spans is None:
+            return []
+        ranges = []
+        for start, end in zip(*spans):
+            lo, hi = bisect_left(lines, start), bisect_right(lines, end)
+            if lo < hi:
+                ranges.append((lo, hi))
+        return ranges
+
+    def filter_for(self, rule):
+        """LineFilter по интервалам, действующим на правило, или None, если их нет"""
+        spans = [(s, e) for key in (None, rule) if key in self.intervals
+                 for s, e in zip(*self.intervals[key])]
+        if not spans:
+            return None
+        return LineFilter(*self._merge(spans))
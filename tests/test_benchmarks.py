@@ -0,0 +1,35 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench import compare, run
+from benchmarks.corpus import SHAPES, generate
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_corpus_is_deterministic(self):
+        """Один и тот же seed дает один и тот же корпус, разные - разный"""
+        for shape in SHAPES:
+            self.assertEqual(generate(shape, 50, seed=1), generate(shape, 50, seed=1))
+        self.assertNotEqual(generate('mixed', 50, seed=1), generate('mixed', 50, seed=2))
+
+    def test_run_reports_every_stage(self):
+        """Каждая стадия замерена для каждой формы корпуса"""
+        data = run(['nested', 'minified'], size=20, repeat=1)
+        for shape in ('nested', 'minified'):
+            stages = data['results'][shape]
+            self.assertIn('lexer.tokenize', stages)
+            self.assertIn('rules.check_unused', stages)
+            self.assertIn('fixer.apply', stages)
+
+    def test_compare_flags_regressions(self):
+        """Замедление выше порога отмечается, мелкий шум - нет"""
+        baseline = {'results': {'mixed': {'lexer.tokenize': 0.010, 'parser.parse': 0.010}}}
+        current = {'results': {'mixed': {'lexer.tokenize': 0.030, 'parser.parse': 0.0105}}}
+        regressions = compare(baseline, current, threshold=0.25)
+        self.assertEqual([(shape, stage) for shape, stage, _, _ in regressions], [('mixed', 'lexer.tokenize')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import runner
+from cache import LintCache
+from config import Config
+from runner import lint_file
+
+class TestLintCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LintCache(os.path.join(self.tmp.name, "cache"))
+        self.js_path = os.path.join(self.tmp.name, "code.js")
+        with open(self.js_path, "w") as f:
+            f.write("let bad_name=1;\nconsole.log(bad_name);\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_content_and_config(self):
+        """Ключ меняется и при изменении файла, и при изменении настроек"""
+        config = Config()
+        key = LintCache.make_key(b"let a;", config.digest())
+        self.assertEqual(key, LintCache.make_key(b"let a;", Config().digest()))
+        self.assertNotEqual(key, LintCache.make_key(b"let b;", config.digest()))
+
+        config.settings['max_complexity'] = 3
+        self.assertNotEqual(key, LintCache.make_key(b"let a;", config.digest()))
+
+    def test_key_depends_on_linter_version(self):
+        """После обновления правил (LintCache.VERSION) старые записи не используются"""
+        key = LintCache.make_file_key(self.js_path, "cfg")
+        with open(self.js_path, "rb") as f:
+            self.assertEqual(key, LintCache.make_key(f.read(), "cfg"))
+        with mock.patch.object(LintCache, "VERSION", LintCache.VERSION + 1):
+            self.assertNotEqual(key, LintCache.make_file_key(self.js_path, "cfg"))
+
+    def test_hit_skips_pipeline(self):
+        """Повторный прогон неизмененного файла не вызывает лексер, парсер и правила"""
+        config = Config()
+        first = lint_file(self.js_path, config, self.cache)
+        self.assertTrue(any("bad_name" in r for r in first.reports))
+
+        with mock.patch.object(runner, "lint_code") as pipeline:
+            second = lint_file(self.js_path, config, self.cache)
+            pipeline.assert_not_called()
+        self.assertEqual(first.reports, second.reports)
+
+    def test_cached_fixes_are_applied(self):
+        """Исправления берутся из кэша в режиме --fix"""
+        config = Config()
+        config.settings['autofix'] = True
+        with open(self.js_path) as f:
+            original = f.read()
+
+        lint_file(self.js_path, config, self.cache)
+        with open(self.js_path, "w") as f:
+            f.write(original)
+
+        with mock.patch.object(runner, "lint_code") as pipeline:
+            result = lint_file(self.js_path, config, self.cache)
+            pipeline.assert_not_called()
+        self.assertEqual(result.fixes_applied, 2)
+        with open(self.js_path) as f:
+            self.assertIn("bad_name = 1", f.read())
+
+    def test_prune_evicts_least_recently_used(self):
+        """При превышении размера удаляются записи с самым старым временем использования"""
+        cache = LintCache(self.cache.location, max_size=1000)
+        for i in range(10):
+            key = LintCache.make_key(str(i).encode(), "cfg")
+            cache.put(key, {"reports": ["x" * 200], "fixes": []})
+            os.utime(cache._path(key), (i, i))
+
+        fresh = LintCache.make_key(b"9", "cfg")
+        self.assertGreater(cache.prune(), 0)
+        self.assertIsNotNone(cache.get(fresh))
+        self.assertIsNone(cache.get(LintCache.make_key(b"0", "cfg")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config as config_module
+from config import Config, ConfigResolver
+
+class TestConfigResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write(".jslintrc.json", {"max_complexity": 5, "max_empty_lines": 1,
+                                      "overrides": [{"files": ["*.test.js"], "max_complexity": 50}]})
+        self.write("src/.jslintrc.json", {"max_complexity": 7,
+                                          "overrides": [{"files": "legacy/**", "naming_pattern": "^[a-z_]+$"}]})
+        self.write("vendor/.jslintrc.json", {"root": True, "no_unused_vars": False})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_cascade_overrides_and_root(self):
+        resolver = ConfigResolver({"autofix": True})
+        src = resolver.for_file(self.path("src/a/b.js"))
+        self.assertEqual((src.get("max_complexity"), src.get("max_empty_lines")), (7, 1))
+        self.assertTrue(src.get("autofix"))
+        self.assertIsNone(src.get("overrides"))
+
+        self.assertEqual(resolver.for_file(self.path("src/a/b.test.js")).get("max_complexity"), 50)
+        legacy = resolver.for_file(self.path("src/legacy/old/x.js"))
+        self.assertTrue(legacy.naming_regex.match("snake_case"))
+
+        vendor = resolver.for_file(self.path("vendor/lib.js"))
+        self.assertFalse(vendor.get("no_unused_vars"))
+        self.assertEqual(vendor.get("max_complexity"), Config.DEFAULT_CONFIG["max_complexity"])
+        self.assertIsNone(vendor.get("root"))
+
+    def test_resolution_is_memoized(self):
+        """Каждый файл настроек читается один раз, файлы с одинаковыми
+        настройками получают один Config"""
+        resolver = ConfigResolver()
+        with mock.patch.object(config_module, "load_settings", wraps=config_module.load_settings) as load:
+            configs = [resolver.for_file(self.path(f"src/a/f{i}.js")) for i in range(100)]
+            resolver.for_file(self.path("src/other.js"))
+        self.assertEqual(load.call_count, 2)
+        self.assertTrue(all(c is configs[0] for c in configs))
+        self.assertEqual(configs[0].digest(), Config.from_settings(dict(configs[0].settings)).digest())
+
+if __name__ == '__main__':
+    unittest.main()
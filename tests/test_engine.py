@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from engine import LinterEngine
+from fixer import Fixer
+from lexer import Lexer
+from parser_js import Parser
+from rules import Rule
+from runner import lint_code
+
+MINIFIED = "".join(f"var a_{i}=function(b){{return b*{i}}};" for i in range(200)) + "\n"
+NOISY = "".join(f"let bad_{i}=1;\nconsole.log(bad_{i});\n" for i in range(20))
+
+
+class SlowRule(Rule):
+    """Дорогое правило: исправление и пауза на каждом идентификаторе"""
+    name = 'slow'
+    token_types = ('ID',)
+    cost = 100
+
+    def on_token(self, tok, cursor):
+        if self.fixer:
+            self.fixer.add_fix(tok.start_idx, tok.start_idx, "_", self.name)
+        time.sleep(0.0005)
+        self.report(tok.line, "slow")
+
+
+class TestEngineLimits(unittest.TestCase):
+
+    def lint(self, code, **settings):
+        skipped = []
+        diagnostics = lint_code(code, Config.from_settings(settings), skipped=skipped)
+        return [d.rule for d in diagnostics], skipped
+
+    def test_minified_file_gets_logic_rules_only(self):
+        rules, skipped = self.lint(MINIFIED)
+        self.assertEqual(set(rules), {'no-unused-vars'})
+        self.assertEqual(skipped, [('naming', 'minified'), ('spacing', 'minified'),
+                                   ('blank-lines', 'minified')])
+
+        rules, skipped = self.lint(MINIFIED, detect_minified=False)
+        self.assertIn('spacing', rules)
+        self.assertEqual(skipped, [])
+
+    def test_plain_token_list(self):
+        """run принимает и обычный список токенов, минифицированный файл определяется так же"""
+        # Строки короткие - минифицированный файл узнается по плотности токенов
+        for code in ("let bad_name = 1;\n", ("x=" + "a+" * 40 + "a;\n") * 20):
+            engine = LinterEngine(code, Config())
+            tokens = list(Lexer(code).tokenize())
+            engine.run(tokens, Parser(tokens).parse())
+            self.assertEqual(engine.reports, [str(d) for d in lint_code(code, Config())])
+        self.assertTrue(engine.minified)
+
+    def test_max_warnings_stops_expensive_rules(self):
+        """Правила идут от дешевых к дорогим; после превышения лимита остальные пропускаются"""
+        rules, skipped = self.lint(NOISY, max_warnings=5)
+        self.assertEqual(set(rules), {'naming'})
+        self.assertEqual(skipped, [('blank-lines', 'max-warnings'), ('spacing', 'max-warnings')])
+        # Без лимита отчеты в порядке регистрации правил, как и раньше
+        self.assertEqual(self.lint(NOISY, max_warnings=1000)[0], self.lint(NOISY)[0])
+
+    def test_time_budget_drops_unfinished_rule(self):
+        # Время проверяется между блоками по rules.DEADLINE_BLOCK токенов
+        code = "let total = 1;\n" + "total=total+1;\n" * 1000
+        config = Config.from_settings({'time_budget': 0.4})
+        engine = LinterEngine(code, config)
+        slow = engine.register_rule(SlowRule(config))
+        fixer = Fixer(code)
+        tokens = Lexer(code).tokenize()
+        diagnostics = engine.run(tokens, Parser(tokens).parse(), fixer)
+
+        self.assertEqual(engine.skipped, [('slow', 'time-budget')])
+        self.assertNotIn(slow.name, {d.rule for d in diagnostics})
+        self.assertTrue(any(d.rule == 'spacing' for d in diagnostics))
+        # Исправления прерванного правила отброшены, остальные остались
+        self.assertTrue(fixer.fixes)
+        self.assertNotIn(slow.name, {fix[3] for fix in fixer.fixes})
+
+if __name__ == '__main__':
+    unittest.main()
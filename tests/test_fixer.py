@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixer import Fixer
+
+class TestFixer(unittest.TestCase):
+
+    def test_fixes_applied_in_any_order(self):
+        """Порядок добавления правок не влияет на результат"""
+        fixer = Fixer("a=b+c")
+        fixer.add_fix(4, 4, " ")
+        fixer.add_fix(1, 1, " ")
+        fixer.add_fix(3, 3, " ")
+        fixer.add_fix(2, 2, " ")
+        self.assertEqual(fixer.apply(), "a = b + c")
+        self.assertEqual((fixer.applied, fixer.skipped), (4, 0))
+
+    def test_duplicate_insertions_are_collapsed(self):
+        """Два оператора подряд просят вставить пробел в одну позицию"""
+        fixer = Fixer("a=-b")
+        for start in (1, 2, 2, 3):
+            fixer.add_fix(start, start, " ", "spacing")
+        self.assertEqual(fixer.apply(), "a = - b")
+        self.assertEqual(fixer.skipped, 1)
+
+    def test_overlapping_replacements_are_rejected(self):
+        """Пересекающиеся правки разных правил: применяется первая, вторая пропускается"""
+        fixer = Fixer("let value = 1;")
+        fixer.add_fix(4, 9, "renamed", "naming")
+        fixer.add_fix(6, 11, "X", "other")
+        fixer.add_fix(9, 9, " ", "spacing")
+        self.assertEqual(fixer.apply(), "let renamed  = 1;")
+        self.assertEqual((fixer.applied, fixer.skipped), (2, 1))
+
+    def test_many_fixes_on_large_input(self):
+        """Тысячи правок собираются за один проход"""
+        code = "a=b;" * 5000
+        fixer = Fixer(code)
+        for i in range(5000):
+            fixer.add_fix(i * 4 + 1, i * 4 + 1, " ")
+            fixer.add_fix(i * 4 + 2, i * 4 + 2, " ")
+        self.assertEqual(fixer.apply(), "a = b;" * 5000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diagnostics import Diagnostic
+from gitdiff import changed_hunks, collect_changed, filter_diagnostics, read_staged
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestGitDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.git("init", "-q")
+        self.git("config", "user.email", "lint@example.com")
+        self.git("config", "user.name", "lint")
+        self.write("a.js", "let one = 1;\nlet two = 2;\nlet three = 3;\n")
+        self.write("b.js", "let same = 1;\n")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "init")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def git(self, *args):
+        subprocess.run(["git"] + list(args), cwd=self.root, check=True)
+
+    def write(self, name, text):
+        with open(os.path.join(self.root, name), "w") as f:
+            f.write(text)
+
+    def test_staged_hunks_and_blobs(self):
+        """Ханки и содержимое берутся из индекса, а не из рабочего дерева"""
+        self.write("a.js", "let one = 1;\nlet two_b = 2;\nlet three = 3;\nlet four = 4;\n")
+        self.git("add", "a.js")
+        self.write("a.js", "changed again after staging\n")
+
+        hunks = changed_hunks(staged=True, cwd=self.root)
+        self.assertEqual(hunks, {"a.js": ([2, 4], [2, 4])})
+        blobs = read_staged(["a.js", "b.js", "missing.js"], cwd=self.root)
+        self.assertTrue(blobs["a.js"].startswith(b"let one = 1;\nlet two_b"))
+        self.assertEqual(blobs["b.js"], b"let same = 1;\n")
+        self.assertIsNone(blobs["missing.js"])
+
+    def test_changed_since_filters_reports(self):
+        """Отчеты остаются только для строк, измененных после ref"""
+        self.write("a.js", "let one = 1;\nlet two = 2;\nlet three_c = 3;\n")
+        hunks = changed_hunks("HEAD", cwd=self.root)["a.js"]
+
+        found = [Diagnostic(1, "naming", "old"), Diagnostic(3, "naming", "new"),
+                 Diagnostic.syntax_error("Expected ';'")]
+        kept = filter_diagnostics(found, hunks)
+        self.assertEqual([str(d) for d in kept], ["Line 3: new", "[SYNTAX ERROR] Expected ';'"])
+
+    def test_names_with_spaces_and_quotes(self):
+        """Имена с пробелом (git дописывает табуляцию) и с кавычкой (git экранирует) не теряются"""
+        for name in ("a b.js", 'q"t.js', "я.js"):
+            self.write(name, "let one = 1;\n")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "names")
+        for name in ("a b.js", 'q"t.js', "я.js"):
+            self.write(name, "let one = 1;\nlet two = 2;\n")
+        hunks = changed_hunks("HEAD", cwd=self.root)
+        self.assertEqual(hunks, {name: ([2], [2]) for name in ("a b.js", 'q"t.js', "я.js")})
+
+    def test_changed_since_includes_untracked_files(self):
+        """Новые файлы вне git проверяются целиком, игнорируемые - нет"""
+        os.makedirs(os.path.join(self.root, "src"))
+        self.write("src/new.js", "let a = 1;\nlet b = 2;\n")
+        self.write("skip.js", "let c = 3;\n")
+        self.write(".gitignore", "skip.js\n")
+        self.write("b.js", "let same = 1;\nlet more = 2;\n")
+
+        files, sources, hunks = collect_changed([], (".js",), "HEAD", cwd=self.root)
+        new = os.path.join(os.path.realpath(self.root), "src", "new.js")
+        self.assertEqual([os.path.basename(f) for f in files], ["b.js", "new.js"])
+        self.assertIsNone(sources)
+        kept = filter_diagnostics([Diagnostic(2, "naming", "x")], hunks[new])
+        self.assertEqual(len(kept), 1)
+        files, _, _ = collect_changed(["src"], (".js",), "HEAD", cwd=self.root)
+        self.assertEqual(files, [new])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from incremental import lint_state, relint
+
+def token_tuples(tokens):
+    return [(t.type, t.value, t.line, t.column, t.start_idx, t.end_idx) for t in tokens]
+
+def tree(node):
+    return (node.type, node.value, node.line, node.start_idx, node.end_idx,
+            [tree(child) for child in node.children])
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config()
+        self.code = (
+            "function first(a) {\n"
+            "    if (a) { let tmp = a + 1; }\n"
+            "    return a;\n"
+            "}\n"
+            "let total = 1;\n"
+            "function second(b) {\n"
+            "    while (b) { b = b-1; }\n"
+            "}\n"
+            "console.log(total);\n"
+        )
+
+    def assertMatchesFullLint(self, state):
+        full = lint_state(state.source, self.config)
+        self.assertEqual(token_tuples(state.tokens), token_tuples(full.tokens))
+        self.assertEqual(tree(state.ast), tree(full.ast))
+        self.assertEqual(state.reports, full.reports)
+
+    def test_edit_inside_function(self):
+        """Правка внутри функции: результат совпадает с полной перепроверкой"""
+        state = lint_state(self.code, self.config)
+        offset = self.code.index("a + 1")
+        state = relint(state, offset, 1, "bad_name")
+        self.assertMatchesFullLint(state)
+
+    def test_inserted_lines_shift_following_reports(self):
+        """Вставка строк сдвигает номера строк у токенов и отчетов ниже правки"""
+        state = lint_state(self.code, self.config)
+        before = [r for r in state.reports if "'-'" in r]
+        state = relint(state, 0, 0, "let x_y = 1;\n\n")
+        after = [r for r in state.reports if "'-'" in r]
+
+        self.assertEqual(before, ["Line 7: Missing space around operator '-'"])
+        self.assertEqual(after, ["Line 9: Missing space around operator '-'"])
+        self.assertMatchesFullLint(state)
+
+    def test_closing_unterminated_comment(self):
+        """Закрытие комментария ниже по тексту меняет токены выше точки правки"""
+        code = "let a = 1; /* note\nlet b_c = 2;\nconsole.log(a);\n"
+        state = lint_state(code, self.config)
+        offset = code.index("\nconsole")
+        state = relint(state, offset, 0, " */")
+        self.assertMatchesFullLint(state)
+        self.assertFalse(any("b_c" in r for r in state.reports))
+
+    def test_sequence_of_edits(self):
+        """Цепочка правок, включая удаление и синтаксические ошибки"""
+        state = lint_state(self.code, self.config)
+        edits = [
+            (self.code.index("let total"), 3, "var"),
+            (0, 8, ""),
+            (10, 0, "(("),
+            (len(self.code) - 20, 5, "let ;"),
+        ]
+        for offset, removed, inserted in edits:
+            state = relint(state, offset, removed, inserted)
+            self.assertMatchesFullLint(state)
+
+    def test_error_of_replaced_node_is_dropped(self):
+        """Ошибка разбора убирает функцию выше правки вместе с ее отчетом о сложности"""
+        self.config = Config.from_settings({'max_complexity': 1})
+        code = "function f(a) {\n  if (a) { x; }\n  x;\n}\n"
+        state = lint_state(code, self.config)
+        self.assertIn("Line 1: complexity too high: 2", state.reports)
+        state = relint(state, code.index("x;\n}"), 0, "var (")
+        self.assertMatchesFullLint(state)
+        self.assertEqual(state.reports, ["[SYNTAX ERROR] Expected identifier at line 3"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,8 @@ from parser_js import Parser
 from engine import LinterEngine
 from fixer import Fixer
 from config import Config
+from rules import Rule
+from runner import lint_code, lint_chunks
 
 class TestIntegration(unittest.TestCase):
     def setUp(self):
@@ -89,5 +91,59 @@ class TestIntegration(unittest.TestCase):
         self.assertIn("bad_name", reports_str)
         self.assertIn("another_Bad", reports_str)
 
+    def test_custom_rule_registration(self):
+        """Пользовательское правило получает только токены и узлы, на которые подписано"""
+        class NoVarRule(Rule):
+            name = 'no-var'
+            token_types = ('KEYWORD',)
+            node_types = ('Function',)
+
+            def start(self, fixer=None):
+                super().start(fixer)
+                self.seen_types = set()
+
+            def on_token(self, tok, cursor):
+                self.seen_types.add(tok.type)
+                if tok.value == 'var':
+                    self.report(tok.line, "Unexpected var")
+
+            def on_node(self, node):
+                self.seen_types.add(node.type)
+
+        code = "var counter = 1;\nfunction run() { return counter; }"
+        tokens = Lexer(code).tokenize()
+        ast = Parser(tokens).parse()
+
+        engine = LinterEngine(code, self.config)
+        rule = engine.register_rule(NoVarRule(self.config.settings))
+        engine.run(tokens, ast)
+
+        self.assertIn("Line 1: Unexpected var", engine.reports)
+        self.assertEqual(rule.seen_types, {'KEYWORD', 'Function'})
+
+    def test_reports_list_writes_through_to_diagnostics(self):
+        """Отчеты, дописанные в engine.reports строками, попадают в diagnostics"""
+        engine = LinterEngine("let a = 1;", self.config)
+        engine.reports.append("[SYNTAX ERROR] Unexpected end of input")
+        engine.reports.insert(0, "Line 3: Custom check")
+        self.assertEqual(engine.reports, ["Line 3: Custom check", "[SYNTAX ERROR] Unexpected end of input"])
+        self.assertEqual([(d.line, d.rule) for d in engine.diagnostics], [(3, None), (None, 'syntax')])
+        del engine.reports[0]
+        self.assertEqual(len(engine.diagnostics), 1)
+        with self.assertRaises(ValueError):
+            engine.reports.append("no line number")
+
+    def test_streaming_lint_matches_full_lint(self):
+        """Потоковая проверка по фрагментам дает те же отчеты, что и обычная"""
+        code = """
+        let bad_name=1;
+        /* lint-disable */
+        let Hidden = 2;
+        /* lint-enable */
+        function f(a) { if (a) { while (a) { for (;;) {} } } }
+        """
+        chunks = [code[i:i + 7] for i in range(0, len(code), 7)]
+        self.assertEqual(lint_chunks(chunks, self.config), lint_code(code, self.config))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -4,7 +4,11 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lexer import Lexer
+import contextlib
+import io
+
+from benchmarks.corpus import SHAPES, generate
+from lexer import Lexer, TokenStream, fast_tokenize, iter_buffer_tokens, iter_chunk_tokens
 
 class TestLexer(unittest.TestCase):
     
@@ -77,5 +81,80 @@ class TestLexer(unittest.TestCase):
         
         self.assertEqual(tokens[-1].value, ';')
 
+    def test_token_stream_columns(self):
+        """Токены хранятся в колонках array, значения вырезаются из исходника"""
+        code = "let a = 1;"
+        tokens = Lexer(code).tokenize()
+
+        self.assertIsInstance(tokens, TokenStream)
+        self.assertEqual(len(tokens.types), len(tokens))
+        self.assertEqual(tokens.value_of(2), 'a')
+        self.assertEqual(tokens.type_of(1), 'SKIP')
+        self.assertEqual([t.value for t in tokens][-2:], ['1', ';'])
+
+    def test_significant_view_and_prev_significant(self):
+        """Представление без SKIP и поиск предыдущего значимого токена"""
+        code = "let   a =  1;"
+        tokens = Lexer(code).tokenize()
+        significant = tokens.significant()
+
+        self.assertEqual([t.value for t in significant], ['let', 'a', '=', '1', ';'])
+        self.assertEqual(significant[-1].value, ';')
+        eq_index = [t.value for t in tokens].index('=')
+        self.assertEqual(tokens.value_of(tokens.prev_significant(eq_index)), 'a')
+        self.assertEqual(tokens.prev_significant(0), -1)
+
+    def test_chunked_stream_matches_tokenize(self):
+        """Потоковый лексер не разрезает токены на границах фрагментов"""
+        code = ("let longIdentifier = 12.5; /* block \n comment */\n"
+                "if (a>=b) { x = 'str ing'; } // tail\n1let $x;")
+        expected = [(t.type, t.value, t.line, t.column, t.start_idx, t.end_idx)
+                    for t in Lexer(code).tokenize()]
+
+        for size in (1, 2, 5, 16):
+            chunks = [code[i:i + size] for i in range(0, len(code), size)]
+            actual = [(t.type, t.value, t.line, t.column, t.start_idx, t.end_idx)
+                      for t in iter_chunk_tokens(chunks)]
+            self.assertEqual(actual, expected, f"chunk size {size}")
+
+    def test_buffer_tokens_match_tokenize(self):
+        """Лексер по байтовому буферу дает те же токены, что и по строке"""
+        code = "let a1 = 2.5; /* x\n y */ if(a1>=1){ s = 'q'; } // end\nreturn $b;"
+        expected = [(t.type, t.value, t.line, t.column, t.start_idx, t.end_idx)
+                    for t in Lexer(code).tokenize()]
+        actual = [(t.type, t.value, t.line, t.column, t.start_idx, t.end_idx)
+                  for t in iter_buffer_tokens(code.encode('ascii'))]
+        self.assertEqual(actual, expected)
+
+    def tokens_and_output(self, code, backend):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            tokens = [(t.type, t.value, t.line, t.column, t.start_idx, t.end_idx)
+                      for t in Lexer(code, backend).tokenize()]
+        return tokens, out.getvalue()
+
+    def test_fast_backend_matches_regex(self):
+        """Быстрый бэкенд дает те же токены и сообщения об ошибках, что и regex"""
+        samples = [generate(shape, 300, seed) for shape in SHAPES for seed in (1, 2)]
+        samples += ["", "1let x; 1.let; 2.5var", "let$x = 1; if$ = 2;", "/* unclosed\nlet a;",
+                    "s = \"unclosed\nlet b = 'x\n';", "a=//c\nb=/d", "/**/ /*/ x */ /* a\n\n b */ c",
+                    "let x = @;\n#y\n  `z`", "x = 'a\nb' + \"c\nd\";\nlet q;"]
+        for code in samples:
+            with self.subTest(code=code[:40]):
+                self.assertEqual(self.tokens_and_output(code, 'fast'),
+                                 self.tokens_and_output(code, 'regex'))
+
+    def test_fast_backend_non_ascii(self):
+        """Не-ASCII текст разбирается быстрым бэкендом с теми же токенами; неизвестный бэкенд - ошибка"""
+        samples = ["// комментарий\nlet имя = 'строка'; /* ещё */ x = 1;",
+                   "letя = 1; яif; if(é) {} return—x; ٣let ١.var x٣ ½for"]
+        for code in samples:
+            with self.subTest(code=code[:40]):
+                self.assertIsNotNone(fast_tokenize(code))
+                self.assertEqual(self.tokens_and_output(code, 'fast'),
+                                 self.tokens_and_output(code, 'regex'))
+        with self.assertRaises(ValueError):
+            Lexer("", "simd")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
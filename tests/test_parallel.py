@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import runner
+from config import Config
+from lexer import Lexer
+from parallel import find_boundaries, parse_parallel
+from parser_js import Parser
+
+CODE = """/* многострочный
+   комментарий */
+let first_value = 1;
+function f(a, b) {
+    if (a) { while (b) { let inner = a; } }
+    return a;
+}
+const text = "строка;
+}
+let inside = 1;";
+let broken = first_value
+let after = broken;
+var x = f(1, 2);
+"""
+
+def dump(node):
+    return (node.type, node.value, node.line, node.start_idx, node.end_idx,
+            node.total_complexity, tuple(dump(c) for c in node.children))
+
+class TestParallel(unittest.TestCase):
+
+    def test_matches_sequential_parse(self):
+        """Разбор по фрагментам совпадает с последовательным, даже если граница
+        попала в строку или незавершенную инструкцию"""
+        self.assertGreater(len(find_boundaries(CODE, 10)), 5)
+
+        tokens = Lexer(CODE).tokenize()
+        parser = Parser(tokens)
+        ast = parser.parse()
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            p_tokens, p_ast, errors, offsets = parse_parallel(CODE, pool, chunk_size=10)
+
+        for column in ('types', 'lines', 'columns', 'starts', 'ends'):
+            self.assertEqual(getattr(p_tokens, column), getattr(tokens, column))
+        self.assertEqual(dump(p_ast), dump(ast))
+        self.assertEqual((errors, offsets), (parser.errors, parser.error_offsets))
+        self.assertEqual(p_ast.scope.resolve(), ast.scope.resolve())
+
+    def test_huge_file_in_lint_files(self):
+        """Огромный файл среди обычных проверяется через пул с тем же результатом"""
+        with tempfile.TemporaryDirectory() as root:
+            paths = []
+            for name, code in (("a.js", "let bad_name = 1;\n"), ("big.js", CODE * 3)):
+                paths.append(os.path.join(root, name))
+                with open(paths[-1], "w") as f:
+                    f.write(code)
+
+            serial = [r.reports for r in runner.lint_files(paths, Config(), jobs=1)]
+            old_threshold = runner.PARALLEL_THRESHOLD
+            runner.PARALLEL_THRESHOLD = 100
+            try:
+                parallel = [r.reports for r in runner.lint_files(paths, Config(), jobs=2)]
+            finally:
+                runner.PARALLEL_THRESHOLD = old_threshold
+
+        self.assertEqual(parallel, serial)
+
+if __name__ == '__main__':
+    unittest.main()
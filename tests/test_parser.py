@@ -6,7 +6,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lexer import Lexer
-from parser_js import Parser  # Убедитесь, что файл называется parser_js.py или измените на parser
+from parser_js import NO_NODE, NODE_TYPES, Node, Parser, compact  # Убедитесь, что файл называется parser_js.py или измените на parser
 
 class TestParser(unittest.TestCase):
 
@@ -92,5 +92,69 @@ class TestParser(unittest.TestCase):
         self.assertEqual(len(control_nodes), 2)
         self.assertIn(control_nodes[0].value, ['if', 'while'])
 
+    def test_scope_tree(self):
+        """Парсер строит дерево областей: объявления и счетчики ссылок по областям"""
+        code = "let total = 0;\nfunction add(x) {\n if (x) { let y = x; }\n total = x;\n}\nadd(total);"
+        _, root = self.parse_code(code)
+        program = root.scope
+
+        self.assertEqual(program.declared, {'total': (1, 'let'), 'add': (2, 'function')})
+        self.assertEqual(program.refs, {'add': 1, 'total': 1})
+        func_scope = program.children[1].children[0]
+        block_scope = func_scope.children[0]
+        self.assertEqual(func_scope.declared, {'x': (2, 'param')})
+        self.assertEqual(func_scope.refs, {'total': 1, 'x': 2})
+        self.assertEqual(block_scope.declared, {'y': (3, 'let')})
+
+        self.assertEqual(program.resolve(), {})
+        self.assertEqual(program.uses, {'total': 2, 'add': 1})
+        self.assertEqual(func_scope.uses, {'x': 3})
+        self.assertEqual(block_scope.uses, {})
+
+    def test_subtree_aggregates(self):
+        """Агрегаты сложности и вложенности считаются без рекурсии и на очень глубоком коде"""
+        depth = 3 * sys.getrecursionlimit()
+        code = "function deep(x) {\n" + "if (x) {\n" * depth + "}\n" * depth + "while (x) { }\n}"
+        _, root = self.parse_code(code)
+        func_node = root.children[0]
+
+        self.assertEqual(func_node.total_complexity, depth + 1)
+        self.assertEqual(func_node.max_nesting, depth)
+        self.assertEqual(func_node.children[1].total_complexity, depth)
+
+    def test_arena_columns(self):
+        """Узлы лежат в колонках арены в прямом порядке; поддерево - отрезок индексов"""
+        code = "function f(a) {\n if (a) { let b = 1; }\n let c;\n}\nlet d;"
+        parser, root = self.parse_code(code)
+        arena = parser.arena
+        self.assertEqual([NODE_TYPES[t] for t in arena.types],
+                         ['Function', 'Param', 'ControlStructure', 'VariableDeclaration',
+                          'VariableDeclaration', 'VariableDeclaration'])
+        self.assertEqual(list(arena.values), ['f', 'a', 'if', 'b', 'c', 'd'])
+        self.assertEqual(arena.children(0), [1, 2, 4])
+        self.assertEqual((arena.first_child[2], arena.next_sibling[3]), (3, NO_NODE))
+        self.assertEqual(arena.subtree_end(0), 5)
+        func = root.children[0]
+        self.assertEqual((func.arena, func.id, func.total_complexity), (arena, 0, 1))
+        self.assertEqual([n.value for n in func.children], ['a', 'if', 'c'])
+
+    def test_failed_statement_leaves_no_nodes(self):
+        """Узлы инструкции с ошибкой разбора отбрасываются из арены"""
+        parser, root = self.parse_code("function f(a, b) { if (a) { let ; }\nlet ok = 1;")
+        self.assertEqual(len(parser.errors), 1)
+        self.assertEqual([n.value for n in root.children], ['ok'])
+        self.assertEqual(len(parser.arena), 1)
+
+    def test_compact_copies_subtrees(self):
+        """compact переносит узлы из разных арен в одну, дерево не меняется"""
+        nodes = [self.parse_code(code)[1].children[0]
+                 for code in ("function f(a) { if (a) { let b; } }", "while (x) { let y; }")]
+        moved = compact(nodes)
+        self.assertIs(moved[0].arena, moved[1].arena)
+        dump = lambda n: (n.type, n.value, n.line, n.total_complexity, n.start_idx, n.scope,
+                          [dump(c) for c in n.children])
+        self.assertEqual([dump(n) for n in moved], [dump(n) for n in nodes])
+        self.assertIsInstance(moved[1].children[0], Node)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
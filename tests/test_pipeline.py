@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from pipeline import lint_files_async
+from runner import collect_files, lint_files
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for i in range(40):
+            self.write(f"d{i % 4}/sub/f{i}.js", f"let bad_name{i}=1;\nlet x = bad_name{i};\n")
+        self.write("node_modules/dep.js", "let skip_me=1;\n")
+        self.write("d0/bundle.min.js", "let skip_me=1;\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_same_results_as_lint_files(self):
+        """Результаты те же, что у обычного прогона; порядок - по готовности"""
+        ignore = ["*.min.js"]
+        expected = [(r.path, r.reports)
+                    for r in lint_files(collect_files([self.root], ignore), Config(), jobs=1)]
+        found = sorted((r.path, r.reports)
+                       for r in lint_files_async([self.root], Config(), jobs=2, ignore=ignore, queue_size=4))
+        self.assertEqual(len(found), 40)
+        self.assertEqual(found, expected)
+
+    def test_fixes_are_written_by_pipeline(self):
+        config = Config()
+        config.settings['autofix'] = True
+        results = list(lint_files_async([os.path.join(self.root, "d1")], config, jobs=2))
+        self.assertEqual(sum(r.fixes_applied for r in results), 20)
+        with open(os.path.join(self.root, "d1/sub/f1.js")) as f:
+            self.assertEqual(f.read(), "let bad_name1 = 1;\nlet x = bad_name1;\n")
+
+    def test_consumer_can_stop_early(self):
+        results = lint_files_async([self.root], Config(), jobs=2, queue_size=2)
+        self.assertIsNotNone(next(results))
+        results.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import project_index
+from cache import LintCache
+from config import Config
+from project_index import ProjectIndex, extract_symbols
+from runner import lint_files
+
+UTIL = "function helper(a) {\n  return a;\n}\nfunction deadCode() {\n}\nlet shared = 1;\nlet localOnly = 2;\n"
+MAIN = "let result = helper(shared);\nconsole.log(result);\n"
+
+class TestProjectIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.util = self.write("lib/util.js", UTIL)
+        self.main = self.write("app/main.js", MAIN)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_extract_symbols(self):
+        symbols = extract_symbols(MAIN)
+        self.assertEqual(symbols['declared'], {'result': [1, 'let']})
+        # Имена свойств парсер тоже считает ссылками - для поиска мертвого кода это безопасно
+        self.assertEqual(symbols['refs'], {'helper': 1, 'shared': 1, 'console': 1, 'log': 1})
+
+    def test_cross_file_rules(self):
+        """Функция, которую не вызывает ни один файл, - проблема; переменная,
+        используемая в другом файле, - нет"""
+        index = ProjectIndex()
+        index.update([self.util, self.main], jobs=2)
+        results = {r.path: r.reports for r in lint_files([self.util, self.main], Config(), jobs=2, index=index)}
+        self.assertEqual(results[self.util], ["Line 7: Unused variable: 'localOnly'",
+                                              "Line 4: Function 'deadCode' is never called in the project"])
+        self.assertEqual(results[self.main], [])
+        # Без индекса правило выключено
+        reports = next(lint_files([self.util], Config(), jobs=1)).reports
+        self.assertIn("Line 6: Unused variable: 'shared'", reports)
+        self.assertFalse(any('never called' in r for r in reports))
+
+    def test_incremental_update_and_persistence(self):
+        path = os.path.join(self.root, "index.json")
+        index = ProjectIndex()
+        self.assertEqual(index.update([self.util, self.main], jobs=1), 2)
+        index.save(path)
+
+        index = ProjectIndex.load(path)
+        with mock.patch.object(project_index, "extract_symbols", wraps=extract_symbols) as parse:
+            self.assertEqual(index.update([self.util, self.main], jobs=1), 0)
+            self.write("app/main.js", "helper(1);\ndeadCode();\n")
+            self.assertEqual(index.update([self.util, self.main], jobs=1), 1)
+        self.assertEqual(parse.call_count, 1)
+        self.assertTrue(index.is_referenced('deadCode'))
+        self.assertFalse(index.is_referenced('shared'))
+
+        index.update([self.util], jobs=1)
+        self.assertEqual(list(index.files), [os.path.abspath(self.util)])
+
+    def test_cache_key_follows_other_files(self):
+        """Кэш результатов файла сбрасывается, когда меняется использование его имен в других файлах"""
+        cache = LintCache(os.path.join(self.root, ".cache"))
+        index = ProjectIndex()
+        index.update([self.util, self.main], jobs=1)
+        first = next(lint_files([self.util], Config(), jobs=1, cache=cache, index=index)).reports
+
+        self.write("app/main.js", "deadCode();\n")
+        index.update([self.util, self.main], jobs=1)
+        second = next(lint_files([self.util], Config(), jobs=1, cache=cache, index=index)).reports
+        self.assertNotEqual(first, second)
+        self.assertIn("Line 1: Function 'helper' is never called in the project", second)
+        self.assertIn("Line 6: Unused variable: 'shared'", second)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import io
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from diagnostics import Diagnostic
+from reporters import JsonLinesReporter, SarifReporter, TextReporter
+from runner import LintResult, lint_code
+
+CODE = "let bad_name=1;\nconsole.log(bad_name);\n"
+
+class TestReporters(unittest.TestCase):
+
+    def setUp(self):
+        self.results = [LintResult("a.js", lint_code(CODE, Config())),
+                        LintResult("b.js", [], skipped=[("naming", "minified"), ("spacing", "minified")]),
+                        LintResult("c.js", [], error="Could not read file: denied")]
+
+    def run_reporter(self, cls):
+        out = io.StringIO()
+        reporter = cls(out)
+        reporter.start()
+        for result in self.results:
+            reporter.file(result)
+        reporter.finish()
+        return out.getvalue()
+
+    def test_diagnostic_formats_lazily(self):
+        """Сообщение собирается из шаблона при выводе; кортеж для кэша обратим"""
+        d = Diagnostic(3, "naming", "Naming violation: '{}'", ("bad_name",), column=4)
+        self.assertEqual(str(d), "Line 3: Naming violation: 'bad_name'")
+        self.assertEqual(Diagnostic.from_tuple(json.loads(json.dumps(d.to_tuple()))), d)
+        self.assertEqual(d.moved(2).line, 5)
+
+    def test_text_matches_old_output(self):
+        text = self.run_reporter(TextReporter)
+        self.assertIn("\nLinting Report for: a.js\nLine 1: Naming violation: 'bad_name'\n", text)
+        self.assertIn("\nLinting Report for: b.js\nSuccess: No style issues found.\n"
+                      "[SKIPPED] naming, spacing (minified file)\n", text)
+        self.assertIn("Error: Could not read file: denied", text)
+
+    def test_json_lines(self):
+        records = [json.loads(line) for line in self.run_reporter(JsonLinesReporter).splitlines()]
+        spacing = [r for r in records if r.get("rule") == "spacing"][0]
+        self.assertEqual((spacing["file"], spacing["line"], spacing["column"]), ("a.js", 1, 12))
+        self.assertEqual(spacing["fix"], [[12, 12, " "], [13, 13, " "]])
+        self.assertEqual(records[-1], {"file": "c.js", "error": "Could not read file: denied"})
+        self.assertEqual(records[-2]["skipped"][1], {"rule": "spacing", "reason": "minified"})
+
+    def test_sarif_is_valid_json(self):
+        """Результаты пишутся по файлам, а описание правил дописывается в конце"""
+        log = json.loads(self.run_reporter(SarifReporter))
+        run = log["runs"][0]
+        self.assertEqual(log["version"], "2.1.0")
+        self.assertEqual({r["ruleId"] for r in run["results"]}, {"naming", "spacing"})
+        self.assertEqual([r["id"] for r in run["tool"]["driver"]["rules"]], ["naming", "spacing"])
+        region = run["results"][0]["locations"][0]["physicalLocation"]["region"]
+        self.assertEqual(region, {"startLine": 1, "startColumn": 5})
+        notes = run["invocations"][0]["toolExecutionNotifications"]
+        self.assertEqual([n["level"] for n in notes], ["note", "note", "error"])
+        self.assertEqual(notes[0]["associatedRule"], {"id": "naming"})
+        self.assertFalse(run["invocations"][0]["executionSuccessful"])
+
+    def test_sarif_result_without_rule(self):
+        """Отчет, добавленный строкой, выводится без ruleId, а не с null"""
+        self.results = [LintResult("d.js", [Diagnostic.from_report("Line 2: Custom check")])]
+        run = json.loads(self.run_reporter(SarifReporter))["runs"][0]
+        self.assertNotIn("ruleId", run["results"][0])
+        self.assertEqual(run["results"][0]["message"], {"text": "Custom check"})
+        self.assertEqual(run["tool"]["driver"]["rules"], [])
+
+if __name__ == '__main__':
+    unittest.main()
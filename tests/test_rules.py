@@ -56,6 +56,25 @@ class TestRules(unittest.TestCase):
         self.assertEqual(len(errors), 1)
         self.assertIn("unusedVar", errors[0][1])
 
+    def test_unused_variables_are_scoped(self):
+        """Использование имени в одной функции не скрывает неиспользованное одноименное в другой"""
+        code = """
+        function first(a) {
+            let value = a;
+            console.log(value);
+        }
+        function second(b) {
+            let value = 1;
+            return hoisted;
+            var hoisted = b;
+        }
+        """
+        tokens, ast = self._prepare(code)
+
+        errors = self.logic_rules.check_unused(ast, tokens)
+
+        self.assertEqual(errors, [(7, "Unused variable: 'value'")])
+
     def test_cyclomatic_complexity(self):
         """Проверка расчета сложности (V(G))"""
         code = """
@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from runner import collect_files, lint_code, lint_files, lint_mapped
+from timing import Timings
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.files = {
+            "a.js": "let goodName = 1;\nconsole.log(goodName);\n",
+            "sub/b.js": "let bad_name = 1;\nconsole.log(bad_name);\n",
+            "sub/c.js": "let x=1;\nconsole.log(x);\n",
+            "node_modules/dep.js": "let Ignored = 1;\n",
+            "notes.txt": "not js",
+        }
+        for name, code in self.files.items():
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(code)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_collect_files_from_directory(self):
+        """Директории обходятся рекурсивно, node_modules и не-.js файлы пропускаются"""
+        files = collect_files([self.root])
+        names = [os.path.relpath(f, self.root) for f in files]
+        self.assertEqual(names, ["a.js", os.path.join("sub", "b.js"), os.path.join("sub", "c.js")])
+
+    def test_collect_files_from_glob(self):
+        """Glob-шаблоны разворачиваются, дубликаты убираются"""
+        pattern = os.path.join(self.root, "sub", "*.js")
+        files = collect_files([pattern, os.path.join(self.root, "sub", "b.js")])
+        self.assertEqual(len(files), 2)
+
+    def test_parallel_results_keep_order(self):
+        """Отчеты из пула процессов совпадают с последовательным запуском и идут в исходном порядке"""
+        files = collect_files([self.root])
+        serial = [(r.path, r.reports) for r in lint_files(files, Config(), jobs=1)]
+        parallel = [(r.path, r.reports) for r in lint_files(files, Config(), jobs=2)]
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual([p for p, _ in parallel], files)
+        self.assertEqual(parallel[0][1], [])
+        self.assertTrue(any("bad_name" in r for r in parallel[1][1]))
+
+    def test_mapped_lint_matches_text_lint(self):
+        """Проверка через mmap совпадает с обычной; не-ASCII файлы идут текстовым путем"""
+        path = os.path.join(self.root, "sub", "b.js")
+        self.assertEqual(lint_mapped(path, Config()), lint_code(self.files["sub/b.js"], Config()))
+
+        unicode_path = os.path.join(self.root, "u.js")
+        with open(unicode_path, "w", encoding="utf-8") as f:
+            f.write("let имя = 1;\n")
+        self.assertIsNone(lint_mapped(unicode_path, Config()))
+
+    def test_timings_are_collected_per_file(self):
+        """С timing='trace' у каждого результата есть замеры стадий, правил и события trace"""
+        files = collect_files([self.root])
+        results = list(lint_files(files, Config(), jobs=2, timing='trace'))
+        totals = Timings(trace=True)
+        for result in results:
+            totals.merge(result.timings)
+
+        for stage in ("lex", "parse", "rules", "rule:naming"):
+            self.assertIn(stage, totals.stages)
+        self.assertEqual(totals.stages["lex"][1], len(files))
+        self.assertEqual(sorted(totals.files), files)
+        self.assertTrue(all(e["ph"] == "X" for e in totals.events))
+        self.assertIn("Slowest files", totals.summary())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import io
+import json
+import os
+import sys
+import socket
+import tempfile
+import threading
+import time
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from server import LintServer, METHOD_NOT_FOUND, PARSE_ERROR, INVALID_PARAMS, INTERNAL_ERROR
+from runner import lint_file
+from config import ConfigResolver
+
+class TestLintServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LintServer()
+
+    def call(self, method, params=None, req_id=1):
+        request = {"jsonrpc": "2.0", "id": req_id, "method": method}
+        if params is not None:
+            request["params"] = params
+        return json.loads(self.server.handle_line(json.dumps(request)))
+
+    def test_lint_buffer_returns_structured_diagnostics(self):
+        """Буфер проверяется без файла, ответ содержит строку, правило и сообщение"""
+        response = self.call("lint", {"text": "let bad_name = 1;", "filename": "a.js"})
+        diagnostics = response["result"]["diagnostics"]
+        self.assertIn({"file": None, "line": 1, "column": 4, "rule": "naming", "severity": "warning",
+                       "message": "Naming violation: 'bad_name'"}, diagnostics)
+
+    def test_edit_open_buffer(self):
+        """Правка открытого буфера перепроверяется без повторной передачи текста"""
+        self.call("lint", {"text": "let x=1;\nconsole.log(x);", "filename": "a.js"})
+        response = self.call("edit", {"filename": "a.js", "offset": 5, "removed": 1, "inserted": " = "})
+        self.assertEqual(response["result"]["diagnostics"], [])
+
+    def test_config_is_reused_between_requests(self):
+        """Конфиг читается один раз и переиспользуется, пока файл не изменился"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"max_complexity": 1}, f)
+        try:
+            first = self.server.get_config(f.name)
+            self.assertIs(self.server.get_config(f.name), first)
+            self.assertEqual(first.get("max_complexity"), 1)
+        finally:
+            os.unlink(f.name)
+
+    def test_protocol_errors(self):
+        """Ошибки протокола возвращаются по JSON-RPC, сервер продолжает работу"""
+        self.assertEqual(json.loads(self.server.handle_line("{oops"))["error"]["code"], PARSE_ERROR)
+        self.assertEqual(self.call("missing")["error"]["code"], METHOD_NOT_FOUND)
+        self.assertEqual(self.call("lint", {})["error"]["code"], INVALID_PARAMS)
+        self.assertEqual(self.call("ping")["result"], "pong")
+
+    def test_bad_params_and_internal_errors(self):
+        """Параметры неверного типа и сбои обработчика - ошибки JSON-RPC, а не падение сервера"""
+        self.assertEqual(self.call("lint", {"text": 5})["error"]["code"], INVALID_PARAMS)
+        self.assertEqual(self.call("edit", {"filename": "a.js", "offset": "1", "removed": 0,
+                                            "inserted": ""})["error"]["code"], INVALID_PARAMS)
+        self.assertEqual(self.call("lint", "text")["error"]["code"], INVALID_PARAMS)
+        with mock.patch.object(server, "lint_state", side_effect=RuntimeError("boom")):
+            error = self.call("lint", {"text": "let a = 1;"})["error"]
+        self.assertEqual(error, {"code": INTERNAL_ERROR, "message": "Internal error: boom"})
+        self.assertEqual(self.call("ping")["result"], "pong")
+
+    def test_results_match_command_line(self):
+        """Каскад .jslintrc.json и пропуск правил на минифицированном файле - как у CLI"""
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, ".jslintrc.json"), "w") as f:
+                json.dump({"naming_pattern": "^[a-z_]+$"}, f)
+            path = os.path.join(root, "a.js")
+            with open(path, "w") as f:
+                f.write("let bad_name=1;\nlet x = 1;\n")
+            with open(os.path.join(root, "min.js"), "w") as f:
+                f.write("let a_b=1;" * 200)
+            for name in ("a.js", "min.js"):
+                name = os.path.join(root, name)
+                expected = lint_file(name, ConfigResolver())
+                result = self.call("lint", {"path": name})["result"]
+                self.assertEqual([d["message"] for d in result["diagnostics"]],
+                                 [d.message for d in expected.diagnostics])
+                self.assertEqual([(s["rule"], s["reason"]) for s in result["skipped"]], expected.skipped)
+            self.assertEqual(result["skipped"][0]["reason"], "minified")
+            # Изменение .jslintrc.json подхватывается без перезапуска
+            with open(os.path.join(root, ".jslintrc.json"), "w") as f:
+                json.dump({"naming_pattern": "^[A-Z]+$"}, f)
+            messages = [d["message"] for d in self.call("lint", {"path": path})["result"]["diagnostics"]]
+            self.assertIn("Naming violation: 'x'", messages)
+
+    def test_serve_stream_stops_on_shutdown(self):
+        """shutdown завершает цикл обработки; уведомления без id не получают ответа"""
+        lines = [
+            json.dumps({"jsonrpc": "2.0", "method": "ping"}),
+            json.dumps({"jsonrpc": "2.0", "id": 1, "method": "shutdown"}),
+            json.dumps({"jsonrpc": "2.0", "id": 2, "method": "ping"}),
+        ]
+        out = io.StringIO()
+        self.server.serve_stream(iter(line + "\n" for line in lines), out)
+        responses = [json.loads(l) for l in out.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in responses], [1])
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+    def test_unix_socket_serves_clients_concurrently(self):
+        """Второй клиент получает ответ, пока первый держит соединение открытым"""
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "lint.sock")
+            thread = threading.Thread(target=self.server.serve_unix, args=(path,), daemon=True)
+            thread.start()
+            for _ in range(200):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.01)
+
+            def connect():
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.settimeout(5)
+                client.connect(path)
+                return client, client.makefile("rw", encoding="utf-8")
+
+            def call(stream, method, req_id):
+                stream.write(json.dumps({"jsonrpc": "2.0", "id": req_id, "method": method}) + "\n")
+                stream.flush()
+                return json.loads(stream.readline())
+
+            editor, editor_stream = connect()
+            hook, hook_stream = connect()
+            try:
+                self.assertEqual(call(editor_stream, "ping", 1)["result"], "pong")
+                self.assertEqual(call(hook_stream, "ping", 2)["result"], "pong")
+                self.assertEqual(call(hook_stream, "shutdown", 3)["result"], True)
+            finally:
+                for stream, client in ((editor_stream, editor), (hook_stream, hook)):
+                    stream.close()
+                    client.close()
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config, ConfigResolver
+from runner import lint_code
+from session import LinterSession
+
+BAD = "let bad_name = 1;\nlet x=bad_name;\nconsole.log(x);\n"
+GOOD = "let goodName = 1;\nconsole.log(goodName);\n"
+
+class TestLinterSession(unittest.TestCase):
+
+    def test_matches_lint_code_and_reuses_rules(self):
+        """Результат как у lint_code; правила переиспользуются без старых ошибок"""
+        session = LinterSession()
+        rules = session.rules_for(session.config)
+        first = session.lint_source(BAD, "a.js")
+        self.assertEqual(first.path, "a.js")
+        self.assertEqual(first.reports, [str(d) for d in lint_code(BAD, Config())])
+        # Те же экземпляры правил, ошибки прошлого вызова не переносятся
+        self.assertEqual(session.lint_source(GOOD).reports, [])
+        self.assertIs(session.rules_for(session.config), rules)
+        self.assertEqual(session.lint_source(BAD, "a.js").reports, first.reports)
+
+    def test_lint_many_and_fix(self):
+        """lint_many принимает тексты и пары (имя, текст); с fix есть исправленный текст"""
+        session = LinterSession({"autofix": False}, fix=True)
+        results = list(session.lint_many([GOOD, ("b.js", BAD)]))
+        self.assertEqual([r.path for r in results], ["<input-0>", "b.js"])
+        self.assertIsNone(results[0].fixed_code)
+        self.assertIn("let x = bad_name;", results[1].fixed_code)
+        self.assertGreater(results[1].fixes_applied, 0)
+
+    def test_resolver_selects_config_by_filename(self):
+        """С ConfigResolver настройки выбираются по имени файла, правила - на каждый Config"""
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "snake"))
+            with open(os.path.join(root, "snake", ".jslintrc.json"), "w") as f:
+                f.write('{"naming_pattern": "^[a-z_]+$"}')
+            session = LinterSession(ConfigResolver())
+            camel = session.lint_source(BAD, os.path.join(root, "a.js")).reports
+            snake = session.lint_source(BAD, os.path.join(root, "snake", "a.js")).reports
+        self.assertIn("Line 1: Naming violation: 'bad_name'", camel)
+        self.assertNotIn("Line 1: Naming violation: 'bad_name'", snake)
+        self.assertEqual(len(session._rules), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from lexer import Lexer
+from rules import BlankLinesRule, Rule, RuleDispatcher
+from runner import lint_code
+from suppressions import Suppressions
+
+class SeenLines(Rule):
+    name = 'seen'
+    token_types = ('ID',)
+
+    def on_token(self, tok, cursor):
+        self.report(tok.line, "seen")
+
+class TestSuppressions(unittest.TestCase):
+
+    def test_intervals_from_comments(self):
+        """Диапазоны для всех правил, для отдельных правил и для следующей строки"""
+        comments = [
+            (2, "/* lint-disable */"),
+            (4, "/* lint-enable */"),
+            (6, "/* lint-disable naming, spacing */"),
+            (8, "/* lint-enable spacing */"),
+            (10, "// lint-disable-next-line complexity"),
+            (12, "// обычный комментарий"),
+        ]
+        s = Suppressions.from_comments(comments)
+
+        self.assertEqual([line for line in range(1, 14) if s.is_suppressed(line)], [2, 3, 4])
+        self.assertTrue(s.is_suppressed(100, 'naming'))
+        self.assertTrue(s.is_suppressed(8, 'spacing'))
+        self.assertFalse(s.is_suppressed(9, 'spacing'))
+        self.assertTrue(s.is_suppressed(11, 'complexity'))
+        self.assertFalse(s.is_suppressed(12, 'complexity'))
+
+    def test_per_rule_directives_in_lint(self):
+        """Подавленное правило молчит, остальные правила на тех же строках работают"""
+        code = (
+            "/* lint-disable naming */\n"
+            "let bad_name=1;\n"
+            "/* lint-enable */\n"
+            "// lint-disable-next-line\n"
+            "let other_name=bad_name;\n"
+            "let last_name = other_name;\n"
+        )
+        reports = [str(d) for d in lint_code(code, Config())]
+
+        self.assertIn("Line 2: Missing space around operator '='", reports)
+        self.assertNotIn("Line 2: Naming violation: 'bad_name'", reports)
+        self.assertFalse(any(r.startswith("Line 5:") for r in reports))
+        self.assertIn("Line 6: Naming violation: 'last_name'", reports)
+
+    def test_stream_skips_lines_disabled_for_all_rules(self):
+        """TokenStream: подавленные для всех правил строки не доходят до правил,
+        а пустые строки на границах отрезка проверяются как в списке токенов"""
+        code = (
+            "a;\n\n\n\n"
+            "/* lint-disable */ b;\n\n\n\nc;\n"
+            "/* lint-enable */\n\n\n\nd;\n"
+        )
+        stream = Lexer(code).tokenize()
+        suppressions = Suppressions.from_tokens(stream)
+        self.assertEqual(suppressions.index_ranges(stream.lines), [(2, 9)])
+
+        def run(tokens):
+            rules = [SeenLines(Config()), BlankLinesRule(Config())]
+            dispatcher = RuleDispatcher(rules, suppressions=suppressions)
+            dispatcher.feed_tokens(tokens)
+            return [[d.line for d in errors] for errors in dispatcher.results()]
+
+        # Внутри отрезка правила не вызывались, даже blank-lines (строка 6)
+        self.assertEqual(run(stream), [[1, 14], [2, 11]])
+        # Список токенов после фильтра отчетов, как в движке, дает то же
+        self.assertEqual([[line for line in lines if not suppressions.is_suppressed(line)]
+                          for lines in run(list(stream))], [[1, 14], [2, 11]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import io
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import watch
+from config import ConfigResolver
+from runner import lint_code
+from watch import Watcher, common_prefix, common_suffix
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("a.js", "let goodName = 1;\nconsole.log(goodName);\n")
+        self.write("sub/b.js", "let bad_name = 1;\nconsole.log(bad_name);\n")
+        self.out = io.StringIO()
+        self.watcher = Watcher([self.root], ConfigResolver, stream=self.out, debounce=0)
+        self.watcher.start()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.normpath(os.path.join(self.root, name))
+
+    def write(self, name, text, mtime=None):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    def test_common_affixes(self):
+        self.assertEqual(common_prefix("abcdef", "abXdef"), 2)
+        self.assertEqual(common_suffix("abcdef", "abXdef", 4), 3)
+        self.assertEqual(common_suffix("aaa", "aaaa", 3), 3)
+
+    def test_reports_diff_of_changed_file(self):
+        self.assertIn("Line 1: Naming violation: 'bad_name'", self.out.getvalue())
+        code = "let bad_name = 1;\nlet other_name=bad_name;\nconsole.log(other_name);\n"
+        self.write("sub/b.js", code, mtime=10 ** 18)
+
+        diffs = self.watcher.poll()
+        added, removed = diffs[self.path("sub/b.js")]
+        self.assertEqual(sorted(added), ["Line 2: Missing space around operator '='",
+                                         "Line 2: Naming violation: 'other_name'"])
+        self.assertEqual(removed, [])
+        # Результат инкрементальной перепроверки совпадает с полной
+        state = self.watcher.files[self.path("sub/b.js")]
+        self.assertEqual(state.reports, [str(d) for d in lint_code(code, state.config)])
+
+    def test_touch_without_change_is_not_relinted(self):
+        os.utime(self.path("a.js"), ns=(10 ** 18, 10 ** 18))
+        with mock.patch.object(watch, "lint_state") as full, mock.patch.object(watch, "relint") as partial:
+            self.assertEqual(self.watcher.poll(), {})
+        full.assert_not_called()
+        partial.assert_not_called()
+
+    def test_config_change_relints_with_new_settings(self):
+        self.write(".jslintrc.json", '{"naming_pattern": "^[a-z_]+$"}')
+        diffs = self.watcher.poll()
+        self.assertEqual(diffs[self.path("sub/b.js")], ([], ["Line 1: Naming violation: 'bad_name'"]))
+        os.remove(self.path("a.js"))
+        self.assertIn(self.path("a.js"), self.watcher.poll())
+        self.assertIn("a.js: removed", self.out.getvalue())
+
+    def test_glob_pattern_is_expanded(self):
+        """Шаблон "**/*.js" разворачивается при каждом опросе, как в обычном запуске"""
+        out = io.StringIO()
+        watcher = Watcher([os.path.join(self.root, "**", "*.js")], ConfigResolver, stream=out, debounce=0)
+        watcher.start()
+        self.assertEqual(sorted(watcher.files), [self.path("a.js"), self.path("sub/b.js")])
+        self.write("sub/new.js", "let new_name = 1;\nconsole.log(new_name);\n")
+        diffs = watcher.poll()
+        self.assertEqual(diffs[self.path("sub/new.js")], (["Line 1: Naming violation: 'new_name'"], []))
+
+if __name__ == '__main__':
+    unittest.main()
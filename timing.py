@@ -0,0 +1,68 @@
+import json
+import os
+
+
+class Timings:
+    """Агрегированные замеры стадий и правил по всем файлам.
+
+    Экземпляр передается в LinterEngine.add_hook через hook(path); замеры
+    из воркеров объединяются через merge(). При trace=True дополнительно
+    копятся события для Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, trace=False):
+        self.stages = {}   # стадия -> [секунды, вызовы, элементы]
+        self.files = {}    # путь -> секунды
+        self.events = [] if trace else None
+
+    def hook(self, path=None):
+        """Хук для LinterEngine.add_hook, привязанный к файлу path"""
+        def on_stage(stage, start, seconds, calls=1, items=0):
+            self.add(stage, start, seconds, calls, items, path)
+        return on_stage
+
+    def add(self, stage, start, seconds, calls=1, items=0, path=None):
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = [0.0, 0, 0]
+        entry[0] += seconds
+        entry[1] += calls
+        entry[2] += items
+        if self.events is not None:
+            pid = os.getpid()
+            self.events.append({
+                'name': stage, 'ph': 'X', 'pid': pid, 'tid': pid,
+                'ts': start * 1e6, 'dur': seconds * 1e6,
+                'args': {'file': path, 'calls': calls, 'items': items},
+            })
+
+    def add_file(self, path, seconds):
+        self.files[path] = self.files.get(path, 0.0) + seconds
+
+    def merge(self, other):
+        for stage, (seconds, calls, items) in other.stages.items():
+            entry = self.stages.setdefault(stage, [0.0, 0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+            entry[2] += items
+        for path, seconds in other.files.items():
+            self.add_file(path, seconds)
+        if self.events is not None and other.events:
+            self.events.extend(other.events)
+
+    def summary(self, top_files=10):
+        """Текстовая таблица: стадии по убыванию времени и самые медленные файлы"""
+        lines = [f"{'Stage':<28}{'Calls':>10}{'Items':>12}{'Total ms':>12}{'Avg us':>10}"]
+        for stage, (seconds, calls, items) in sorted(self.stages.items(), key=lambda kv: -kv[1][0]):
+            avg = seconds / calls * 1e6 if calls else 0.0
+            lines.append(f"{stage:<28}{calls:>10}{items:>12}{seconds * 1000:>12.2f}{avg:>10.1f}")
+        if self.files:
+            lines.append("")
+            lines.append(f"Slowest files (of {len(self.files)}):")
+            for path, seconds in sorted(self.files.items(), key=lambda kv: -kv[1])[:top_files]:
+                lines.append(f"  {seconds * 1000:>10.2f} ms  {path}")
+        return '\n'.join(lines)
+
+    def write_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events or [], 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,225 @@
+import glob
+import hashlib
+import os
+import sys
+import time
+from collections import Counter
+
+from config import CONFIG_FILENAME
+from incremental import lint_state, relint
+from reporters import TextReporter
+from runner import IGNORED_DIRS, JS_EXTENSIONS, LintResult, is_ignored
+
+POLL_INTERVAL = 0.5   # секунд между снимками
+DEBOUNCE = 0.2        # изменения применяются, когда снимок не меняется столько секунд
+
+
+def common_prefix(a, b):
+    """Длина общего начала строк; сравнение срезов идет в C, а не по символам"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def common_suffix(a, b, limit):
+    """Длина общего конца строк, не больше limit"""
+    lo, hi = 0, min(len(a), len(b), limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class FileState:
+    """То, что помнится о файле между итерациями"""
+    __slots__ = ('digest', 'config', 'lint', 'reports', 'error')
+
+    def __init__(self, digest, config, lint=None, reports=(), error=None):
+        self.digest = digest      # sha256 содержимого
+        self.config = config      # Config, с которым проверялся файл
+        self.lint = lint          # incremental.LintState для relint
+        self.reports = reports
+        self.error = error
+
+
+class Watcher:
+    """Проверка при изменениях: опрос stat (mtime, размер) без inotify и служб.
+
+    make_config() возвращает Config или ConfigResolver; он пересоздается
+    только при изменении .jslintrc.json или файлов из config_files. Для
+    каждого файла в памяти остаются хэш содержимого и состояние
+    incremental.LintState: файл, у которого изменились mtime/размер, но не
+    содержимое, не перепроверяется, а правка перепроверяется через relint
+    только в измененной части. Выводится разница отчетов.
+    """
+
+    def __init__(self, paths, make_config, ignore=(), config_files=(), stream=None,
+                 interval=POLL_INTERVAL, debounce=DEBOUNCE):
+        self.paths = paths
+        self.make_config = make_config
+        self.ignore = ignore
+        self.config_files = [p for p in config_files if p]
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self.debounce = debounce
+        self.config = make_config()
+        self.files = {}       # путь -> FileState
+        self.snapshot = None
+
+    def scan(self):
+        """Снимок: ({путь .js: (mtime_ns, размер)}, {путь настроек: (mtime_ns, размер)})"""
+        sources, configs = {}, {}
+        for path in self.config_files:
+            configs[path] = _stat(path)
+        # glob-шаблоны разворачиваются заново на каждом снимке, как в
+        # runner.collect_files, поэтому новые подходящие файлы тоже попадают
+        paths = []
+        for pattern in self.paths:
+            paths.extend(glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern])
+        for path in paths:
+            if os.path.isfile(path):
+                if not is_ignored(path, self.ignore):
+                    sources[os.path.normpath(path)] = _stat(path)
+                    config_path = os.path.join(os.path.dirname(path), CONFIG_FILENAME)
+                    configs[os.path.normpath(config_path)] = _stat(config_path)
+                continue
+            for root, dirs, names in os.walk(path):
+                dirs[:] = [d for d in dirs if d not in IGNORED_DIRS
+                           and not is_ignored(os.path.join(root, d), self.ignore)]
+                for name in names:
+                    file_path = os.path.normpath(os.path.join(root, name))
+                    if name == CONFIG_FILENAME:
+                        configs[file_path] = _stat(file_path)
+                    elif name.endswith(JS_EXTENSIONS) and not is_ignored(file_path, self.ignore):
+                        sources[file_path] = _stat(file_path)
+        return sources, configs
+
+    def start(self):
+        """Первая полная проверка; печатает обычный текстовый отчет"""
+        self.snapshot = self.scan()
+        reporter = TextReporter(self.stream)
+        for path in sorted(self.snapshot[0]):
+            state = self.check(path)
+            result = LintResult(path, list(state.lint.found) if state.lint else [], error=state.error)
+            reporter.file(result)
+        self.write(f"\n{self.stamp()} Watching {len(self.files)} files for changes...\n")
+
+    def check(self, path):
+        """Перепроверяет файл, если его содержимое изменилось; возвращает FileState"""
+        old = self.files.get(path)
+        config = self.config.for_file(path)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if old is not None and old.digest == digest and old.config is config:
+                return old
+            source = data.decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            state = FileState(None, config, error=f"Could not read file: {e}")
+        else:
+            if old is not None and old.lint is not None and old.config is config:
+                before = old.lint.source
+                start = common_prefix(before, source)
+                tail = common_suffix(before, source, min(len(before), len(source)) - start)
+                lint = relint(old.lint, start, len(before) - start - tail,
+                              source[start:len(source) - tail])
+            else:
+                lint = lint_state(source, config)
+            state = FileState(digest, config, lint, lint.reports)
+        self.files[path] = state
+        return state
+
+    def poll(self):
+        """Один шаг: если снимок изменился, дожидается затишья и применяет
+        изменения. Возвращает {путь: (добавленные отчеты, исчезнувшие)}."""
+        current = self.scan()
+        if current == self.snapshot:
+            return {}
+        while True:
+            time.sleep(self.debounce)
+            settled = self.scan()
+            if settled == current:
+                break
+            current = settled
+        return self.apply(current)
+
+    def apply(self, snapshot):
+        old_sources, old_configs = self.snapshot
+        sources, configs = snapshot
+        self.snapshot = snapshot
+        if configs != old_configs:
+            # Настройки изменились - заново разрешаем и перепроверяем все файлы
+            self.config = self.make_config()
+            changed = set(sources)
+        else:
+            changed = {path for path, stat in sources.items() if old_sources.get(path) != stat}
+
+        diffs = {}
+        for path in sorted(set(self.files) - set(sources)):
+            state = self.files.pop(path)
+            diffs[path] = ([], list(state.reports))
+        for path in sorted(changed):
+            before = self.files.get(path)
+            old_reports = list(before.reports) if before is not None else []
+            state = self.check(path)
+            if state is before:
+                continue
+            added = Counter(state.reports) - Counter(old_reports)
+            removed = Counter(old_reports) - Counter(state.reports)
+            if state.error:
+                added[f"Error: {state.error}"] += 1
+            if added or removed:
+                diffs[path] = (list(added.elements()), list(removed.elements()))
+        self.report(diffs, sources)
+        return diffs
+
+    def report(self, diffs, sources):
+        for path, (added, removed) in diffs.items():
+            if path not in sources:
+                self.write(f"\n{self.stamp()} {path}: removed\n")
+                continue
+            self.write(f"\n{self.stamp()} {path}: +{len(added)} -{len(removed)}\n")
+            for line in added:
+                self.write(f"  + {line}\n")
+            for line in removed:
+                self.write(f"  - {line}\n")
+        if diffs:
+            total = sum(len(state.reports) for state in self.files.values())
+            self.write(f"{self.stamp()} {total} issues in {len(self.files)} files\n")
+        self.stream.flush()
+
+    def run(self, iterations=None):
+        """Цикл опроса; iterations=None - до Ctrl+C"""
+        self.start()
+        count = 0
+        try:
+            while iterations is None or count < iterations:
+                time.sleep(self.interval)
+                self.poll()
+                count += 1
+        except KeyboardInterrupt:
+            pass
+
+    def write(self, text):
+        self.stream.write(text)
+
+    @staticmethod
+    def stamp():
+        return time.strftime('[%H:%M:%S]')
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size